@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+ab_report.py  –  A/B performance comparison of two result databases
+
+Aligns the runs of a baseline and a candidate DB (both written by
+analysis/csv_to_database.py) by (mode, d, K, noise, corr) and reports per
+phase
+
+    speedup = median(baseline) / median(candidate)      (> 1: candidate faster)
+
+with a two‑sided Mann–Whitney U test per cell and Holm's correction over
+all cells.  A cell is a regression if the candidate is slower by more than
+--threshold (speedup < 1 / (1 + threshold)) and the adjusted p < --alpha;
+the command then exits with status 1, so it can gate encode‑path changes.
+
+Usage
+-----
+  python analysis/ab_report.py base.db cand.db
+  python analysis/ab_report.py base.db cand.db --modes box-opt \\
+      --metrics encode_time total_time --threshold 0.05 --csv ab.csv
+"""
+
+import argparse, csv, sqlite3, sys
+from pathlib import Path
+
+import numpy as np
+from scipy.stats import mannwhitneyu
+
+GROUP_COLS = ("mode", "d", "k", "noise", "corr")
+DEFAULT_METRICS = ("encode_time", "anneal_time", "network_time", "total_time")
+PHASES = ("encode_time", "submit_time", "anneal_time", "network_time",
+          "decode_time", "throttle_time", "polish_time", "total_time", "wall_time")
+
+
+def fetch(db_path, metrics, modes=None):
+    """{(mode, d, k, noise, corr): {metric: [values]}} from the results view."""
+    q = f"SELECT {', '.join(GROUP_COLS)}, {', '.join(metrics)} FROM results"
+    params = []
+    if modes:
+        q += f" WHERE mode IN ({','.join('?' * len(modes))})"
+        params = list(modes)
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(q, params).fetchall()
+    finally:
+        conn.close()
+    g = len(GROUP_COLS)
+    out = {}
+    for r in rows:
+        cell = out.setdefault(r[:g], {m: [] for m in metrics})
+        for m, v in zip(metrics, r[g:]):
+            if v is not None:
+                cell[m].append(v)
+    return out
+
+
+def holm(pvals):
+    """Holm–Bonferroni adjusted p‑values."""
+    p = np.asarray(pvals, dtype=float)
+    order = np.argsort(p)
+    adj = np.empty_like(p)
+    running = 0.0
+    for rank, i in enumerate(order):
+        running = max(running, (len(p) - rank) * p[i])
+        adj[i] = min(running, 1.0)
+    return adj
+
+
+def compare(base, cand, metrics=DEFAULT_METRICS, threshold=0.10, alpha=0.05):
+    """
+    Rows (dicts) for every (group, metric) present in both `base` and `cand`
+    (as returned by `fetch`), with speedup, p, p_adj and verdict in
+    {"faster", "slower", "regression", "~"}.
+    """
+    rows = []
+    for key in sorted(set(base) & set(cand), key=lambda k: tuple(str(x) for x in k)):
+        for m in metrics:
+            b, c = base[key][m], cand[key][m]
+            if not b or not c:
+                continue
+            med_b, med_c = float(np.median(b)), float(np.median(c))
+            speedup = med_b / med_c if med_c > 0 else float("inf")
+            if len(b) > 1 and len(c) > 1 and len(set(b) | set(c)) > 1:
+                p = float(mannwhitneyu(b, c, alternative="two-sided").pvalue)
+            else:
+                p = 1.0
+            rows.append(dict(zip(GROUP_COLS, key),
+                             metric=m, n_base=len(b), n_cand=len(c),
+                             base_median=med_b, cand_median=med_c,
+                             speedup=speedup, p=p))
+    if not rows:
+        return rows
+
+    for r, p_adj in zip(rows, holm([r["p"] for r in rows])):
+        r["p_adj"] = float(p_adj)
+        if p_adj >= alpha:
+            r["verdict"] = "~"
+        elif r["speedup"] >= 1.0:
+            r["verdict"] = "faster"
+        elif r["speedup"] < 1.0 / (1.0 + threshold):
+            r["verdict"] = "regression"
+        else:
+            r["verdict"] = "slower"
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="A/B regression report between two result DBs")
+    ap.add_argument("baseline",  type=Path, help="baseline bench.db")
+    ap.add_argument("candidate", type=Path, help="candidate bench.db")
+    ap.add_argument("--metrics", nargs="+", default=list(DEFAULT_METRICS), choices=PHASES)
+    ap.add_argument("--modes",   nargs="*", help="restrict to these modes")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="tolerated relative slow‑down before failing (default 0.10)")
+    ap.add_argument("--alpha",   type=float, default=0.05,
+                    help="significance level after Holm correction")
+    ap.add_argument("--csv",     metavar="FILE", help="also write the rows as CSV")
+    args = ap.parse_args()
+
+    for db in (args.baseline, args.candidate):
+        if not db.exists():
+            sys.exit(f"[err] DB not found: {db}")
+
+    base = fetch(args.baseline, args.metrics, args.modes)
+    cand = fetch(args.candidate, args.metrics, args.modes)
+    rows = compare(base, cand, args.metrics, args.threshold, args.alpha)
+    if not rows:
+        sys.exit("[err] no configuration present in both databases")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, rows[0].keys())
+            w.writeheader();  w.writerows(rows)
+        print(f"✓ CSV written to {args.csv}")
+
+    col_hdr = "{:<16} {:>5} {:>3} {:>6} {:>5} {:<13} {:>7} {:>11} {:>11} {:>8} {:>9} {:<10}"
+    print(col_hdr.format("mode", "d", "K", "noise", "corr", "metric", "n b/c",
+                         "base_med", "cand_med", "speedup", "p_adj", "verdict"))
+    print("-" * 116)
+    for r in rows:
+        print(col_hdr.format(r["mode"], r["d"], "-" if r["k"] is None else r["k"],
+                             r["noise"], r["corr"], r["metric"],
+                             f"{r['n_base']}/{r['n_cand']}",
+                             f"{r['base_median']:.4g}", f"{r['cand_median']:.4g}",
+                             f"{r['speedup']:.3f}", f"{r['p_adj']:.1e}", r["verdict"]))
+
+    only_base = len(set(base) - set(cand))
+    only_cand = len(set(cand) - set(base))
+    if only_base or only_cand:
+        print(f"\n[info] unmatched configurations: {only_base} baseline‑only, "
+              f"{only_cand} candidate‑only")
+
+    bad = [r for r in rows if r["verdict"] == "regression"]
+    if bad:
+        print(f"\n✗ {len(bad)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\n✓ no regression beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
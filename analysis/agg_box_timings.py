@@ -1,67 +1,74 @@
 #!/usr/bin/env python3
 """
-agg_box_timings.py  –  aggregate run-time statistics for box-naive / box-opt
+agg_box_timings.py  –  run-time statistics per configuration
+
+Reads the materialised `summary` table (analysis/summary.py; refreshed
+here first if the DB has un-summarised runs): median and p90 of encode /
+anneal / network / total time per (mode, d, K, noise, corr).
 
 Usage
 -----
   python analysis/agg_box_timings.py             # pretty table to stdout
   python analysis/agg_box_timings.py --csv out.csv
-  python analysis/agg_box_timings.py --db path/to/bench.db
+  python analysis/agg_box_timings.py --db path/to/bench.db --modes box-opt potok
 """
 
 import argparse, sqlite3, sys, csv
 from pathlib import Path
-from statistics import mean
+
+try:
+    from analysis.summary import refresh_summary
+except ImportError:                          # run as  python analysis/agg_box_timings.py
+    from summary import refresh_summary
 
 DEFAULT_DB = Path("results/bench.db")
+PHASES = ("encode_time", "anneal_time", "network_time", "total_time")
+
 
 def fetch(conn, modes):
-    """Return dict: {mode: {d: [rows]}} for the requested modes."""
-    cur = conn.cursor()
+    """Return {(mode, d, k, noise, corr): {metric: (n, median, p90)}}."""
     q = """
-        SELECT mode, d, encode_time, anneal_time, total_time
-          FROM runs
-         WHERE mode IN ({})
-           AND encode_time IS NOT NULL
-    """.format(",".join("?"*len(modes)))
-    buckets = {m: {} for m in modes}
-    for mode, d, et, at, tt in cur.execute(q, modes):
-        buckets[mode].setdefault(d, []).append((et, at, tt))
+        SELECT mode, d, k, noise, corr, metric, n, median, p90
+          FROM summary
+         WHERE mode IN ({}) AND metric IN ({})
+         ORDER BY mode, d, k, noise, corr
+    """.format(",".join("?"*len(modes)), ",".join("?"*len(PHASES)))
+    buckets = {}
+    for mode, d, k, noise, corr, metric, n, med, p90 in conn.execute(q, [*modes, *PHASES]):
+        buckets.setdefault((mode, d, k, noise, corr), {})[metric] = (n, med, p90)
     return buckets
 
 
-def summarise(rows):
-    et_avg = mean(r[0] for r in rows)
-    at_avg = mean(r[1] for r in rows)
-    tt_avg = mean(r[2] for r in rows)
-    return round(et_avg, 4), round(at_avg, 4), round(tt_avg, 4), len(rows)
-
-
 def main():
-    ap = argparse.ArgumentParser(description="Aggregate box-naive / box-opt timings")
-    ap.add_argument("--db",  default=DEFAULT_DB, type=Path, help="bench.db path")
-    ap.add_argument("--csv", metavar="FILE", help="write CSV instead of table")
+    ap = argparse.ArgumentParser(description="Aggregate timings per configuration")
+    ap.add_argument("--db",    default=DEFAULT_DB, type=Path, help="bench.db path")
+    ap.add_argument("--modes", nargs="+", default=["box-naive", "box-opt"])
+    ap.add_argument("--csv",   metavar="FILE", help="write CSV instead of table")
     args = ap.parse_args()
 
     if not args.db.exists():
         sys.exit(f"[err] DB not found: {args.db}")
 
-    with sqlite3.connect(args.db) as conn:
-        buckets = fetch(conn, ["box-naive", "box-opt"])
+    conn = sqlite3.connect(args.db)
+    try:
+        refresh_summary(conn)
+        buckets = fetch(conn, args.modes)
+    finally:
+        conn.close()
 
     # build summary rows
     rows = []
-    for mode in ("box-naive", "box-opt"):
-        for d, lst in sorted(buckets[mode].items()):
-            et, at, tt, n = summarise(lst)
-            rows.append({
-                "mode": mode,
-                "d":    d,
-                "runs": n,
-                "encode_avg":  et,
-                "anneal_avg":  at,
-                "total_avg":   tt,
-            })
+    for (mode, d, k, noise, corr), stats in buckets.items():
+        row = {"mode": mode, "d": d, "K": k, "noise": noise, "corr": corr,
+               "runs": max(s[0] for s in stats.values())}
+        for ph in PHASES:
+            n, med, p90 = stats.get(ph, (0, None, None))
+            row[f"{ph[:-5]}_med"] = med
+            row[f"{ph[:-5]}_p90"] = p90
+        rows.append(row)
+
+    if not rows:
+        sys.exit(f"[err] no rows for modes {args.modes}")
 
     if args.csv:
         with open(args.csv, "w", newline="") as f:
@@ -70,16 +77,18 @@ def main():
         print(f"✓ CSV written to {args.csv}")
     else:
         # pretty table to stdout
-        col_hdr = "{:<10} {:>6} {:>5} {:>12} {:>12} {:>12}"
-        col_row = "{:<10} {:>6d} {:>5d} {:>12.4f} {:>12.4f} {:>12.4f}"
-        print(col_hdr.format("mode", "d", "runs",
-                             "encode_avg", "anneal_avg", "total_avg"))
-        print("-"*65)
+        fmt = lambda x: "-" if x is None else f"{x:.4f}"
+        col_hdr = "{:<12} {:>5} {:>3} {:>6} {:>5} {:>5}" + " {:>10}" * 8
+        print(col_hdr.format("mode", "d", "K", "noise", "corr", "runs",
+                             "enc_med", "enc_p90", "ann_med", "ann_p90",
+                             "net_med", "net_p90", "tot_med", "tot_p90"))
+        print("-"*130)
         for r in rows:
-            print(col_row.format(r["mode"], r["d"], r["runs"],
-                                 r["encode_avg"], r["anneal_avg"], r["total_avg"]))
+            vals = list(r.values())
+            print(col_hdr.format(r["mode"], r["d"], "-" if r["K"] is None else r["K"],
+                                 r["noise"], r["corr"], r["runs"],
+                                 *(fmt(v) for v in vals[6:])))
 
 
 if __name__ == "__main__":
     main()
-
@@ -29,7 +29,7 @@ def fetch_aggregates(conn):
                AVG(encode_time)    AS encode_avg,
                AVG(anneal_time)    AS anneal_avg,
                AVG(total_time)     AS total_avg
-        FROM   runs
+        FROM   results
         WHERE  mode IN ('box-naive','box-opt')
         GROUP  BY mode, d
         ORDER  BY d, mode
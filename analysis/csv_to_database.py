@@ -1,174 +1,360 @@
 # analysis/csv_to_database.py
-import csv, json, re, sqlite3, sys, datetime as dt
+"""
+Import benchmark CSVs into the results database.
+
+    python analysis/csv_to_database.py <results_subdir> [<results_subdir> …]
+        [--db results/bench_new.db] [--jobs N]
+
+Each CSV row becomes one `runs` row (configuration), one `metrics` row
+(typed timing phases) and one `accuracy` row; CSV columns without a typed
+home go to `runs.params` (JSON).  The `results` view joins the three for
+cross‑mode queries.
+
+Large batches are parsed in parallel (one task per file, across all given
+directories; see POOL_MIN_BYTES) and written by a single connection with `executemany` per
+file and table inside one transaction (WAL journal).  Every imported file is
+recorded in `imports` with its size, mtime and SHA‑1:
+
+    unchanged size + mtime   → skipped without being read
+    same hash                → skipped (mtime refreshed)
+    changed content          → its old rows are replaced
+
+so re‑running on the same directories is idempotent and cheap.
+"""
+
+import argparse, csv, hashlib, io, json, os, re, sqlite3, sys, datetime as dt
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    from analysis.summary import ensure_summary, refresh_summary
+except ImportError:                          # run as  python analysis/csv_to_database.py
+    from summary import ensure_summary, refresh_summary
+
 DB_PATH  = Path("results/bench_new.db")
+# default --jobs: a process pool only below this many CSV bytes costs more
+# (~0.5 s start‑up) than it saves (serial parsing runs at ~2–3 MB/s)
+POOL_MIN_BYTES = 4 << 20
+SCHEMA_VERSION = 2
 SCHEMA = """
-CREATE TABLE IF NOT EXISTS runs (
+CREATE TABLE IF NOT EXISTS imports (
     id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    path         TEXT UNIQUE,   -- resolved CSV path
+    size         INTEGER,
+    mtime_ns     INTEGER,
+    sha1         TEXT,
+    n_rows       INTEGER,
+    ts           TEXT
+);
+
+-- one row per benchmark run: the configuration
+CREATE TABLE IF NOT EXISTS runs (
+    id           INTEGER PRIMARY KEY,
+    import_id    INTEGER REFERENCES imports(id) ON DELETE CASCADE,
     ts           TEXT,          -- ISO timestamp when imported
-    mode         TEXT,          -- 'box-naive' / 'box-opt' / 'classical' / 'potok'
+    mode         TEXT NOT NULL, -- 'box-naive' / 'box-opt' / 'potok' / 'ols' / …
     d            INTEGER,
     n            INTEGER,
     k            INTEGER,       -- precision bits (Potok only)  NULL otherwise
-    iterations   INTEGER,       -- NULL for classical
-    encode_time  REAL,
-    anneal_time  REAL,
-    total_time   REAL,
-    wall_time    REAL,
-    error        REAL,
     noise        REAL,
     corr         REAL,
-    params       TEXT           -- free-form JSON for extra metadata
+    seed         INTEGER,
+    iterations   INTEGER,       -- NULL for classical
+    params       TEXT           -- JSON: source file + every other CSV column
+);
+
+-- timing phases in seconds; NULL where a mode does not have the phase
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id        INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    encode_time   REAL,
+    submit_time   REAL,
+    anneal_time   REAL,
+    network_time  REAL,
+    decode_time   REAL,
+    throttle_time REAL,
+    polish_time   REAL,
+    predict_time  REAL,         -- classical only
+    total_time    REAL,         -- network excluded (classical: train time)
+    wall_time     REAL
 );
+
+CREATE TABLE IF NOT EXISTS accuracy (
+    run_id       INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    error        REAL,          -- ‖w - w*‖ (QUBO modes)
+    r2           REAL,          -- classical only
+    mse          REAL           -- classical only
+);
+
+CREATE INDEX IF NOT EXISTS idx_runs_config ON runs (mode, d, k, noise, corr);
+CREATE INDEX IF NOT EXISTS idx_runs_import ON runs (import_id);
+
+-- flat view for ad‑hoc / cross‑mode queries
+CREATE VIEW IF NOT EXISTS results AS
+SELECT r.id, r.ts, r.mode, r.d, r.n, r.k, r.noise, r.corr, r.seed,
+       r.iterations, r.params,
+       m.encode_time, m.submit_time, m.anneal_time, m.network_time,
+       m.decode_time, m.throttle_time, m.polish_time, m.predict_time,
+       m.total_time, m.wall_time,
+       a.error, a.r2, a.mse
+  FROM runs r
+  LEFT JOIN metrics  m ON m.run_id = r.id
+  LEFT JOIN accuracy a ON a.run_id = r.id;
 """
 
-BOX_QUBO_HEADER = {
-    "mode":         "mode",
-    "d":            "d",
-    "n":            "n",
-    "iterations":   "iterations",
-    "encode_time":  "encode_time",
-    "anneal_time":  "anneal_time",
-    "total_time":   "total_time",
-    "wall_time":    "wall_time",
-    "error":        "error",
-}
+RUN_COLS      = ("ts", "mode", "d", "n", "k", "noise", "corr", "seed",
+                 "iterations", "params")
+METRIC_COLS   = ("encode_time", "submit_time", "anneal_time", "network_time",
+                 "decode_time", "throttle_time", "polish_time", "predict_time",
+                 "total_time", "wall_time")
+ACCURACY_COLS = ("error", "r2", "mse")
+
+INT_COLS   = {"d", "n", "k", "seed", "iterations"}
+FLOAT_COLS = {"noise", "corr"} | set(METRIC_COLS) | set(ACCURACY_COLS)
 
-# potok runs (have extra ‘K’ precision column)
-POTOK_HEADER = BOX_QUBO_HEADER | {"k": "k"}
-
-# classical scikit-learn header (unchanged)
-CLASSICAL_HEADER = {
-    "model":        "mode",
-    "d":            "d",
-    "n":            "n",
-    "noise":        "noise",
-    "corr":         "corr",
-    "train_time":   "total_time",
-    "predict_time": "encode_time",
-    "r2":           "anneal_time",
-    "mse":          "error",
-    "seed":         None,
+# CSV column (lower‑cased) → typed column, where the name differs
+CSV_ALIASES = {
+    "model":      "mode",           # classical
+    "train_time": "total_time",     # classical
+    "latency":    "total_time",     # box-stream
 }
+TYPED_COLS = set(RUN_COLS) | set(METRIC_COLS) | set(ACCURACY_COLS)
 
-# keep them in one list for the matcher
-HEADER_MAPS = [POTOK_HEADER, BOX_QUBO_HEADER, CLASSICAL_HEADER]
+INSERT_RUNS = (f"INSERT INTO runs (id, import_id, {', '.join(RUN_COLS)}) "
+               f"VALUES ({', '.join('?' * (len(RUN_COLS) + 2))})")
+INSERT_METRICS = (f"INSERT INTO metrics (run_id, {', '.join(METRIC_COLS)}) "
+                  f"VALUES ({', '.join('?' * (len(METRIC_COLS) + 1))})")
+INSERT_ACCURACY = (f"INSERT INTO accuracy (run_id, {', '.join(ACCURACY_COLS)}) "
+                   f"VALUES ({', '.join('?' * (len(ACCURACY_COLS) + 1))})")
 
 # canonicalise filename → mode (hyphen not underscore)
 FNAME_MODE_RE = re.compile(r"^(box[-_]naive|box[-_]opt|potok|classical)", re.I)
+# pattern: “…_NOISE_CORR_rep…”  (eg box_naive_0.05_0.8_rep12.csv)
+NOISE_CORR_RE = re.compile(r"_([\d.]+)_([\d.]+)_rep")
+
 
 def normalise_mode(raw: str) -> str:
     raw = raw.lower().replace("_", "-")
     return raw
 
-# ──────────────────────────────────────────────────────────────────────────────
-def import_dir(dir_path: Path):
-    conn = sqlite3.connect(DB_PATH)
+
+def _value(col, raw):
+    """Typed value of a CSV cell; untyped columns become numbers if they parse."""
+    if raw == "":
+        return None
+    if col in INT_COLS:
+        return int(float(raw))
+    if col in FLOAT_COLS:
+        return float(raw)
+    if col == "mode":
+        return raw
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+
+# ---- parsing (runs in worker processes) ----
+def parse_csv(csv_file: Path, data: bytes, ts: str):
+    """
+    Rows of one CSV as (run, metrics, accuracy) tuples in RUN_COLS /
+    METRIC_COLS / ACCURACY_COLS order, or None if the CSV has no `d`
+    column or no timing column.  Columns without a typed home go to
+    the `params` JSON.
+    """
+    reader = csv.reader(io.StringIO(data.decode("utf-8")))
+    header = next(reader, None)
+    if header is None:
+        return []
+
+    cols = [CSV_ALIASES.get(h.lower(), h.lower()) for h in header]
+    if "d" not in cols or not set(cols) & set(METRIC_COLS):
+        return None
+
+    # per-file constants: mode from file name, noise/corr from the suffix
+    m = FNAME_MODE_RE.match(csv_file.stem)
+    mode_from_fname = normalise_mode(m.group(1)) if m else None
+    m_nc = NOISE_CORR_RE.search(csv_file.stem)
+    noise_fname = float(m_nc.group(1)) if m_nc else 0.01
+    corr_fname  = float(m_nc.group(2)) if m_nc else 0.0
+
+    rows = []
+    for row in reader:
+        if not row:
+            continue
+        typed = {"ts": ts}
+        extra = {"source": csv_file.name}
+        for col, raw in zip(cols, row):
+            val = _value(col, raw)
+            if col in TYPED_COLS:
+                typed[col] = val
+            elif val is not None:
+                extra[col] = val
+
+        # fill missing mode
+        mode = typed.get("mode")
+        typed["mode"] = normalise_mode(mode) if mode else (mode_from_fname or "unknown")
+
+        if typed.get("noise") is None or typed.get("corr") is None:
+            typed["noise"] = noise_fname
+            typed["corr"]  = corr_fname
+        typed["params"] = json.dumps(extra)
+
+        rows.append((tuple(typed.get(c) for c in RUN_COLS),
+                     tuple(typed.get(c) for c in METRIC_COLS),
+                     tuple(typed.get(c) for c in ACCURACY_COLS)))
+    return rows
+
+
+def _read_and_parse(job):
+    """Worker: (path, ts) → (path, sha1, rows | None)."""
+    path, ts = job
+    data = path.read_bytes()
+    sha1 = hashlib.sha1(data).hexdigest()
+    return path, sha1, parse_csv(path, data, ts)
+
+
+# ---- database ----
+def connect(db_path=DB_PATH):
+    """
+    Open (and create / upgrade) the results DB.  A DB written by the
+    single‑table importer (user_version 0) keeps its rows as `runs_v1`;
+    its import log is dropped so every CSV is re‑imported into the typed
+    tables.
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
     conn.execute("PRAGMA foreign_keys = ON")
-    conn.executescript(SCHEMA)
-    cur = conn.cursor()
-
-    for csv_file in dir_path.glob("*.csv"):
-        with csv_file.open(newline="") as f:
-            reader = csv.reader(f)
-            header = next(reader)
-
-            # try matching against known header maps
-            header_lower = [h.lower() for h in header]
-            hdr_map = None
-            for m in HEADER_MAPS:
-                if set(m.keys()) <= set(header_lower):
-                    hdr_map = m
-                    break
-            if hdr_map is None:
-                print(f"[warn] unexpected columns in {csv_file.name}, skipped", file=sys.stderr)
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < SCHEMA_VERSION:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "runs" in tables:
+            print(f"[info] {db_path}: old schema kept as runs_v1, re-importing CSVs",
+                  file=sys.stderr)
+            conn.executescript("""
+                DROP INDEX IF EXISTS idx_runs_config;
+                DROP INDEX IF EXISTS idx_runs_import;
+                DROP TABLE IF EXISTS imports;
+                ALTER TABLE runs RENAME TO runs_v1;
+            """)
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    ensure_summary(conn)
+    return conn
+
+
+def _workers(jobs, n_bytes):
+    """Parser processes: `jobs` if given, else the CPU count once n_bytes pays for a pool."""
+    if jobs is not None:
+        return jobs
+    cpus = os.cpu_count() or 1
+    return 1 if cpus == 1 or n_bytes < POOL_MIN_BYTES else cpus
+
+
+def import_dirs(dirs, db_path=DB_PATH, jobs=None, summarize=True):
+    """
+    Import every *.csv of `dirs`, then refresh the `summary` rows of the
+    configurations that changed (see analysis/summary.py) unless
+    `summarize` is off.  `jobs` parser processes (None: serial on a single
+    CPU or below POOL_MIN_BYTES of new CSVs, else the CPU count).  Returns
+    dict(files, imported, replaced, skipped, rows, groups).
+    """
+    ts = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None).isoformat(timespec="seconds")
+    conn = connect(db_path)
+    known = {p: (i, s, m, h) for i, p, s, m, h in
+             conn.execute("SELECT id, path, size, mtime_ns, sha1 FROM imports")}
+
+    stats = {"files": 0, "imported": 0, "replaced": 0, "skipped": 0, "rows": 0}
+    todo, stat_of = [], {}
+    for dir_path in dirs:
+        for csv_file in sorted(Path(dir_path).glob("*.csv")):
+            stats["files"] += 1
+            path = csv_file.resolve()
+            st = path.stat()
+            stat_of[path] = (st.st_size, st.st_mtime_ns)
+            prev = known.get(str(path))
+            if prev is not None and prev[1:3] == stat_of[path]:
+                stats["skipped"] += 1
                 continue
+            todo.append((path, ts))
 
-            col_idx = {name: header_lower.index(name) for name in hdr_map.keys()}
-
-            for row in reader:
-                # infer mode from file name if the CSV itself doesn’t carry it
-                m = FNAME_MODE_RE.match(csv_file.stem)
-                mode_from_fname = normalise_mode(m.group(1)) if m else None
-
-                db_row = {
-                    "ts": dt.datetime.utcnow().isoformat(timespec="seconds"),
-                    "mode": None,
-                    "d": None, "n": None, "k": None,
-                    "iterations": None,
-                    "encode_time": None, "anneal_time": None,
-                    "total_time": None, "wall_time": None,
-                    "error": None,
-                    "noise": None, "corr": None,
-                    "params": json.dumps({"source": csv_file.name})
-                }
-
-                # populate from CSV
-                for csv_col, db_col in hdr_map.items():
-                    if db_col is None:
-                        continue
-                    val = row[col_idx[csv_col]]
-                    if val == "":
-                        continue
-                    db_row[db_col] = val
+    workers = _workers(jobs, sum(stat_of[path][0] for path, _ in todo))
+    if workers == 1 or len(todo) < 2:
+        parsed = map(_read_and_parse, todo)
+        pool = None
+    else:
+        # forkserver: forking a process that already runs BLAS threads can deadlock
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("forkserver"))
+        parsed = pool.map(_read_and_parse, todo, chunksize=max(1, len(todo) // (4 * workers)))
 
-                # fill missing mode
-                if db_row["mode"] is None:
-                    db_row["mode"] = mode_from_fname or "unknown"
+    try:
+        with conn:                                   # one transaction
+            # write lock first, so the run ids handed out below stay ours
+            conn.execute("BEGIN IMMEDIATE")
+            next_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM runs").fetchone()[0] + 1
+            for path, sha1, rows in parsed:
+                size, mtime_ns = stat_of[path]
+                prev = known.get(str(path))
+                if rows is None:
+                    print(f"[warn] unexpected columns in {path.name}, skipped", file=sys.stderr)
+                    continue
+                if prev is not None:
+                    if prev[3] == sha1:
+                        conn.execute("UPDATE imports SET size = ?, mtime_ns = ? WHERE id = ?",
+                                     (size, mtime_ns, prev[0]))
+                        stats["skipped"] += 1
+                        continue
+                    import_id = prev[0]
+                    conn.execute("DELETE FROM runs WHERE import_id = ?", (import_id,))
+                    conn.execute("UPDATE imports SET size = ?, mtime_ns = ?, sha1 = ?, "
+                                 "n_rows = ?, ts = ? WHERE id = ?",
+                                 (size, mtime_ns, sha1, len(rows), ts, import_id))
+                    stats["replaced"] += 1
                 else:
-                    db_row["mode"] = normalise_mode(db_row["mode"])
-
-                if db_row["noise"] is None or db_row["corr"] is None:
-                    # pattern: “…_NOISE_CORR_rep…”  (eg box_naive_0.05_0.8_rep12.csv)
-                    m_nc = re.search(r"_([\d.]+)_([\d.]+)_rep", csv_file.stem)
-                    if m_nc:
-                        db_row["noise"] = float(m_nc.group(1))
-                        db_row["corr"]  = float(m_nc.group(2))
-                    else:
-                        # default values when nothing available
-                        db_row.setdefault("noise", 0.01)
-                        db_row.setdefault("corr",  0.0)
-
-                # cast numeric fields
-                for key in ("d", "n", "k", "iterations"):
-                    if db_row[key] is not None:
-                        db_row[key] = int(float(db_row[key]))
-                for key in ("encode_time", "anneal_time",
-                             "total_time", "wall_time",
-                             "error", "noise", "corr"):
-                    if db_row[key] is not None:
-                        db_row[key] = float(db_row[key])
-
-                cur.execute(
-                    """
-                    INSERT INTO runs
-                    (ts, mode, d, n, k, iterations,
-                     encode_time, anneal_time, total_time, wall_time,
-                     error, noise, corr, params)
-                    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-                    """,
-                    tuple(db_row[k] for k in
-                          ("ts","mode","d","n","k","iterations",
-                           "encode_time","anneal_time","total_time","wall_time",
-                           "error","noise","corr","params"))
-                )
-
-    conn.commit()
-    conn.close()
+                    import_id = conn.execute(
+                        "INSERT INTO imports (path, size, mtime_ns, sha1, n_rows, ts) "
+                        "VALUES (?,?,?,?,?,?)",
+                        (str(path), size, mtime_ns, sha1, len(rows), ts)).lastrowid
+                    stats["imported"] += 1
+
+                ids = range(next_id, next_id + len(rows))
+                next_id += len(rows)
+                conn.executemany(INSERT_RUNS, [(i, import_id) + r[0] for i, r in zip(ids, rows)])
+                conn.executemany(INSERT_METRICS, [(i,) + r[1] for i, r in zip(ids, rows)])
+                conn.executemany(INSERT_ACCURACY, [(i,) + r[2] for i, r in zip(ids, rows)])
+                stats["rows"] += len(rows)
+        stats["groups"] = refresh_summary(conn) if summarize else 0
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        conn.close()
+    return stats
+
+
+def import_dir(dir_path: Path, db_path=DB_PATH, jobs=None, summarize=True):
+    return import_dirs([dir_path], db_path=db_path, jobs=jobs, summarize=summarize)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("usage: python analysis/csv_to_database.py <results_subdir>")
-        sys.exit(1)
-
-    target = Path(sys.argv[1])
-    if not target.is_dir():
-        print(f"no such directory: {target}", file=sys.stderr)
-        sys.exit(1)
+    ap = argparse.ArgumentParser(description="Import benchmark CSVs into SQLite")
+    ap.add_argument("dirs", nargs="+", type=Path, help="results sub‑directories")
+    ap.add_argument("--db",   default=DB_PATH, type=Path, help="database path")
+    ap.add_argument("--jobs", type=int, default=None,
+                    help="parser processes (default: CPU count for batches of at least "
+                         "POOL_MIN_BYTES on more than one CPU, else serial)")
+    args = ap.parse_args()
 
-    import_dir(target)
-    print("✓ import complete")
+    for target in args.dirs:
+        if not target.is_dir():
+            print(f"no such directory: {target}", file=sys.stderr)
+            sys.exit(1)
 
+    s = import_dirs(args.dirs, db_path=args.db, jobs=args.jobs)
+    print(f"✓ import complete: {s['imported']} new, {s['replaced']} replaced, "
+          f"{s['skipped']} unchanged files; {s['rows']} rows, "
+          f"{s['groups']} summary groups refreshed")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+memory_report.py  –  memory vs d and QUBO size, and where each mode runs out of RAM
+
+Reads the rows logged with `main.py --memory` (columns mem_data_mb,
+mem_template_mb, mem_iter_mb, mem_run_mb, rss_peak_mb; models/spans.py)
+from the results DB and prints per (mode, d) the median peaks and the run
+peak per QUBO coupling.  Per mode it then fits
+
+    mem_run_mb ≈ a · d^p        (least squares in log–log)
+
+and extrapolates the d at which baseline RSS + run peak exceeds --ram_gb
+(default: this machine's physical memory).  The mode with the smallest
+d_max runs out of RAM first.
+
+Usage
+-----
+  python analysis/memory_report.py
+  python analysis/memory_report.py --db path/to/bench.db --ram_gb 16 --csv mem.csv
+"""
+
+import argparse, csv, json, os, sqlite3, sys
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_DB = Path("results/bench.db")
+MEM_COLS = ("mem_data_mb", "mem_template_mb", "mem_iter_mb", "mem_run_mb", "rss_peak_mb")
+
+
+def fetch(conn, modes=None):
+    """{(mode, d): {col: [values], "qubo_nnz": [values]}} for rows with memory columns."""
+    out = {}
+    for mode, d, params in conn.execute("SELECT mode, d, params FROM results"):
+        p = json.loads(params or "{}")
+        if p.get("mem_run_mb") is None or (modes and mode not in modes):
+            continue
+        cell = out.setdefault((mode, d), {c: [] for c in (*MEM_COLS, "qubo_nnz")})
+        for c in cell:
+            if p.get(c) is not None:
+                cell[c].append(float(p[c]))
+    return out
+
+
+def fit_power(d, mem):
+    """(a, p) of mem ≈ a·d^p, or None with fewer than two distinct d."""
+    d, mem = np.asarray(d, float), np.asarray(mem, float)
+    ok = (mem > 0) & (d > 0)
+    if len(np.unique(d[ok])) < 2:
+        return None
+    p, log_a = np.polyfit(np.log(d[ok]), np.log(mem[ok]), 1)
+    return float(np.exp(log_a)), float(p)
+
+
+def d_max(fit, budget_mb):
+    """Largest d whose extrapolated run peak fits into budget_mb."""
+    if fit is None or budget_mb <= 0 or fit[1] <= 0:
+        return None
+    a, p = fit
+    return (budget_mb / a) ** (1.0 / p)
+
+
+def physical_ram_gb():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024**3
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def summarise(buckets, ram_gb):
+    """Per (mode, d) rows and per‑mode extrapolation rows."""
+    med = lambda v: float(np.median(v)) if v else None
+    rows = []
+    for (mode, d), cell in sorted(buckets.items()):
+        run, nnz = med(cell["mem_run_mb"]), med(cell["qubo_nnz"])
+        rows.append({
+            "mode": mode, "d": d, "runs": len(cell["mem_run_mb"]),
+            **{c: med(cell[c]) for c in MEM_COLS},
+            "qubo_nnz": nnz,
+            "bytes_per_nnz": run * 2**20 / nnz if run is not None and nnz else None,
+        })
+
+    fits = []
+    for mode in sorted({m for m, _ in buckets}):
+        mine = [r for r in rows if r["mode"] == mode]
+        fit = fit_power([r["d"] for r in mine], [r["mem_run_mb"] for r in mine])
+        rss = [r["rss_peak_mb"] for r in mine if r["rss_peak_mb"] is not None]
+        runs = [r["mem_run_mb"] for r in mine]
+        # process baseline = smallest RSS minus the run peak it contained
+        base = min(rss) - min(runs) if rss else 0.0
+        budget = ram_gb * 1024 - base if ram_gb else 0.0
+        fits.append({
+            "mode": mode,
+            "d_seen": max(r["d"] for r in mine),
+            "a_mb": fit and fit[0],
+            "exponent": fit and fit[1],
+            "baseline_mb": base,
+            "d_max": d_max(fit, budget),
+        })
+    return rows, fits
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Memory scaling report")
+    ap.add_argument("--db",     default=DEFAULT_DB, type=Path, help="bench.db path")
+    ap.add_argument("--modes",  nargs="*", help="restrict to these modes")
+    ap.add_argument("--ram_gb", type=float, default=physical_ram_gb(),
+                    help="memory budget for the d_max extrapolation (default: physical RAM)")
+    ap.add_argument("--csv",    metavar="FILE", help="also write the per (mode, d) rows as CSV")
+    args = ap.parse_args()
+
+    if not args.db.exists():
+        sys.exit(f"[err] DB not found: {args.db}")
+
+    conn = sqlite3.connect(args.db)
+    try:
+        buckets = fetch(conn, args.modes)
+    finally:
+        conn.close()
+    if not buckets:
+        sys.exit("[err] no rows with memory columns (run main.py with --memory)")
+
+    rows, fits = summarise(buckets, args.ram_gb)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, rows[0].keys())
+            w.writeheader();  w.writerows(rows)
+        print(f"✓ CSV written to {args.csv}")
+
+    fmt = lambda x, spec=".1f": "-" if x is None else f"{x:{spec}}"
+    col_hdr = "{:<18} {:>5} {:>4} {:>9} {:>9} {:>9} {:>9} {:>9} {:>10} {:>9}"
+    print(col_hdr.format("mode", "d", "runs", "data_mb", "tmpl_mb", "iter_mb",
+                         "run_mb", "rss_mb", "qubo_nnz", "B/nnz"))
+    print("-" * 100)
+    for r in rows:
+        print(col_hdr.format(r["mode"], r["d"], r["runs"],
+                             *(fmt(r[c], ".2f") for c in MEM_COLS),
+                             fmt(r["qubo_nnz"], ".0f"), fmt(r["bytes_per_nnz"], ".0f")))
+
+    print(f"\nrun peak ≈ a·d^p, budget {fmt(args.ram_gb)} GB")
+    col_hdr = "{:<18} {:>7} {:>10} {:>9} {:>12} {:>9}"
+    print(col_hdr.format("mode", "d_seen", "a_mb", "p", "baseline_mb", "d_max"))
+    print("-" * 70)
+    for f in sorted(fits, key=lambda f: (f["d_max"] is None, f["d_max"])):
+        print(col_hdr.format(f["mode"], f["d_seen"], fmt(f["a_mb"], ".2e"),
+                             fmt(f["exponent"], ".2f"), fmt(f["baseline_mb"]),
+                             fmt(f["d_max"], ".0f")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+parquet_results.py  –  query the Parquet result dataset (`main.py --parquet DIR`)
+
+The dataset is hive‑partitioned by run directory (`DIR/run=<name>/*.parquet`)
+and every file keeps the runner's own columns at full precision.  `load`
+unifies the per‑file schemas (columns missing from a file read as null) and
+hands filters / column lists to Arrow, so partitions and row groups that
+cannot match are skipped instead of parsed:
+
+    from analysis.parquet_results import load
+    t = load("results/parquet",
+             filters=[("mode", "=", "box-opt"), ("d", ">=", 64)],
+             columns=["run", "d", "encode_time", "total_time"])
+
+Usage
+-----
+  python analysis/parquet_results.py results/parquet
+  python analysis/parquet_results.py results/parquet --mode box-opt --metric encode_time
+  python analysis/parquet_results.py results/parquet --run varying_20250101 --csv out.csv
+"""
+
+import argparse, csv, sys
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+PARTITIONING = ds.partitioning(pa.schema([("run", pa.string())]), flavor="hive")
+
+
+def open_dataset(root):
+    """Arrow dataset over every file under `root` with one unified schema."""
+    probe = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+    schemas = [frag.physical_schema for frag in probe.get_fragments()]
+    if not schemas:
+        raise FileNotFoundError(f"no parquet files under {root}")
+    schema = pa.unify_schemas(schemas + [PARTITIONING.schema],
+                              promote_options="permissive")
+    return ds.dataset(root, format="parquet", partitioning=PARTITIONING, schema=schema)
+
+
+def load(root, filters=None, columns=None):
+    """
+    pyarrow.Table of the rows matching `filters` (DNF list of
+    (column, op, value) tuples as in pyarrow.parquet, or an Arrow
+    expression), restricted to `columns`.
+    """
+    dataset = open_dataset(root)
+    if filters is not None and not isinstance(filters, pc.Expression):
+        filters = pq.filters_to_expression(filters)
+    return dataset.to_table(columns=columns, filter=filters)
+
+
+def summarise(table, metric, by=("mode", "d")):
+    """count / mean / median / p90 of `metric` per `by` (tdigest quantiles)."""
+    by = [c for c in by if c in table.column_names]
+    out = table.group_by(by).aggregate([
+        (metric, "count"),
+        (metric, "mean"),
+        (metric, "tdigest", pc.TDigestOptions(q=[0.5, 0.9])),
+    ])
+    q = out[f"{metric}_tdigest"]
+    return (out.drop_columns([f"{metric}_tdigest"])
+               .append_column(f"{metric}_median", pc.list_element(q, 0))
+               .append_column(f"{metric}_p90", pc.list_element(q, 1))
+               .sort_by([(c, "ascending") for c in by]))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Summarise a Parquet result dataset")
+    ap.add_argument("root", type=Path, help="dataset root (main.py --parquet)")
+    ap.add_argument("--mode",   nargs="*", help="restrict to these modes")
+    ap.add_argument("--run",    nargs="*", help="restrict to these run directories")
+    ap.add_argument("--metric", default="total_time")
+    ap.add_argument("--by",     nargs="+", default=["mode", "d"])
+    ap.add_argument("--csv",    metavar="FILE", help="write CSV instead of table")
+    args = ap.parse_args()
+
+    if not args.root.is_dir():
+        sys.exit(f"[err] dataset not found: {args.root}")
+
+    filters = []
+    if args.mode:
+        filters.append(("mode", "in", args.mode))
+    if args.run:
+        filters.append(("run", "in", args.run))
+    table = load(args.root, filters or None, columns=[*args.by, args.metric])
+    if table.num_rows == 0:
+        sys.exit("[err] no matching rows")
+    rows = summarise(table, args.metric, args.by).to_pylist()
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, rows[0].keys())
+            w.writeheader();  w.writerows(rows)
+        print(f"✓ CSV written to {args.csv}")
+    else:
+        keys = list(rows[0].keys())
+        print("  ".join(f"{k:>14}" for k in keys))
+        print("-" * 16 * len(keys))
+        for r in rows:
+            print("  ".join(f"{v:>14.6g}" if isinstance(v, float) else f"{str(v):>14}"
+                            for v in r.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
 sqlite3 results/bench.db \
   "SELECT mode, d, avg(total_time) AS t
-     FROM runs
+     FROM results
     WHERE error < 1e-2
  GROUP BY mode, d
  ORDER BY d, mode;"
+
+# timing phases per mode (classical rows have NULL encode / anneal / network)
+sqlite3 results/bench.db \
+  "SELECT r.mode, r.d,
+          avg(m.encode_time)  AS encode,
+          avg(m.anneal_time)  AS anneal,
+          avg(m.network_time) AS network,
+          avg(m.total_time)   AS total
+     FROM runs r JOIN metrics m ON m.run_id = r.id
+ GROUP BY r.mode, r.d
+ ORDER BY r.d, r.mode;"
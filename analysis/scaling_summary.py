@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+scaling_summary.py  –  scaled vs unscaled box-opt / potok runs per corr
+
+Compares mean iterations, anneal time and error of 'box-opt' against
+'box-opt+jacobi' / 'box-opt+cholesky' (and the potok equivalents) for
+every corr value in the DB, i.e. across the CORR_SET sweep of
+run_all_varying.sh.
+
+Usage
+-----
+  python analysis/scaling_summary.py
+  python analysis/scaling_summary.py --db path/to/bench.db --csv out.csv
+"""
+
+import argparse, sqlite3, sys, csv
+from pathlib import Path
+from statistics import mean
+
+DEFAULT_DB = Path("results/bench.db")
+
+
+def fetch(conn, base):
+    """{(mode, corr, d): [(iterations, anneal_time, error)]} for base[+scaling]."""
+    cur = conn.cursor()
+    q = """
+        SELECT mode, corr, d, iterations, anneal_time, error
+          FROM results
+         WHERE mode = ? OR mode LIKE ?
+    """
+    buckets = {}
+    for mode, corr, d, it, at, err in cur.execute(q, (base, base + "+%")):
+        buckets.setdefault((mode, corr, d), []).append((it, at, err))
+    return buckets
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Scaled vs unscaled QUBO runs")
+    ap.add_argument("--db",   default=DEFAULT_DB, type=Path, help="bench.db path")
+    ap.add_argument("--base", default="box-opt", help="unscaled mode, e.g. box-opt or potok")
+    ap.add_argument("--csv",  metavar="FILE", help="write CSV instead of table")
+    args = ap.parse_args()
+
+    if not args.db.exists():
+        sys.exit(f"[err] DB not found: {args.db}")
+
+    with sqlite3.connect(args.db) as conn:
+        buckets = fetch(conn, args.base)
+
+    rows = []
+    for (mode, corr, d), lst in sorted(buckets.items(), key=lambda kv: (kv[0][1], kv[0][2], kv[0][0])):
+        rows.append({
+            "corr": corr,
+            "d": d,
+            "mode": mode,
+            "runs": len(lst),
+            "iter_avg":   round(mean(r[0] for r in lst if r[0] is not None), 2),
+            "anneal_avg": round(mean(r[1] for r in lst), 4),
+            "error_avg":  mean(r[2] for r in lst),
+        })
+
+    if not rows:
+        sys.exit(f"[err] no '{args.base}' rows in {args.db}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, rows[0].keys())
+            w.writeheader();  w.writerows(rows)
+        print(f"✓ CSV written to {args.csv}")
+    else:
+        col_hdr = "{:>5} {:>6} {:<18} {:>5} {:>9} {:>11} {:>10}"
+        col_row = "{:>5.2f} {:>6d} {:<18} {:>5d} {:>9.2f} {:>11.4f} {:>10.2e}"
+        print(col_hdr.format("corr", "d", "mode", "runs", "iter_avg", "anneal_avg", "error_avg"))
+        print("-"*70)
+        for r in rows:
+            print(col_row.format(r["corr"], r["d"], r["mode"], r["runs"],
+                                 r["iter_avg"], r["anneal_avg"], r["error_avg"]))
+
+
+if __name__ == "__main__":
+    main()
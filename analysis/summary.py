@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+summary.py  –  materialised robust statistics per configuration
+
+For every group (mode, d, k, noise, corr) and metric in SUMMARY_METRICS the
+`summary` table holds
+
+    n, mean, median, p90, p99, q1, q3, iqr, ci_lo, ci_hi
+
+with [ci_lo, ci_hi] the percentile‑bootstrap 95 % CI of the median, taken
+from the exact bootstrap distribution (`median_ci`) so it is deterministic
+and O(n).  Network and wall times are heavy‑tailed, hence medians / upper
+percentiles rather than means.
+
+Triggers on `runs` record the groups touched by an insert or delete in
+`summary_dirty`; `refresh_summary` recomputes only those, so the importer
+refreshes after every import and readers query `summary` directly.
+SQLite has no percentile aggregate: the dirty groups' values are read in
+one ordered query and reduced with NumPy.
+
+Usage
+-----
+  python analysis/summary.py                          # total_time table
+  python analysis/summary.py --metric network_time --mode box-opt potok
+  python analysis/summary.py --db path/to/bench.db --full --csv out.csv
+"""
+
+import argparse, csv, sqlite3, sys
+import datetime as dt
+from itertools import groupby
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_DB = Path("results/bench_new.db")
+
+GROUP_COLS = ("mode", "d", "k", "noise", "corr")
+SUMMARY_METRICS = ("encode_time", "anneal_time", "network_time",
+                   "total_time", "wall_time", "error")
+STAT_COLS = ("n", "mean", "median", "p90", "p99", "q1", "q3", "iqr",
+             "ci_lo", "ci_hi")
+
+_KEY = ", ".join(GROUP_COLS)
+_NEW = ", ".join(f"NEW.{c}" for c in GROUP_COLS)
+_OLD = ", ".join(f"OLD.{c}" for c in GROUP_COLS)
+_SAME = " AND ".join(f"t.{c} IS s.{c}" for c in GROUP_COLS)   # NULL‑safe
+
+SUMMARY_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS summary (
+    mode    TEXT,
+    d       INTEGER,
+    k       INTEGER,
+    noise   REAL,
+    corr    REAL,
+    metric  TEXT,
+    n       INTEGER,
+    mean    REAL,
+    median  REAL,
+    p90     REAL,
+    p99     REAL,
+    q1      REAL,
+    q3      REAL,
+    iqr     REAL,
+    ci_lo   REAL,          -- bootstrap 95 % CI of the median
+    ci_hi   REAL,
+    updated TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_summary_group ON summary ({_KEY}, metric);
+
+CREATE TABLE IF NOT EXISTS summary_dirty ({_KEY});
+
+CREATE TRIGGER IF NOT EXISTS trg_runs_insert_dirty AFTER INSERT ON runs
+BEGIN
+    INSERT INTO summary_dirty ({_KEY}) VALUES ({_NEW});
+END;
+CREATE TRIGGER IF NOT EXISTS trg_runs_delete_dirty AFTER DELETE ON runs
+BEGIN
+    INSERT INTO summary_dirty ({_KEY}) VALUES ({_OLD});
+END;
+"""
+
+
+def ensure_summary(conn):
+    """Create summary tables / triggers; a new summary starts all‑dirty."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                          "AND name = 'summary'").fetchone()
+    conn.executescript(SUMMARY_SCHEMA)
+    if not exists:
+        with conn:
+            conn.execute(f"INSERT INTO summary_dirty SELECT DISTINCT {_KEY} FROM runs")
+
+
+def median_ci(v_sorted, alpha=0.05):
+    """
+    Percentile‑bootstrap CI of the median, computed exactly instead of by
+    resampling: a resample's k‑th order statistic is ≤ v_(j) iff at least k
+    of its n draws hit v_(1..j), i.e.  P = P(Binom(n, j/n) ≥ k) = I_{j/n}(k, n-k+1).
+    For even n the two middle order statistics bound the CI (slightly
+    conservative).
+    """
+    from scipy.special import betainc           # only needed when refreshing
+    n = len(v_sorted)
+    p = np.arange(1, n + 1) / n
+    k_lo, k_hi = (n + 1) // 2, n // 2 + 1
+    F_lo = betainc(k_lo, n - k_lo + 1, p)
+    F_hi = betainc(k_hi, n - k_hi + 1, p)
+    return (v_sorted[min(np.searchsorted(F_lo, alpha / 2), n - 1)],
+            v_sorted[min(np.searchsorted(F_hi, 1 - alpha / 2), n - 1)])
+
+
+def robust_stats(values):
+    """Row of STAT_COLS for a 1‑d sample."""
+    v = np.sort(np.asarray(values, dtype=float))
+    q1, med, q3, p90, p99 = np.percentile(v, [25, 50, 75, 90, 99])
+    ci_lo, ci_hi = median_ci(v)
+    return (len(v), float(v.mean()), float(med), float(p90), float(p99),
+            float(q1), float(q3), float(q3 - q1), float(ci_lo), float(ci_hi))
+
+
+def refresh_summary(conn, full=False):
+    """
+    Recompute the summary rows of the dirty groups (all groups if `full`).
+    Returns the number of groups refreshed.
+    """
+    ensure_summary(conn)
+    ts = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None).isoformat(timespec="seconds")
+    cols = ", ".join(f"t.{m}" for m in SUMMARY_METRICS)
+    with conn:
+        if full:
+            conn.execute("DELETE FROM summary_dirty")
+            conn.execute(f"INSERT INTO summary_dirty SELECT DISTINCT {_KEY} FROM runs")
+        conn.execute(f"CREATE TEMP TABLE dirty AS SELECT DISTINCT {_KEY} FROM summary_dirty")
+        n_groups = conn.execute("SELECT COUNT(*) FROM dirty").fetchone()[0]
+
+        rows = conn.execute(f"""
+            SELECT {", ".join(f"t.{c}" for c in GROUP_COLS)}, {cols}
+              FROM results t JOIN dirty s ON {_SAME}
+             ORDER BY {", ".join(f"t.{c}" for c in GROUP_COLS)}
+        """)
+        out = []
+        g = len(GROUP_COLS)
+        for key, grp in groupby(rows, key=lambda r: r[:g]):
+            grp = [r[g:] for r in grp]
+            for j, metric in enumerate(SUMMARY_METRICS):
+                vals = [r[j] for r in grp if r[j] is not None]
+                if vals:
+                    out.append(key + (metric,) + robust_stats(vals) + (ts,))
+
+        conn.execute(f"DELETE FROM summary AS t WHERE EXISTS "
+                     f"(SELECT 1 FROM dirty s WHERE {_SAME})")
+        conn.executemany(
+            f"INSERT INTO summary ({_KEY}, metric, {', '.join(STAT_COLS)}, updated) "
+            f"VALUES ({', '.join('?' * (len(GROUP_COLS) + len(STAT_COLS) + 2))})", out)
+        conn.execute("DELETE FROM summary_dirty")
+        conn.execute("DROP TABLE dirty")
+    return n_groups
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Robust per‑configuration statistics")
+    ap.add_argument("--db",     default=DEFAULT_DB, type=Path, help="bench.db path")
+    ap.add_argument("--metric", default="total_time", choices=SUMMARY_METRICS)
+    ap.add_argument("--mode",   nargs="*", help="restrict to these modes")
+    ap.add_argument("--full",   action="store_true", help="recompute every group")
+    ap.add_argument("--csv",    metavar="FILE", help="write CSV instead of table")
+    args = ap.parse_args()
+
+    if not args.db.exists():
+        sys.exit(f"[err] DB not found: {args.db}")
+
+    conn = sqlite3.connect(args.db)
+    try:
+        refresh_summary(conn, full=args.full)
+        q = f"SELECT {_KEY}, {', '.join(STAT_COLS)} FROM summary WHERE metric = ?"
+        params = [args.metric]
+        if args.mode:
+            q += f" AND mode IN ({','.join('?' * len(args.mode))})"
+            params += args.mode
+        q += f" ORDER BY {_KEY}"
+        cur = conn.execute(q, params)
+        hdr = [c[0] for c in cur.description]
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    if not rows:
+        sys.exit(f"[err] no '{args.metric}' rows in {args.db}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(hdr);  w.writerows(rows)
+        print(f"✓ CSV written to {args.csv}")
+    else:
+        col_hdr = ("{:<18} {:>5} {:>3} {:>6} {:>5} {:>5} "
+                   "{:>10} {:>10} {:>10} {:>10} {:>21}")
+        col_row = ("{:<18} {:>5} {:>3} {:>6} {:>5} {:>5d} "
+                   "{:>10.4g} {:>10.4g} {:>10.4g} {:>10.4g} {:>10.4g}–{:<10.4g}")
+        print(f"{args.metric}")
+        print(col_hdr.format("mode", "d", "K", "noise", "corr", "n",
+                             "median", "p90", "p99", "iqr", "median 95% CI"))
+        print("-" * 112)
+        for mode, d, k, noise, corr, n, mean, med, p90, p99, q1, q3, iqr, lo, hi in rows:
+            print(col_row.format(mode, d, "-" if k is None else k, noise, corr, n,
+                                 med, p90, p99, iqr, lo, hi))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+trace_summary.py  –  what the per-iteration traces say about beta / max_iter / timeout
+
+Reads the <csv stem>.trace.npz sidecars written with `main.py --trace`
+(models/trace.py) and reports per file and d
+
+    runs         traced runs
+    iters        mean iterations
+    contract     fraction of iterations that contracted the box
+    tail         mean iterations after the last accepted step (wasted)
+    it_1e-3      mean iterations until the energy is within 1e-3 (relative)
+                 of the run's final energy
+    enc/ann/net  median per-iteration encode / anneal / network seconds
+
+Usage
+-----
+  python analysis/trace_summary.py results/varying_20250101
+  python analysis/trace_summary.py run_dir --csv traces.csv
+"""
+
+import argparse, csv, sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from models.trace import load_traces
+
+
+def summarise_run(t):
+    """Per-run statistics of one trace (rows of a single result row)."""
+    acc = np.flatnonzero(t["accepted"])
+    tail = len(t) - 1 - acc[-1] if len(acc) else len(t)
+    E, E_end = t["energy"], t["energy"][-1]
+    close = np.abs(E - E_end) <= 1e-3 * max(abs(E_end), 1e-12)
+    return {
+        "iters": len(t),
+        "contract": 1.0 - len(acc) / len(t),
+        "tail": tail,
+        "it_1e-3": int(t["it"][np.argmax(close)]),
+    }
+
+
+def summarise_file(path):
+    trace = load_traces(path)
+    rows = []
+    for d in np.unique(trace["d"]):
+        td = trace[trace["d"] == d]
+        runs = [summarise_run(td[td["row"] == r]) for r in np.unique(td["row"])]
+        rows.append({
+            "file": path.name,
+            "d": int(d),
+            "runs": len(runs),
+            **{k: float(np.mean([r[k] for r in runs])) for k in runs[0]},
+            "enc_med": float(np.median(td["encode_time"])),
+            "ann_med": float(np.median(td["anneal_time"])),
+            "net_med": float(np.median(td["network_time"])),
+        })
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Summarise per-iteration box traces")
+    ap.add_argument("dir", type=Path, help="directory with *.trace.npz files")
+    ap.add_argument("--csv", metavar="FILE", help="write CSV instead of table")
+    args = ap.parse_args()
+
+    files = sorted(args.dir.glob("*.trace.npz"))
+    if not files:
+        sys.exit(f"[err] no *.trace.npz in {args.dir}")
+    rows = [r for f in files for r in summarise_file(f)]
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, rows[0].keys())
+            w.writeheader();  w.writerows(rows)
+        print(f"✓ CSV written to {args.csv}")
+    else:
+        col_hdr = "{:<36} {:>5} {:>5} {:>7} {:>9} {:>6} {:>8} {:>9} {:>9} {:>9}"
+        col_row = "{:<36} {:>5d} {:>5d} {:>7.1f} {:>9.2f} {:>6.1f} {:>8.1f} {:>9.2e} {:>9.2e} {:>9.2e}"
+        print(col_hdr.format("file", "d", "runs", "iters", "contract", "tail",
+                             "it_1e-3", "enc_med", "ann_med", "net_med"))
+        print("-" * 112)
+        for r in rows:
+            print(col_row.format(*r.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmark/box_block.py
+from data.data_generator import generate_synthetic_regression
+from models.box_block import solve_box_block_amplify
+from benchmark.result_logger import ResultLogger
+from models.spans import span, memory_scope
+from benchmark.warm_start import solve_warm, pin_previous
+from benchmark.timing import repeated, rep_columns, SOLVE_TIMES
+from models.scaling import with_scaling
+
+
+def run_box_block_grid(
+    dims,
+    noise,
+    corr,
+    seed,
+    max_iter,
+    num_solves,
+    timeout_ms,
+    block_size,
+    selection,
+    n_parallel,
+    outfile,
+    schedule=None,
+    warm=None,
+    fix_persistent=False,
+    scaling=None,
+    trace=False,
+    reps=None,
+):
+    logger = ResultLogger(outfile)
+
+    for d in dims:
+        n = 10 * d
+        with memory_scope() as dmem:
+            with span("datagen", d=d, n=n):
+                data = generate_synthetic_regression(
+                    n=n, d=d, noise_sigma=noise,
+                    feature_corr=corr if corr > 0 else None,
+                    seed=seed,
+                )
+            with span("gram"):
+                A = data.X_train.T @ data.X_train
+                b = data.X_train.T @ data.y_train
+
+        key = (d, noise, corr, seed)
+        cell_warm = pin_previous(warm, key)
+        with memory_scope() as mem, span("run", mode="box-block", d=d):
+            res = repeated(lambda: solve_warm(
+                with_scaling(solve_box_block_amplify, scaling),
+                A=A,
+                b=b,
+                key=key,
+                warm=cell_warm,
+                block_size=block_size,
+                selection=selection,
+                n_parallel=n_parallel,
+                max_iter=max_iter,
+                num_solves=num_solves,
+                timeout_ms=timeout_ms,
+                seed=seed,
+                trace=trace,
+                fix_persistent=fix_persistent,
+                **(schedule or {}),
+            ), **(reps or {}))
+
+        logger.add(
+            mode="box-block" + (f"+{scaling}" if scaling else ""),
+            d=d,
+            n=n,
+            block_size=min(block_size, d),
+            iterations=res["iterations"],
+            anneal_calls=res["anneal_calls"],
+            fixed_frac=res["fixed_frac"],
+            encode_time=res["encode_time"],
+            anneal_time=res["anneal_time"],
+            polish_time=res["polish_time"],
+            total_time=res["total_time"],
+            wall_time=res["wall_time"],
+            network_time=res["network_time"],
+            error=res["error"],
+            stop_reason=res["stop_reason"],
+            init=res["init"],
+            init_time=res["init_time"],
+            scale_time=res.get("scale_time", 0.0),
+            iters_to_target=res["iters_to_target"],
+            time_to_target=res["time_to_target"],
+            anneal_calls_saved=res["anneal_calls_saved"],
+            **rep_columns(res, *SOLVE_TIMES),
+            **mem.columns(dmem),
+        )
+        if trace:
+            logger.add_trace(d, res["trace"])
+
+        print(
+            f"box-block d={d:3}  iters={res['iterations']:3}  "
+            f"solves={res['anneal_calls']:3}  "
+            f"total={res['total_time']:.2f}s  wall={res['wall_time']:.2f}s  "
+            f"err={res['error']:.2e}  stop={res['stop_reason']}"
+        )
+
+    logger.flush()
+    return outfile
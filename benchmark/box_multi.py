@@ -0,0 +1,101 @@
+# benchmark/box_multi.py
+import numpy as np
+
+from data.data_generator import generate_synthetic_regression
+from models.box_opt import solve_box_opt_amplify_multi
+from benchmark.result_logger import ResultLogger
+from models.spans import span, memory_scope
+from benchmark.timing import repeated, rep_columns, SOLVE_TIMES
+
+
+def _targets(data, n_targets, noise, seed):
+    """y_train plus n_targets-1 extra outputs on the same design."""
+    rng = np.random.default_rng(seed + 1)
+    X = data.X_train
+    W = rng.standard_normal((X.shape[1], n_targets - 1))
+    extra = X @ W + rng.normal(0.0, noise, size=(X.shape[0], n_targets - 1))
+    return np.column_stack([data.y_train, extra])
+
+
+def run_box_multi_grid(
+    dims,
+    noise,
+    corr,
+    seed,
+    n_targets,
+    max_iter,
+    num_solves,
+    timeout_ms,
+    outfile,
+    batch=True,
+    schedule=None,
+    reps=None,
+):
+    """
+    One multi-target box-opt run per d: `n_targets` right-hand sides share
+    the design and the quadratic template.  One row per target; shared
+    template/encode cost is also logged per target (`*_per_target`).
+    `reps` (warmup / repeats / min_time, benchmark/timing.py) measures each
+    d in process; timings are then medians with *_mad / *_min columns.
+    """
+    logger = ResultLogger(outfile)
+
+    for d in dims:
+        n = 10 * d
+        with memory_scope() as dmem:
+            with span("datagen", d=d, n=n):
+                data = generate_synthetic_regression(
+                    n=n, d=d, noise_sigma=noise,
+                    feature_corr=corr if corr > 0 else None,
+                    seed=seed,
+                )
+            Y = _targets(data, n_targets, noise, seed)
+            with span("gram"):
+                A = data.X_train.T @ data.X_train
+                B = data.X_train.T @ Y
+
+        with memory_scope() as mem, span("run", mode="box-multi", d=d):
+            res = repeated(lambda: solve_box_opt_amplify_multi(
+                A,
+                B,
+                max_iter=max_iter,
+                num_solves=num_solves,
+                timeout_ms=timeout_ms,
+                seed=seed,
+                batch=batch,
+                **(schedule or {}),
+            ), **(reps or {}))
+
+        for k in range(n_targets):
+            logger.add(
+                mode="box-multi",
+                d=d,
+                n=n,
+                target=k,
+                n_targets=n_targets,
+                batch=int(batch),
+                iterations=res["iterations"][k],
+                anneal_calls=res["anneal_calls"],
+                template_time=res["template_time"],
+                template_time_per_target=res["template_time"] / n_targets,
+                encode_time=res["encode_time"],
+                encode_time_per_target=res["encode_time"] / n_targets,
+                anneal_time=res["anneal_time"],
+                polish_time=res["polish_time"],
+                total_time=res["total_time"],
+                wall_time=res["wall_time"],
+                network_time=res["network_time"],
+                error=res["errors"][k],
+                stop_reason=res["stop_reasons"][k],
+                **rep_columns(res, *SOLVE_TIMES),
+                **mem.columns(dmem),
+            )
+
+        print(
+            f"box-multi d={d:3}  targets={n_targets}  solves={res['anneal_calls']:3}  "
+            f"template={res['template_time']:.2f}s  total={res['total_time']:.2f}s  "
+            f"max_err={max(res['errors']):.2e}"
+        )
+
+    logger.flush()
+    return outfile
@@ -4,7 +4,11 @@ from data.data_generator import (
 from models.box_naive import (
     solve_box_naive_amplify,
 )
+from models.scaling import with_scaling
 from .result_logger import ResultLogger
+from .warm_start import solve_warm, pin_previous
+from .timing import repeated, rep_columns, SOLVE_TIMES
+from models.spans import span, memory_scope
 
 
 def run_box_amplify_grid(
@@ -16,48 +20,88 @@ def run_box_amplify_grid(
     num_solves,
     timeout_ms,
     outfile,
+    schedule=None,
+    warm=None,
+    scaling=None,
+    trace=False,
+    reps=None,
 ):
     """
     Adds rows: mode='box-naive', d, n, iterations, encode_time, anneal_time,
-               total_time (no network), wall_time (incl. network), error
+               polish_time, total_time (no network), wall_time (incl. network), error,
+               stop_reason, init, init_time, iters_to_target,
+               time_to_target, anneal_calls_saved
+    `schedule` holds optional TrustRegion / StopRule / polish arguments,
+    `warm` the warm‑start options (see benchmark/warm_start.py).
+    `scaling` ("jacobi" | "cholesky", models/scaling.py) solves the scaled
+    problem; such rows carry mode 'box-naive+<scaling>'.  `trace` writes
+    each run's per‑iteration log to <outfile stem>.trace.npz (models/trace.py).
+    `reps` (warmup / repeats / min_time, benchmark/timing.py) measures each
+    d in process; timings are then medians with *_mad / *_min columns.
     """
     logger = ResultLogger(outfile)
 
     for d in dims:
         n = 10 * d
-        data = generate_synthetic_regression(
-            n=n,
-            d=d,
-            noise_sigma=noise,
-            feature_corr=corr if corr > 0 else None,
-            seed=seed,
-        )
+        with memory_scope() as dmem:
+            with span("datagen", d=d, n=n):
+                data = generate_synthetic_regression(
+                    n=n,
+                    d=d,
+                    noise_sigma=noise,
+                    feature_corr=corr if corr > 0 else None,
+                    seed=seed,
+                )
+            with span("gram"):
+                A = data.X_train.T @ data.X_train
+                b = data.X_train.T @ data.y_train
 
-        res = solve_box_naive_amplify(
-            A=data.X_train.T @ data.X_train,
-            b=data.X_train.T @ data.y_train,
-            max_iter=max_iter,
-            num_solves=num_solves,
-            timeout_ms=timeout_ms,
-            seed=seed,
-        )
+        key = (d, noise, corr, seed)
+        cell_warm = pin_previous(warm, key)
+        with memory_scope() as mem, span("run", mode="box-naive", d=d):
+            res = repeated(lambda: solve_warm(
+                with_scaling(solve_box_naive_amplify, scaling),
+                A=A,
+                b=b,
+                key=key,
+                warm=cell_warm,
+                max_iter=max_iter,
+                num_solves=num_solves,
+                timeout_ms=timeout_ms,
+                trace=trace,
+                seed=seed,
+                **(schedule or {}),
+            ), **(reps or {}))
 
         logger.add(
-            mode="box-naive",
+            mode="box-naive" + (f"+{scaling}" if scaling else ""),
             d=d,
             n=n,
             iterations=res["iterations"],
-            encode_time=round(res["encode_time"], 4),
-            anneal_time=round(res["anneal_time"], 4),
-            total_time=round(res["total_time"], 4),   # network‑free
-            wall_time=round(res["wall_time"], 4),     # includes network
-            error=f"{res['error']:.2e}",
+            encode_time=res["encode_time"],
+            anneal_time=res["anneal_time"],
+            polish_time=res["polish_time"],
+            total_time=res["total_time"],   # network‑free
+            wall_time=res["wall_time"],     # includes network
+            network_time=res["network_time"],
+            error=res["error"],
+            stop_reason=res["stop_reason"],
+            init=res["init"],
+            init_time=res["init_time"],
+            scale_time=res.get("scale_time", 0.0),
+            iters_to_target=res["iters_to_target"],
+            time_to_target=res["time_to_target"],
+            anneal_calls_saved=res["anneal_calls_saved"],
+            **rep_columns(res, *SOLVE_TIMES),
+            **mem.columns(dmem),
         )
+        if trace:
+            logger.add_trace(d, res["trace"])
 
         print(
             f"box-naive d={d:3}  iters={res['iterations']:3}  "
             f"total={res['total_time']:.2f}s  wall={res['wall_time']:.2f}s  "
-            f"err={res['error']:.2e}"
+            f"err={res['error']:.2e}  stop={res['stop_reason']}"
         )
 
     logger.flush()
@@ -1,7 +1,13 @@
 # benchmark/box_opt.py
+import os
+
 from data.data_generator import generate_synthetic_regression
 from models.box_opt import solve_box_opt_amplify
 from benchmark.result_logger import ResultLogger
+from models.spans import span, memory_scope
+from benchmark.warm_start import solve_warm, pin_previous
+from benchmark.timing import repeated, rep_columns, SOLVE_TIMES
+from models.scaling import with_scaling
 
 
 def run_box_opt_grid(
@@ -13,43 +19,103 @@ def run_box_opt_grid(
     num_solves,
     timeout_ms,
     outfile,
+    schedule=None,
+    warm=None,
+    prune_rels=(0.0,),
+    prune_topk=None,
+    fix_persistent=False,
+    export_qubo=None,
+    scaling=None,
+    trace=False,
+    reps=None,
 ):
+    """
+    One box-opt run per d and per coupling-pruning level in `prune_rels`
+    (0 = exact QUBO); `prune_topk` additionally keeps only the k strongest
+    couplings per feature.  `fix_persistent` removes provably determined
+    binaries before every submission.  `export_qubo` is a directory that
+    receives each iteration's QUBO (models/qubo_io.py), one subdirectory per run.
+    `scaling` ("jacobi" | "cholesky") solves the scaled problem
+    (models/scaling.py); such rows carry mode 'box-opt+<scaling>'.  `trace`
+    writes each run's per‑iteration log to <outfile stem>.trace.npz.
+    `reps` (warmup / repeats / min_time, benchmark/timing.py) measures each
+    cell in process; timings are then medians with *_mad / *_min columns.
+    """
     logger = ResultLogger(outfile)
 
     for d in dims:
         n = 10 * d
-        data = generate_synthetic_regression(
-            n=n, d=d, noise_sigma=noise,
-            feature_corr=corr if corr > 0 else None,
-            seed=seed,
-        )
-
-        res = solve_box_opt_amplify(
-            A=data.X_train.T @ data.X_train,
-            b=data.X_train.T @ data.y_train,
-            max_iter=max_iter,
-            num_solves=num_solves,
-            timeout_ms=timeout_ms,
-            seed=seed,
-        )
-
-        logger.add(
-            mode="box-opt",
-            d=d,
-            n=n,
-            iterations=res["iterations"],
-            encode_time=round(res["encode_time"], 4),
-            anneal_time=round(res["anneal_time"], 4),
-            total_time=round(res["total_time"], 4),
-            wall_time=round(res["wall_time"], 4),
-            error=f"{res['error']:.2e}",
-        )
-
-        print(
-            f"box-opt  d={d:3}  iters={res['iterations']:3}  "
-            f"total={res['total_time']:.2f}s  wall={res['wall_time']:.2f}s  "
-            f"err={res['error']:.2e}"
-        )
+        with memory_scope() as dmem:
+            with span("datagen", d=d, n=n):
+                data = generate_synthetic_regression(
+                    n=n, d=d, noise_sigma=noise,
+                    feature_corr=corr if corr > 0 else None,
+                    seed=seed,
+                )
+            with span("gram"):
+                A = data.X_train.T @ data.X_train
+                b = data.X_train.T @ data.y_train
+
+        key = (d, noise, corr, seed)
+        for prune_rel in prune_rels:
+            cell_warm = pin_previous(warm, key)
+            with memory_scope() as mem, span("run", mode="box-opt", d=d, prune_rel=prune_rel):
+                res = repeated(lambda: solve_warm(
+                    with_scaling(solve_box_opt_amplify, scaling),
+                    A=A,
+                    b=b,
+                    key=key,
+                    warm=cell_warm,
+                    max_iter=max_iter,
+                    num_solves=num_solves,
+                    timeout_ms=timeout_ms,
+                    seed=seed,
+                    prune_rel=prune_rel or None,
+                    prune_topk=prune_topk,
+                    fix_persistent=fix_persistent,
+                    export_dir=export_qubo and os.path.join(
+                        export_qubo, f"box-opt_d{d}_seed{seed}_prune{prune_rel:g}"),
+                    trace=trace,
+                    **(schedule or {}),
+                ), **(reps or {}))
+
+            logger.add(
+                mode="box-opt" + (f"+{scaling}" if scaling else ""),
+                d=d,
+                n=n,
+                prune_rel=prune_rel,
+                prune_topk=prune_topk,
+                qubo_nnz=res["qubo_nnz"],
+                prune_bound=res["prune_bound"],
+                iterations=res["iterations"],
+                anneal_calls=res["anneal_calls"],
+                fixed_frac=res["fixed_frac"],
+                encode_time=res["encode_time"],
+                anneal_time=res["anneal_time"],
+                polish_time=res["polish_time"],
+                total_time=res["total_time"],
+                wall_time=res["wall_time"],
+                network_time=res["network_time"],
+                error=res["error"],
+                stop_reason=res["stop_reason"],
+                init=res["init"],
+                init_time=res["init_time"],
+                scale_time=res.get("scale_time", 0.0),
+                iters_to_target=res["iters_to_target"],
+                time_to_target=res["time_to_target"],
+                anneal_calls_saved=res["anneal_calls_saved"],
+                **rep_columns(res, *SOLVE_TIMES),
+                **mem.columns(dmem),
+            )
+            if trace:
+                logger.add_trace(d, res["trace"])
+
+            print(
+                f"box-opt  d={d:3}  iters={res['iterations']:3}  "
+                f"total={res['total_time']:.2f}s  wall={res['wall_time']:.2f}s  "
+                f"err={res['error']:.2e}  stop={res['stop_reason']}  "
+                f"prune={prune_rel:g}  nnz={res['qubo_nnz']}"
+            )
 
     logger.flush()
     return outfile
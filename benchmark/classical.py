@@ -9,7 +9,9 @@ from data.data_generator import (
     generate_synthetic_regression,
 )
 from models import classical as M
+from models.spans import span, memory_scope
 from .result_logger import ResultLogger
+from .timing import repeated, rep_columns
 
 
 MODEL_FUNCS = {
@@ -27,23 +29,34 @@ def run_classical_grid(
     seed,
     models,
     outfile,
+    reps=None,
 ):
     """
     Runs (model, d) grid.  Writes CSV via ResultLogger, returns path.
+    `reps` (warmup / repeats / min_time, benchmark/timing.py) repeats each
+    fit in process; sub‑millisecond fits are looped up to min_time.
     """
     logger = ResultLogger(outfile)
 
     for d, model_key in product(dims, models):
         n = 10 * d
-        data = generate_synthetic_regression(
-            n=n, d=d, noise_sigma=noise,
-            feature_corr=corr if corr > 0 else None,
-            seed=seed,
-        )
+        with memory_scope() as dmem:
+            with span("datagen", d=d, n=n):
+                data = generate_synthetic_regression(
+                    n=n, d=d, noise_sigma=noise,
+                    feature_corr=corr if corr > 0 else None,
+                    seed=seed,
+                )
 
         train_fn = MODEL_FUNCS[model_key]
-        model, train_time = train_fn(data.X_train, data.y_train)
-        metrics = M.evaluate(model, data.X_test, data.y_test)
+
+        def fit():
+            model, train_time = train_fn(data.X_train, data.y_train)
+            return {"train_time": train_time, **M.evaluate(model, data.X_test, data.y_test)}
+
+        with memory_scope() as mem, span("run", mode=model_key, d=d):
+            metrics = repeated(fit, **(reps or {}))
+        train_time = metrics["train_time"]
 
         logger.add(
             model=model_key,
@@ -52,10 +65,12 @@ def run_classical_grid(
             noise=noise,
             corr=corr,
             seed=seed,
-            train_time=round(train_time, 6),
-            predict_time=round(metrics["predict_time"], 6),
-            r2=round(metrics["r2"], 6),
-            mse=round(metrics["mse"], 6),
+            train_time=train_time,
+            predict_time=metrics["predict_time"],
+            r2=metrics["r2"],
+            mse=metrics["mse"],
+            **rep_columns(metrics, "train_time", "predict_time"),
+            **mem.columns(dmem),
         )
 
         print(
@@ -0,0 +1,373 @@
+# benchmark/encode_bench.py
+"""
+Offline encode‑path microbenchmarks: QUBO construction only, no solver call
+(no AE_KEY needed).
+
+Each case times the code the solver runs inside its `encode` (or
+`template`) span, on one SPD matrix per (d, density) from
+models.sparse_box.build_spd_csr:
+
+    box-naive                 fresh variables + full energy Poly      O(d²)
+    box-naive-sparse          same over the cached COO triangle       O(nnz)
+    box-opt                   linear block + prebuilt template        O(d) + Model
+    box-opt-template          quadratic template (once per run)       O(d²)
+    box-opt-sparse            box-opt on the sparse template
+    box-opt-sparse-template   sparse quadratic template               O(nnz)
+    potok                     symbolic Potok objective, K bits        O(d²K²)
+    potok-iter                iterative Potok round: linear g⊗P / R → Model
+
+Every cell gets warm‑up calls, `repeat` autoranged samples and median /
+IQR / min per call (benchmark/timing.py).  Per case and density the
+medians are fitted as t ≈ a·d^p.  A case is skipped for larger d once its
+extrapolated cold call exceeds --max_case_s (or its one‑time setup, e.g.
+the template box-opt encodes against, exceeds --max_setup_s), so the
+default 4…4096 sweep finishes in minutes; raise them for full curves.
+
+Usage
+-----
+  python -m benchmark.encode_bench --save results/encode_baseline.json
+  python -m benchmark.encode_bench --dims 16 64 256 --cases box-opt box-naive
+  python -m benchmark.encode_bench --compare results/encode_baseline.json   # exit 1 on regression
+
+A regression is a case whose geometric‑mean median ratio over its cells
+exceeds 1 + --threshold (see `compare`).
+"""
+
+import argparse, csv, json, platform, sys, time
+from datetime import datetime, timezone
+from functools import cached_property, partial
+from pathlib import Path
+
+import numpy as np
+from amplify import Model
+
+from models.box_naive import _encode_box
+from models.box_naive_sparse import _encode_box_sparse
+from models.box_opt import _build_amplify_primitives, _box_model
+from models.box_opt_sparse import _build_amplify_primitives_sparse
+from models.box_qubo import to_amplify_matrix
+from models.potok import _symbolic_model, potok_qubo_matrices, signed_p_vector
+from models.sparse_box import build_spd_csr, cache_upper_triangle_coo
+from benchmark.timing import measure
+
+DEFAULT_DIMS = (4, 16, 64, 256, 1024, 4096)
+DEFAULT_DENSITIES = (0.05, 0.25, 1.0)
+
+
+# ------------------------------------------------------------------ #
+#   Problem instances
+# ------------------------------------------------------------------ #
+
+class _Problem:
+    """One (d, density) instance; templates are built lazily and shared by the cases."""
+
+    def __init__(self, d, density, K=4, seed=0):
+        rng = np.random.default_rng(seed)
+        self.d, self.density = d, density
+        self.A_csr = build_spd_csr(d, density, rng)
+        self.A = self.A_csr.toarray()
+        self.b = rng.normal(size=d)
+        self.c = 0.1 * rng.normal(size=d)       # off‑centre, so every coefficient is live
+        self.L = 0.5
+        self.P = np.array(signed_p_vector(K), dtype=float)
+        self.offdiag_nnz = (self.A_csr.nnz - d) // 2
+
+    @cached_property
+    def coo(self):
+        return cache_upper_triangle_coo(self.A_csr)
+
+    @cached_property
+    def template(self):
+        return _build_amplify_primitives(self.A)
+
+    @cached_property
+    def template_sparse(self):
+        return _build_amplify_primitives_sparse(self.A_csr)
+
+    @cached_property
+    def Q_unit(self):
+        return potok_qubo_matrices(self.A, np.zeros(self.d), self.P)[0]
+
+
+def _opt_encode(A, b, c, L, template):
+    """The box-opt / box-opt-sparse encode span: coeff, zero mask, `_box_model`."""
+    _, dvec, quad_blk = template
+    d = len(b)
+    Ac = A @ c
+    A_inf = abs(A).sum(axis=1).max()
+    b_inf = np.abs(b).max()
+    coeff, absbuf, nz = np.empty(d), np.empty(d), np.empty(d, dtype=bool)
+
+    def encode():
+        np.subtract(Ac, b, out=coeff)
+        tol = 1e-12 * (A_inf * np.abs(c, out=absbuf).max() + b_inf)
+        np.greater(np.abs(coeff, out=absbuf), tol, out=nz)
+        return _box_model(coeff, nz, dvec, quad_blk, L)
+    return encode
+
+
+def _potok_round(A, b, c, R, Q_unit, unit):
+    """The encode span of one `solve_linreg_potok_iterative_amplify` round."""
+    m = to_amplify_matrix(Q_unit, np.zeros(len(Q_unit)))
+
+    def encode():
+        g = A @ c - b
+        m.linear = np.kron(g, unit) / R
+        return Model(m)
+    return encode
+
+
+# case → (problem → zero‑argument callable); anything computed before the
+# callable is returned counts as setup, not as encode time
+CASES = {
+    "box-naive":               lambda p: partial(_encode_box, p.A, p.b, p.c, p.L),
+    "box-naive-sparse":        lambda p: partial(_encode_box_sparse, *p.coo, p.b, p.c, p.L),
+    "box-opt":                 lambda p: _opt_encode(p.A, p.b, p.c, p.L, p.template),
+    "box-opt-template":        lambda p: partial(_build_amplify_primitives, p.A),
+    "box-opt-sparse":          lambda p: _opt_encode(p.A_csr, p.b, p.c, p.L, p.template_sparse),
+    "box-opt-sparse-template": lambda p: partial(_build_amplify_primitives_sparse, p.A_csr),
+    "potok":                   lambda p: partial(_symbolic_model, p.A, p.b, p.P),
+    "potok-iter":              lambda p: _potok_round(p.A, p.b, p.c, 1.0, p.Q_unit, p.P),
+}
+
+
+# ------------------------------------------------------------------ #
+#   Sweep
+# ------------------------------------------------------------------ #
+
+def _extrapolate(history, d):
+    """Cost at d from the last (d, seconds) points, growth exponent in [1, 4] (default 2)."""
+    if not history:
+        return 0.0
+    d1, t1 = history[-1]
+    p = 2.0
+    if len(history) > 1:
+        d0, t0 = history[-2]
+        if t0 > 0 and t1 > 0:
+            p = min(max(np.log(t1 / t0) / np.log(d1 / d0), 1.0), 4.0)
+    return t1 * (d / d1) ** p
+
+
+def run_encode_bench(
+    dims=DEFAULT_DIMS,
+    densities=DEFAULT_DENSITIES,
+    cases=None,
+    K=4,
+    warmup=1,
+    repeat=7,
+    min_time=2e-3,
+    max_case_s=1.0,
+    max_setup_s=10.0,
+    seed=0,
+    verbose=True,
+):
+    """
+    One row per (case, density, d) measured: median / iqr / mad / min / max
+    seconds per call, loops per sample, the cold first call, setup seconds
+    and the QUBO size (binaries, off‑diagonal nnz of A).
+    """
+    cases = list(cases or CASES)
+    rows = []
+    for density in densities:
+        calls = {name: [] for name in cases}     # (d, cold call seconds)
+        setups = {name: [] for name in cases}    # (d, setup seconds)
+        for d in sorted(dims):
+            todo = [name for name in cases
+                    if _extrapolate(calls[name], d) <= max_case_s
+                    and _extrapolate(setups[name], d) <= max_setup_s]
+            if verbose and len(todo) < len(cases):
+                print(f"  density={density:g} d={d}: skip "
+                      f"{', '.join(n for n in cases if n not in todo)} (budget)")
+            if not todo:
+                continue
+            prob = _Problem(d, density, K, seed)
+            for name in todo:
+                t0 = time.perf_counter()
+                fn = CASES[name](prob)
+                setup = time.perf_counter() - t0
+                stats = measure(fn, warmup=max(warmup, 1), repeat=repeat, min_time=min_time)
+                calls[name].append((d, stats["first"]))
+                setups[name].append((d, max(setup, 1e-9)))
+                bits = d * K if name.startswith("potok") else 2 * d
+                rows.append({
+                    "case": name, "density": density, "d": d,
+                    "qubo_vars": bits, "offdiag_nnz": prob.offdiag_nnz,
+                    "setup_s": setup, **stats,
+                })
+                if verbose:
+                    print(f"  {name:<24} density={density:<5g} d={d:5}  "
+                          f"median={stats['median']:.3e}s  iqr={stats['iqr']:.1e}  "
+                          f"loops={stats['loops']}")
+    return rows
+
+
+def fit_exponents(rows, min_d=16):
+    """Per (case, density): t ≈ a·d^p over medians at d >= min_d (None below two points)."""
+    groups = {}
+    for r in rows:
+        if r["d"] >= min_d and r["median"]:
+            groups.setdefault((r["case"], r["density"]), []).append((r["d"], r["median"]))
+    fits = []
+    for (case, density), pts in sorted(groups.items()):
+        if len(pts) < 2:
+            a = p = None
+        else:
+            d, t = np.log(np.array(pts)).T
+            p, log_a = np.polyfit(d, t, 1)
+            a, p = float(np.exp(log_a)), float(p)
+        fits.append({"case": case, "density": density, "points": len(pts),
+                     "d_max": max(x for x, _ in pts), "a": a, "exponent": p})
+    return fits
+
+
+# ------------------------------------------------------------------ #
+#   Baselines
+# ------------------------------------------------------------------ #
+
+def _meta(**settings):
+    try:
+        import amplify
+        amp = getattr(amplify, "__version__", "?")
+    except ImportError:
+        amp = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "amplify": amp,
+        "machine": f"{platform.system()} {platform.machine()} {platform.node()}",
+        **settings,
+    }
+
+
+def save_baseline(path, rows, fits, **settings):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"meta": _meta(**settings), "results": rows, "fits": fits},
+                               indent=1))
+    return path
+
+
+def load_baseline(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare(base_rows, rows, threshold=0.25):
+    """
+    Align by (case, density, d).  Returns (cells, cases): per cell the
+    median ratio and `slower` (more than `threshold` slower *and* even the
+    fastest sample slower than the baseline median); per case the geometric
+    mean ratio over its cells and `regression` when that exceeds
+    1 + threshold.  Single cells vary by ±50 % between processes (allocator
+    state), a changed encode path shifts the whole case, so only cases gate.
+    """
+    base = {(r["case"], r["density"], r["d"]): r for r in base_rows}
+    cells = []
+    for r in rows:
+        b = base.get((r["case"], r["density"], r["d"]))
+        if b is None or not b["median"]:
+            continue
+        ratio = r["median"] / b["median"]
+        cells.append({
+            "case": r["case"], "density": r["density"], "d": r["d"],
+            "base_median": b["median"], "median": r["median"], "ratio": ratio,
+            "slower": ratio > 1 + threshold and r["min"] > b["median"],
+        })
+    cases = []
+    for name in dict.fromkeys(c["case"] for c in cells):
+        mine = [c for c in cells if c["case"] == name]
+        gmean = float(np.exp(np.mean([np.log(c["ratio"]) for c in mine])))
+        cases.append({
+            "case": name, "cells": len(mine), "slower_cells": sum(c["slower"] for c in mine),
+            "ratio": gmean, "regression": gmean > 1 + threshold,
+        })
+    return cells, cases
+
+
+# ------------------------------------------------------------------ #
+#   CLI
+# ------------------------------------------------------------------ #
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline QUBO encode microbenchmarks")
+    ap.add_argument("--dims",        type=int,   nargs="+", default=list(DEFAULT_DIMS))
+    ap.add_argument("--densities",   type=float, nargs="+", default=list(DEFAULT_DENSITIES),
+                    help="off‑diagonal density of A")
+    ap.add_argument("--cases",       nargs="+", choices=list(CASES), default=list(CASES))
+    ap.add_argument("--K",           type=int,   default=4, help="Potok precision bits")
+    ap.add_argument("--warmup",      type=int,   default=1)
+    ap.add_argument("--repeat",      type=int,   default=7)
+    ap.add_argument("--min_time",    type=float, default=2e-3, help="seconds per sample (autorange)")
+    ap.add_argument("--max_case_s",  type=float, default=1.0,
+                    help="skip larger d once a cold call is extrapolated above this")
+    ap.add_argument("--max_setup_s", type=float, default=10.0,
+                    help="same for the one‑time setup (templates)")
+    ap.add_argument("--fit_min_d",   type=int,   default=16)
+    ap.add_argument("--seed",        type=int,   default=0)
+    ap.add_argument("--save",        metavar="JSON", help="write rows + fits as a baseline")
+    ap.add_argument("--compare",     metavar="JSON", help="baseline to check against")
+    ap.add_argument("--threshold",   type=float, default=0.25,
+                    help="relative median slow‑down that counts as a regression")
+    ap.add_argument("--csv",         metavar="FILE", help="also write the rows as CSV")
+    args = ap.parse_args()
+
+    rows = run_encode_bench(
+        dims=args.dims, densities=args.densities, cases=args.cases, K=args.K,
+        warmup=args.warmup, repeat=args.repeat, min_time=args.min_time,
+        max_case_s=args.max_case_s, max_setup_s=args.max_setup_s, seed=args.seed,
+    )
+    fits = fit_exponents(rows, args.fit_min_d)
+    # allocation‑heavy cells depend on what ran before them in the process,
+    # so a baseline is only comparable to the same sweep
+    sweep = {"dims": sorted(args.dims), "densities": args.densities, "cases": args.cases,
+             "K": args.K, "repeat": args.repeat, "min_time": args.min_time}
+
+    fmt = lambda x, spec=".2e": "-" if x is None else f"{x:{spec}}"
+    col_hdr = "{:<24} {:>7} {:>7} {:>8} {:>8} {:>10} {:>10}"
+    print("\n" + col_hdr.format("case", "density", "points", "d_max", "exponent", "a", "t(d_max)"))
+    print("-" * 80)
+    for f in fits:
+        t_max = next(r["median"] for r in rows if (r["case"], r["density"], r["d"])
+                     == (f["case"], f["density"], f["d_max"]))
+        print(col_hdr.format(f["case"], f"{f['density']:g}", f["points"], f["d_max"],
+                             fmt(f["exponent"], ".2f"), fmt(f["a"]), fmt(t_max)))
+
+    if args.csv:
+        Path(args.csv).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.csv, "w", newline="") as fh:
+            w = csv.DictWriter(fh, rows[0].keys())
+            w.writeheader();  w.writerows(rows)
+        print(f"✓ CSV written to {args.csv}")
+    if args.save:
+        path = save_baseline(args.save, rows, fits, seed=args.seed, **sweep)
+        print(f"✓ baseline written to {path}")
+
+    if args.compare:
+        base = load_baseline(args.compare)
+        cells, cases = compare(base["results"], rows, args.threshold)
+        print(f"\nvs {args.compare} ({base['meta'].get('machine')}, {base['meta'].get('created')})")
+        differs = [k for k, v in sweep.items() if base["meta"].get(k, v) != v]
+        if differs:
+            print(f"[warn] baseline sweep differs in {', '.join(differs)}: "
+                  "timings depend on what ran before, compare like with like")
+        col_hdr = "{:<24} {:>7} {:>6} {:>11} {:>11} {:>7}"
+        print(col_hdr.format("case", "density", "d", "base", "now", "ratio"))
+        print("-" * 72)
+        for c in cells:
+            print(col_hdr.format(c["case"], f"{c['density']:g}", c["d"], fmt(c["base_median"]),
+                                 fmt(c["median"]), f"{c['ratio']:.2f}")
+                  + ("  slower" if c["slower"] else ""))
+
+        col_hdr = "{:<24} {:>6} {:>7} {:>10}"
+        print("\n" + col_hdr.format("case", "cells", "slower", "gmean"))
+        print("-" * 50)
+        for c in cases:
+            print(col_hdr.format(c["case"], c["cells"], c["slower_cells"], f"{c['ratio']:.2f}")
+                  + ("  ✗ regression" if c["regression"] else ""))
+        bad = [c["case"] for c in cases if c["regression"]]
+        if bad:
+            sys.exit(f"[err] encode slower than baseline by > {args.threshold:.0%}: {', '.join(bad)}")
+        print(f"✓ no regressions (threshold {args.threshold:.0%}, {len(cells)} cells)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmark/lambda_path.py
+from data.data_generator import generate_synthetic_regression
+from models.box_opt import solve_box_opt_amplify_path
+from models.potok import solve_linreg_potok_path
+from benchmark.result_logger import ResultLogger
+from models.spans import span, memory_scope
+
+
+def run_lambda_path_grid(
+    dims,
+    noise,
+    corr,
+    seed,
+    lambdas,
+    method,                  # "box" | "potok"
+    max_iter,
+    num_solves,
+    timeout_ms,
+    outfile,
+    K=3,
+    rounds=4,
+    radius=2.0,
+    schedule=None,
+):
+    """
+    Ridge regularisation path per d: one row per λ, each warm‑started from
+    the previous λ with the QUBO template built once (`template_time` is
+    non‑zero on the first row only).  Errors are against the ridge solution.
+    """
+    logger = ResultLogger(outfile)
+    mode = f"{method}-path"
+
+    for d in dims:
+        n = 10 * d
+        with memory_scope() as dmem:
+            with span("datagen", d=d, n=n):
+                data = generate_synthetic_regression(
+                    n=n, d=d, noise_sigma=noise,
+                    feature_corr=corr if corr > 0 else None,
+                    seed=seed,
+                )
+
+        with memory_scope() as mem, span("run", mode=mode, d=d):
+            if method == "box":
+                with span("gram"):
+                    A = data.X_train.T @ data.X_train
+                    b = data.X_train.T @ data.y_train
+                path = solve_box_opt_amplify_path(
+                    A,
+                    b,
+                    lambdas,
+                    max_iter=max_iter,
+                    num_solves=num_solves,
+                    timeout_ms=timeout_ms,
+                    seed=seed,
+                    **(schedule or {}),
+                )
+            elif method == "potok":
+                path = solve_linreg_potok_path(
+                    data.X_train,
+                    data.y_train,
+                    lambdas,
+                    K=K,
+                    rounds=rounds,
+                    radius=radius,
+                    num_solves=num_solves,
+                    timeout_ms=timeout_ms,
+                    seed=seed,
+                )
+            else:
+                raise ValueError(f"unknown path method '{method}'")
+
+        for res in path:
+            logger.add(
+                mode=mode,
+                d=d,
+                n=n,
+                lam=res["lam"],
+                start_size=res.get("L0", res.get("radius")),
+                iterations=res["iterations"],
+                template_time=res["template_time"],
+                encode_time=res["encode_time"],
+                anneal_time=res["anneal_time"],
+                total_time=res["total_time"],
+                wall_time=res["wall_time"],
+                network_time=res["network_time"],
+                error=res["error"],
+                **mem.columns(dmem),
+            )
+
+        print(
+            f"{mode}  d={d:3}  λs={len(path)}  "
+            f"iters={sum(r['iterations'] for r in path):3}  "
+            f"total={sum(r['total_time'] for r in path):.2f}s  "
+            f"max_err={max(r['error'] for r in path):.2e}"
+        )
+
+    logger.flush()
+    return outfile
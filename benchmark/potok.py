@@ -1,17 +1,30 @@
 # benchmark/potok.py
-from itertools import product
+import os
+import numpy as np
 
 from data.data_generator   import generate_synthetic_regression
-from models.potok          import solve_linreg_potok_amplify
+from models.potok          import (
+    solve_linreg_potok_amplify,
+    solve_linreg_potok_iterative_amplify,
+    signed_p_vector,
+    build_potok_template,
+)
+from models.scaling import scaling_transform, scale_design, unscale_result
 from benchmark.result_logger import ResultLogger
+from models.spans import span, memory_scope
+from benchmark.timing import repeated, rep_columns, SOLVE_TIMES
 
 
-def _default_p_vector(K):
+def _default_p_vector(K, signed=False, scale=2.0):
     """
     Build the canonical precision vector  (¼, ½, …, K·¼) used in the
     Date–Potok paper, e.g.  K=4  ->  (0.25, 0.5, 0.75, 1.0).
+    With `signed` use the two's‑complement vector over [-scale, scale)
+    instead, which can represent negative weights.
     Change this helper if you prefer a different rule.
     """
+    if signed:
+        return signed_p_vector(K, scale)
     step = 1.0 / 4.0
     return tuple(step * (i + 1) for i in range(K))
 
@@ -25,52 +38,130 @@ def run_potok_grid(
     num_solves,
     timeout_ms,
     outfile,
+    signed=False,
+    rounds=1,
+    radius=2.0,
+    prune_rels=(0.0,),
+    prune_topk=None,
+    export_qubo=None,
+    scaling=None,
+    reps=None,
 ):
     """
-    For every d in `dims` and every K in `precision_bits`[48;55;214;1870;2996t
+    For every d in `dims` and every K in `precision_bits`
     run the Potok QUBO solver with a K‑binary precision vector.
+    rounds > 1 switches to the iterative, re‑centred signed solver
+    (mode 'potok-iter'); `radius` is the signed grid half‑width.
+    Data, Gram matrix and the max‑K coefficient tensor are built once per d
+    (`template_time`) and every K slices its QUBO from them.
+    Each level in `prune_rels` (0 = exact) gets its own coupling‑pruned
+    template; `prune_topk` keeps only the k strongest couplings per feature.
+    `export_qubo` is a directory that receives each round's QUBO.
+    `scaling` ("jacobi" | "cholesky") fits the column‑scaled design X T
+    and maps w back (models/scaling.py); the scaling cost is added to
+    every row of that d and the mode gets a '+<scaling>' suffix.
+    `reps` (warmup / repeats / min_time, benchmark/timing.py) measures each
+    K in process; timings are then medians with *_mad / *_min columns.
     """
     logger = ResultLogger(outfile)
 
-    for d, K in product(dims, precision_bits):
+    for d in dims:
         n = 10 * d
-        data = generate_synthetic_regression(
-            n=n,
-            d=d,
-            noise_sigma=noise,
-            feature_corr=corr if corr > 0 else None,
-            seed=seed,
-        )
+        with memory_scope() as dmem:
+            with span("datagen", d=d, n=n):
+                data = generate_synthetic_regression(
+                    n=n,
+                    d=d,
+                    noise_sigma=noise,
+                    feature_corr=corr if corr > 0 else None,
+                    seed=seed,
+                )
 
-        P_vec = _default_p_vector(K)
+        X_fit, scale_time = data.X_train, 0.0
+        if scaling:
+            with span("scale", scaling=scaling) as sp:
+                T = scaling_transform(X_fit.T @ X_fit, scaling)
+                X_fit = scale_design(X_fit, T)
+            scale_time = sp.elapsed
+            exact = np.linalg.lstsq(data.X_train, data.y_train, rcond=None)[0]
 
-        res = solve_linreg_potok_amplify(
-            data.X_train,               # already has bias column
-            data.y_train,
-            P=P_vec,
-            num_solves=num_solves,
-            timeout_ms=timeout_ms,
-            seed=seed,
-        )
+        for prune_rel in prune_rels:
+            # Gram data + max‑K coefficient tensor, shared by every K below
+            with memory_scope() as tmem, span("template", prune_rel=prune_rel) as sp:
+                template = build_potok_template(
+                    X_fit, data.y_train,
+                    _default_p_vector(max(precision_bits), signed, radius),
+                    prune_rel=prune_rel or None,
+                    prune_topk=prune_topk,
+                )
+            template_time = sp.elapsed
 
-        logger.add(
-            mode="potok",
-            d=d,
-            n=n,
-            K=K,                        # ← new csv column
-            iterations=res["iterations"],
-            encode_time=round(res["encode_time"], 4),
-            anneal_time=round(res["anneal_time"], 4),
-            total_time=round(res["total_time"], 4),
-            wall_time=round(res["wall_time"], 4),
-            error=f"{res['error']:.2e}",
-        )
+            for K in precision_bits:
+                export_dir = export_qubo and os.path.join(
+                    export_qubo, f"potok_d{d}_seed{seed}_prune{prune_rel:g}_K{K}")
+                mode = "potok-iter" if rounds > 1 else "potok"
 
-        print(
-            f"potok  d={d:3}  K={K}  "
-            f"iters={res['iterations']:2}  total={res['total_time']:.2f}s  "
-            f"err={res['error']:.2e}"
-        )
+                def solve():
+                    if rounds > 1:
+                        res = solve_linreg_potok_iterative_amplify(
+                            X_fit,
+                            data.y_train,
+                            K=K,
+                            rounds=rounds,
+                            radius=radius,
+                            num_solves=num_solves,
+                            timeout_ms=timeout_ms,
+                            seed=seed,
+                            template=template,
+                            export_dir=export_dir,
+                        )
+                    else:
+                        res = solve_linreg_potok_amplify(
+                            X_fit,                      # already has bias column
+                            data.y_train,
+                            P=_default_p_vector(K, signed, radius),
+                            num_solves=num_solves,
+                            timeout_ms=timeout_ms,
+                            seed=seed,
+                            template=template,
+                            export_dir=export_dir,
+                        )
+                    return unscale_result(res, T, exact, scale_time) if scaling else res
+
+                with memory_scope() as mem, span("run", mode=mode, d=d, K=K):
+                    res = repeated(solve, **(reps or {}))
+                if scaling:
+                    mode += f"+{scaling}"
+
+                logger.add(
+                    mode=mode,
+                    d=d,
+                    n=n,
+                    K=K,                        # ← new csv column
+                    prune_rel=prune_rel,
+                    prune_topk=prune_topk,
+                    qubo_nnz=res["qubo_nnz"],
+                    prune_bound=res["prune_bound"],
+                    signed=int(signed or rounds > 1),
+                    iterations=res["iterations"],
+                    template_time=template_time,
+                    scale_time=scale_time,
+                    encode_time=res["encode_time"],
+                    anneal_time=res["anneal_time"],
+                    total_time=res["total_time"],
+                    wall_time=res["wall_time"],
+                    network_time=res["network_time"],
+                    error=res["error"],
+                    **rep_columns(res, *SOLVE_TIMES),
+                    **mem.columns(dmem, tmem),
+                )
+
+                print(
+                    f"{mode}  d={d:3}  K={K}  "
+                    f"iters={res['iterations']:2}  total={res['total_time']:.2f}s  "
+                    f"err={res['error']:.2e}  prune={prune_rel:g}"
+                )
+                template_time = 0.0         # paid once per template, logged on its first row
 
     logger.flush()
     return outfile
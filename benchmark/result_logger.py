@@ -1,14 +1,69 @@
 import csv
 from pathlib import Path
 
+import numpy as np
+
+from models.trace import save_traces
+
+# CSV stays compact (the runners log raw values and rounding happens here);
+# the Parquet copy stores the raw values.
+CSV_SCI_COLS = {"error", "prune_bound"}
+CSV_DIGITS = 6                 # significant digits of the other floats
+
+
+def _py(v):
+    """NumPy scalars → Python scalars (Arrow / csv friendly)."""
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def _csv_cell(key, v):
+    if isinstance(v, float):
+        return f"{v:.2e}" if key in CSV_SCI_COLS else f"{v:.{CSV_DIGITS}g}"
+    return v
+
+
 class ResultLogger:
-    """Accumulates dicts → writes once at the end."""
-    def __init__(self, out_path):
+    """
+    Accumulates dicts → writes once at the end.
+
+    Rows are logged at full precision.  The CSV rounds floats (`error`,
+    `prune_bound` as %.2e, the rest to 6 significant digits); with
+    `parquet_root` set (or the class default `ResultLogger.parquet_root`)
+    the rows are also written, typed and unrounded, to
+
+        <parquet_root>/run=<CSV directory name>/<CSV stem>.parquet
+
+    i.e. one hive partition per run directory that later runs append
+    files to (see analysis/parquet_results.py).  Needs pyarrow.
+
+    `add_trace` attaches a per‑iteration trace (models/trace.py) to the
+    last added row; traces go to the sidecar <CSV stem>.trace.npz.
+    """
+    parquet_root = None
+
+    def __init__(self, out_path, parquet_root=None):
         self.out_path = Path(out_path)
         self.rows = []
+        self.traces = []
+        if parquet_root is not None:
+            self.parquet_root = Path(parquet_root)
 
     def add(self, **kwargs):
-        self.rows.append(kwargs)
+        self.rows.append({k: _py(v) for k, v in kwargs.items()})
+
+    def add_trace(self, d, trace):
+        self.traces.append((len(self.rows) - 1, d, trace))
+
+    @property
+    def trace_path(self):
+        return self.out_path.with_name(f"{self.out_path.stem}.trace.npz")
+
+    @property
+    def parquet_path(self):
+        if self.parquet_root is None:
+            return None
+        return (Path(self.parquet_root) / f"run={self.out_path.parent.name}"
+                / f"{self.out_path.stem}.parquet")
 
     def flush(self):
         if not self.rows:
@@ -17,6 +72,23 @@ class ResultLogger:
         with self.out_path.open("w", newline="") as f:
             writer = csv.DictWriter(f, fieldnames=self.rows[0].keys())
             writer.writeheader()
-            writer.writerows(self.rows)
+            writer.writerows({k: _csv_cell(k, v) for k, v in r.items()} for r in self.rows)
         print(f"[ResultLogger] wrote {len(self.rows)} rows to {self.out_path}")
+        if self.traces:
+            save_traces(self.trace_path, self.traces)
+            print(f"[ResultLogger] wrote {len(self.traces)} traces to {self.trace_path}")
+        if self.parquet_root is not None:
+            self._flush_parquet()
 
+    def _flush_parquet(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as err:
+            raise ImportError("Parquet output needs pyarrow "
+                              "(pip install pyarrow)") from err
+        path = self.parquet_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pylist(self.rows)
+        pq.write_table(table, path)
+        print(f"[ResultLogger] wrote {len(self.rows)} rows to {path}")
@@ -0,0 +1,112 @@
+# benchmark/streaming.py
+import numpy as np
+
+from data.data_generator import generate_synthetic_regression
+from models.box_opt import solve_box_opt_amplify, _build_amplify_primitives
+from models.streaming import StreamingBoxRegressor
+from benchmark.result_logger import ResultLogger
+from models.spans import span, memory_scope
+
+
+def _chunks(X, y, n_batches, rows):
+    """Row chunks of `rows` rows each (None: `n_batches` near‑equal chunks)."""
+    if rows is None:
+        return list(zip(np.array_split(X, n_batches), np.array_split(y, n_batches)))
+    return [(X[i:i + rows], y[i:i + rows]) for i in range(0, len(y), rows)]
+
+
+def run_streaming_grid(
+    dims,
+    noise,
+    corr,
+    seed,
+    n_batches,
+    max_iter,
+    num_solves,
+    timeout_ms,
+    outfile,
+    compare_refit=True,
+    schedule=None,
+    chunk_rows=None,
+):
+    """
+    Feed the training rows in `n_batches` chunks to a StreamingBoxRegressor
+    (mode 'stream') and, with `compare_refit`, refit from scratch on all
+    rows seen so far after every chunk (mode 'refit': XᵀX, template and a
+    cold box search).  `latency` is the end‑to‑end CPU + anneal cost of
+    absorbing one chunk.  `chunk_rows` (list of ints) sweeps fixed chunk
+    sizes instead, one stream per size; chunks of fewer than d/2 rows take
+    the rank‑k template patch (`template_update` column).  Chunks that
+    arrive before d rows have been seen are only absorbed (no rows).
+    """
+    logger = ResultLogger(outfile)
+
+    for d in dims:
+        n = 10 * d
+        with memory_scope() as dmem:
+            with span("datagen", d=d, n=n):
+                data = generate_synthetic_regression(
+                    n=n, d=d, noise_sigma=noise,
+                    feature_corr=corr if corr > 0 else None,
+                    seed=seed,
+                )
+        kw = dict(max_iter=max_iter, num_solves=num_solves,
+                  timeout_ms=timeout_ms, seed=seed, **(schedule or {}))
+
+        for rows in (chunk_rows or [None]):
+            chunks = _chunks(data.X_train, data.y_train, n_batches, rows)
+            stream = StreamingBoxRegressor(d, **kw)
+
+            for batch, (X, y) in enumerate(chunks):
+                with memory_scope() as mem, span("run", mode="stream", d=d, batch=batch):
+                    res = stream.partial_fit(X, y)
+                if res is None:                  # fewer than d rows seen so far
+                    continue
+                runs = [("stream", res, mem)]
+
+                if compare_refit:
+                    X_seen = np.vstack([Xc for Xc, _ in chunks[:batch + 1]])
+                    y_seen = np.concatenate([yc for _, yc in chunks[:batch + 1]])
+                    with memory_scope() as mem, span("run", mode="refit", d=d, batch=batch):
+                        with span("gram") as gram:
+                            A = X_seen.T @ X_seen
+                            b = X_seen.T @ y_seen
+                        with span("template") as tmpl:
+                            template = _build_amplify_primitives(A)
+                        setup = gram.elapsed + tmpl.elapsed
+                        res = solve_box_opt_amplify(A, b, template=template, **kw)
+                    res["update_time"] = setup
+                    res["total_time"] += setup
+                    res["wall_time"] += setup
+                    res["template_update"] = "rebuild"
+                    res["L0"] = kw.get("L0", 1.0)
+                    runs.append(("refit", res, mem))
+
+                for mode, res, mem in runs:
+                    logger.add(
+                        mode=mode,
+                        d=d,
+                        n=n,
+                        batch=batch,
+                        chunk_rows=len(y),
+                        rows_seen=sum(len(yc) for _, yc in chunks[:batch + 1]),
+                        template_update=res["template_update"],
+                        L0=res["L0"],
+                        iterations=res["iterations"],
+                        update_time=res["update_time"],
+                        encode_time=res["encode_time"],
+                        anneal_time=res["anneal_time"],
+                        latency=res["total_time"],
+                        wall_time=res["wall_time"],
+                        network_time=res["network_time"],
+                        error=res["error"],
+                        **mem.columns(dmem),
+                    )
+                    print(
+                        f"{mode:6} d={d:3}  rows={len(y):3}  batch={batch:2}  "
+                        f"iters={res['iterations']:3}  latency={res['total_time']:.2f}s  "
+                        f"err={res['error']:.2e}"
+                    )
+
+    logger.flush()
+    return outfile
@@ -0,0 +1,160 @@
+# benchmark/timing.py
+"""
+Repeated in‑process timing with warm‑up and robust statistics.
+
+    stats = measure(lambda: build(A), warmup=1, repeat=7, min_time=2e-3)
+    stats["median"], stats["iqr"], stats["min"]     # seconds per call
+
+Warm‑up calls absorb first‑call costs (imports, allocator / BLAS thread
+start‑up, caches).  Sub‑millisecond callables are looped (`autorange`) so
+one sample lasts at least `min_time`; samples are then per‑call times.
+
+The runners use `repeated` for whole grid cells (one solver call each):
+
+    res = repeated(lambda: solve(...), warmup=1, repeats=5)
+    logger.add(..., encode_time=res["encode_time"], **rep_columns(res, *SOLVE_TIMES))
+"""
+
+import time
+
+import numpy as np
+
+from models.spans import span
+
+# timing columns the box / Potok runners log MAD and min for
+SOLVE_TIMES = ("encode_time", "anneal_time", "network_time", "total_time", "wall_time")
+
+
+def autorange(fn, min_time=2e-3):
+    """
+    Calls per sample so one sample lasts >= min_time, stepping 1, 2, 5,
+    10, 20, … as timeit.Timer.autorange.  Returns (loops, seconds per call).
+    """
+    i = 1
+    while True:
+        for j in (1, 2, 5):
+            loops = i * j
+            t0 = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            dt = time.perf_counter() - t0
+            if dt >= min_time:
+                return loops, dt / loops
+        i *= 10
+
+
+def robust_stats(samples):
+    """median, MAD (unscaled), IQR, min, max and n of a list of seconds."""
+    x = np.asarray(samples, dtype=float)
+    if x.size == 0:
+        return {"median": None, "mad": None, "iqr": None, "min": None, "max": None, "n": 0}
+    med = float(np.median(x))
+    q1, q3 = np.percentile(x, [25, 75])
+    return {
+        "median": med,
+        "mad": float(np.median(np.abs(x - med))),
+        "iqr": float(q3 - q1),
+        "min": float(x.min()),
+        "max": float(x.max()),
+        "n": int(x.size),
+    }
+
+
+def measure(fn, warmup=1, repeat=7, min_time=2e-3, loops=None):
+    """
+    Time fn(): `warmup` untimed calls, then `repeat` samples of `loops`
+    calls each (default: `autorange`).  Returns `robust_stats` of the
+    per‑call seconds plus `loops` and `first` (the first warm‑up call, i.e.
+    the cold cost; None without warm‑up).
+    """
+    first = None
+    for i in range(warmup):
+        t0 = time.perf_counter()
+        fn()
+        if i == 0:
+            first = time.perf_counter() - t0
+    if loops is None:
+        loops, _ = autorange(fn, min_time) if min_time else (1, None)
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - t0) / loops)
+    return {**robust_stats(samples), "loops": loops, "first": first}
+
+
+# ------------------------------------------------------------------ #
+#   Repeated grid cells (runners)
+# ------------------------------------------------------------------ #
+
+def _timing_keys(res):
+    return [k for k, v in res.items()
+            if k.endswith("_time") and isinstance(v, (int, float)) and not isinstance(v, bool)]
+
+
+def repeated(fn, warmup=0, repeats=1, min_time=0.0):
+    """
+    Measure one grid cell in process: `warmup` untimed calls of fn() (first
+    imports, BLAS threads, client connection), then `repeats` measured
+    calls.  With `min_time`, one probe call (untimed) decides whether the
+    cell is shorter than min_time; if so every sample averages enough calls
+    (1, 2, 5, 10, … as `autorange`) to last min_time.
+
+    fn() returns a solver result dict.  The returned dict is the sample with
+    the median total_time (else the median of its first *_time) with every
+    numeric *_time replaced by the median over the samples; `rep_stats`
+    holds their `robust_stats`, `reps` / `loops` the sample counts.  With
+    the defaults fn() runs once and its result is returned unchanged.
+    """
+    if warmup <= 0 and repeats <= 1 and not min_time:
+        return fn()
+
+    for i in range(warmup):
+        with span("rep", rep=i, warmup=True):
+            fn()
+    loops = 1
+    if min_time:
+        with span("rep", rep=warmup, warmup=True) as sp:
+            fn()
+        if sp.elapsed < min_time:
+            loops = next(i * j for i in (10 ** k for k in range(9)) for j in (1, 2, 5)
+                         if i * j * sp.elapsed >= min_time)
+
+    samples = []
+    for r in range(max(repeats, 1)):
+        runs = []
+        for _ in range(loops):
+            with span("rep", rep=r):
+                runs.append(fn())
+        samples.append(runs)
+
+    keys = _timing_keys(samples[0][-1])
+    values = {k: [np.mean([run[k] for run in runs]) for runs in samples] for k in keys}
+    stats = {k: robust_stats(v) for k, v in values.items()}
+
+    out = dict(samples[0][-1])
+    if keys:
+        order = values["total_time" if "total_time" in values else keys[0]]
+        out = dict(samples[int(np.argsort(order)[(len(order) - 1) // 2])][-1])
+        out.update({k: stats[k]["median"] for k in keys})
+    out["rep_stats"] = stats
+    out["reps"] = len(samples)
+    out["loops"] = loops
+    return out
+
+
+def rep_columns(res, *keys):
+    """
+    reps / loops and `<key>_mad`, `<key>_min` result columns of a `repeated`
+    result ({} for a plain single run, so rows keep their usual columns).
+    """
+    stats = res.get("rep_stats")
+    if stats is None:
+        return {}
+    out = {"reps": res["reps"], "loops": res["loops"]}
+    for k in keys:
+        s = stats.get(k)
+        out[f"{k}_mad"] = s and s["mad"]
+        out[f"{k}_min"] = s and s["min"]
+    return out
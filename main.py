@@ -1,8 +1,18 @@
 import argparse
+from contextlib import nullcontext
+from pathlib import Path
+
 from benchmark.classical import run_classical_grid
 from benchmark.box_naive import run_box_amplify_grid
 from benchmark.box_opt   import run_box_opt_grid
+from benchmark.box_block import run_box_block_grid
+from benchmark.box_multi import run_box_multi_grid
+from benchmark.lambda_path import run_lambda_path_grid
+from benchmark.streaming import run_streaming_grid
 from benchmark.potok     import run_potok_grid
+from benchmark.result_logger import ResultLogger
+from models.polish import POLISH_METHODS
+from models.spans import SpanRecorder, track_memory
 
 
 def parse_args():
@@ -15,20 +25,154 @@ def parse_args():
     p.add_argument("--out",   default="results/bench.csv")
     p.add_argument(
         "--mode",
-        choices=["classical", "box-naive", "box-opt", "potok"],
+        choices=["classical", "box-naive", "box-opt", "box-block", "box-multi", "box-path", "box-stream", "potok", "potok-path"],
         default="classical",
     )
     # new: list of K values
     p.add_argument("--prec_bits", type=int, nargs="+", default=[4])
+    p.add_argument("--potok_signed", action="store_true",
+                   help="two's-complement precision vector over [-radius, radius)")
+    p.add_argument("--potok_rounds", type=int, default=1,
+                   help=">1: iterative re-centred Potok refinement")
+    p.add_argument("--potok_radius", type=float, default=2.0)
     p.add_argument("--max_iter",   type=int, default=40)
     p.add_argument("--num_solves", type=int, default=1)
     p.add_argument("--timeout_ms", type=int, default=500)
+    # box trust-region schedule / stopping
+    p.add_argument("--beta",      type=float, default=0.2,  help="contract factor on reject")
+    p.add_argument("--fast_beta", type=float, default=None, help="contract factor after --streak rejects")
+    p.add_argument("--expand",    type=float, default=1.0,  help="expand factor after --streak accepts")
+    p.add_argument("--streak",    type=int,   default=2)
+    p.add_argument("--epsilon",   type=float, default=1e-6, help="stop once L < epsilon")
+    p.add_argument("--rel_tol",   type=float, default=None, help="stop on relative energy gain < rel_tol")
+    p.add_argument("--patience",  type=int,   default=3,    help="accepted steps looked back for --rel_tol")
+    p.add_argument("--time_budget_s",   type=float, default=None)
+    p.add_argument("--anneal_budget_s", type=float, default=None)
+    # box classical finisher
+    p.add_argument("--polish", choices=POLISH_METHODS, default=None,
+                   help="refine the box solution classically once L < --polish_L")
+    p.add_argument("--polish_L",     type=float, default=1e-2)
+    p.add_argument("--polish_steps", type=int,   default=None, help="CG iterations (default d)")
+    # box warm start
+    p.add_argument("--init", default="zeros",
+                   help="start strategy: zeros | cg:K | ridge | previous-run")
+    p.add_argument("--init_L", type=float, default=None,
+                   help="initial box side (default: strategy's estimate)")
+    p.add_argument("--warm_cache", default=None,
+                   help="directory of stored solutions for --init previous-run")
+    p.add_argument("--target_error", type=float, default=None,
+                   help="record iterations/time until ‖c - x*‖ <= target")
+    p.add_argument("--compare_cold", action="store_true",
+                   help="also solve from zeros and log anneal calls saved")
+    # box-block decomposition
+    p.add_argument("--block_size",     type=int, default=64)
+    p.add_argument("--block_select",   choices=["gradient", "cyclic"], default="gradient")
+    p.add_argument("--block_parallel", type=int, default=1)
+    # QUBO coupling pruning (box-opt, potok)
+    p.add_argument("--prune_rel",  type=float, nargs="+", default=[0.0],
+                   help="drop |A_ij| below this fraction of the largest coupling (0 = exact)")
+    p.add_argument("--prune_topk", type=int, default=None,
+                   help="keep only the k strongest couplings per feature")
+    p.add_argument("--fix_persistent", action="store_true",
+                   help="box-opt/box-block: fix provably determined binaries before solving")
+    # box-multi: several right-hand sides on one design
+    p.add_argument("--n_targets", type=int, default=4)
+    p.add_argument("--multi_sequential", action="store_true",
+                   help="solve the targets one by one instead of one batched submission")
+    # box-path / potok-path: ridge regularisation path
+    p.add_argument("--lambdas", type=float, nargs="+", default=[100.0, 10.0, 1.0, 0.1, 0.0],
+                   help="ridge λ values, solved in this order with warm starts")
+    # box-stream: chunked updates vs full refits
+    p.add_argument("--n_batches", type=int, default=4)
+    p.add_argument("--chunk_rows", type=int, nargs="+", default=None,
+                   help="box-stream: sweep fixed chunk sizes (rows) instead of --n_batches")
+    p.add_argument("--no_refit", action="store_true",
+                   help="box-stream: skip the from-scratch refit after every chunk")
+    p.add_argument("--scaling", choices=["jacobi", "cholesky"], default=None,
+                   help="box-naive/box-opt/box-block/potok: solve the scaled problem x = T x~")
+    p.add_argument("--export_qubo", default=None,
+                   help="box-opt/potok: write each iteration's QUBO under this directory")
+    p.add_argument("--trace", action="store_true",
+                   help="box-naive/box-opt/box-block: per-iteration trace sidecar (<out stem>.trace.npz)")
+    p.add_argument("--parquet", default=None,
+                   help="also write full‑precision rows to this Parquet dataset (needs pyarrow)")
+    # timing spans / profiling (models/spans.py)
+    p.add_argument("--spans", default=None,
+                   help="write timing spans here: .jsonl, or .json for a Chrome trace")
+    p.add_argument("--profile_spans", nargs="+", default=[],
+                   help="cProfile these spans (e.g. encode template) into --profile_dir")
+    p.add_argument("--profile_dir", default=None,
+                   help="directory for <span>.prof files (default: <out stem>_prof)")
+    p.add_argument("--memory", action="store_true",
+                   help="log per-phase tracemalloc peaks and peak RSS (mem_*_mb, rss_peak_mb); slows encode")
+    # in-process repetitions (benchmark/timing.py)
+    p.add_argument("--warmup",   type=int,   default=0, help="untimed runs per grid cell")
+    p.add_argument("--repeats",  type=int,   default=1,
+                   help="measured runs per grid cell; timings become medians with *_mad / *_min")
+    p.add_argument("--min_time", type=float, default=0.0,
+                   help="loop cells shorter than this many seconds per sample (sub-ms fits)")
     return p.parse_args()
 
 
+def box_schedule(args):
+    """TrustRegion / StopRule / polish keyword arguments shared by the box modes."""
+    return dict(
+        beta=args.beta,
+        fast_beta=args.fast_beta,
+        expand=args.expand,
+        streak=args.streak,
+        epsilon=args.epsilon,
+        rel_tol=args.rel_tol,
+        patience=args.patience,
+        time_budget_s=args.time_budget_s,
+        anneal_budget_s=args.anneal_budget_s,
+        polish=args.polish,
+        polish_L=args.polish_L,
+        polish_steps=args.polish_steps,
+    )
+
+
+def box_warm(args):
+    """Warm‑start options shared by the box modes."""
+    return dict(
+        init=args.init,
+        init_L=args.init_L,
+        cache=args.warm_cache,
+        target_error=args.target_error,
+        compare_cold=args.compare_cold,
+    )
+
+
+def reps(args):
+    """In‑process warm‑up / repetition options for the runners."""
+    return dict(warmup=args.warmup, repeats=args.repeats, min_time=args.min_time)
+
+
 def main():
     args = parse_args()
+    ResultLogger.parquet_root = args.parquet
+    if args.mode in ("box-path", "potok-path", "box-stream") and \
+            (args.warmup or args.repeats > 1 or args.min_time):
+        print(f"[warn] --warmup/--repeats/--min_time ignored for {args.mode}: "
+              "its cells warm-start from each other")
+    track_memory(args.memory)
+
+    recorder = None
+    if args.spans or args.profile_spans:
+        recorder = SpanRecorder(profile=args.profile_spans)
+    with recorder or nullcontext():
+        run(args)
 
+    if args.spans:
+        print(f"[spans] wrote {len(recorder.spans)} spans to {recorder.write(args.spans)}")
+    if args.profile_spans:
+        out = Path(args.out)
+        prof_dir = args.profile_dir or out.with_name(f"{out.stem}_prof")
+        for path in recorder.write_profiles(prof_dir):
+            print(f"[spans] profile {path}")
+
+
+def run(args):
     if args.mode == "classical":
         run_classical_grid(
             dims=args.dims,
@@ -37,6 +181,7 @@ def main():
             seed=args.seed,
             models=args.models,
             outfile=args.out,
+            reps=reps(args),
         )
 
     elif args.mode == "box-naive":
@@ -49,6 +194,11 @@ def main():
             num_solves=args.num_solves,
             timeout_ms=args.timeout_ms,
             outfile=args.out,
+            schedule=box_schedule(args),
+            warm=box_warm(args),
+            scaling=args.scaling,
+            trace=args.trace,
+            reps=reps(args),
         )
 
     elif args.mode == "box-opt":
@@ -61,6 +211,86 @@ def main():
             num_solves=args.num_solves,
             timeout_ms=args.timeout_ms,
             outfile=args.out,
+            schedule=box_schedule(args),
+            warm=box_warm(args),
+            prune_rels=args.prune_rel,
+            prune_topk=args.prune_topk,
+            fix_persistent=args.fix_persistent,
+            export_qubo=args.export_qubo,
+            scaling=args.scaling,
+            trace=args.trace,
+            reps=reps(args),
+        )
+
+    elif args.mode == "box-block":
+        run_box_block_grid(
+            dims=args.dims,
+            noise=args.noise,
+            corr=args.corr,
+            seed=args.seed,
+            max_iter=args.max_iter,
+            num_solves=args.num_solves,
+            timeout_ms=args.timeout_ms,
+            block_size=args.block_size,
+            selection=args.block_select,
+            n_parallel=args.block_parallel,
+            outfile=args.out,
+            schedule=box_schedule(args),
+            warm=box_warm(args),
+            fix_persistent=args.fix_persistent,
+            scaling=args.scaling,
+            trace=args.trace,
+            reps=reps(args),
+        )
+
+    elif args.mode == "box-multi":
+        run_box_multi_grid(
+            dims=args.dims,
+            noise=args.noise,
+            corr=args.corr,
+            seed=args.seed,
+            n_targets=args.n_targets,
+            max_iter=args.max_iter,
+            num_solves=args.num_solves,
+            timeout_ms=args.timeout_ms,
+            outfile=args.out,
+            batch=not args.multi_sequential,
+            schedule=box_schedule(args),
+            reps=reps(args),
+        )
+
+    elif args.mode in ("box-path", "potok-path"):
+        run_lambda_path_grid(
+            dims=args.dims,
+            noise=args.noise,
+            corr=args.corr,
+            seed=args.seed,
+            lambdas=args.lambdas,
+            method=args.mode.split("-")[0],
+            max_iter=args.max_iter,
+            num_solves=args.num_solves,
+            timeout_ms=args.timeout_ms,
+            outfile=args.out,
+            K=max(args.prec_bits),
+            rounds=max(args.potok_rounds, 2),
+            radius=args.potok_radius,
+            schedule=box_schedule(args) if args.mode == "box-path" else None,
+        )
+
+    elif args.mode == "box-stream":
+        run_streaming_grid(
+            dims=args.dims,
+            noise=args.noise,
+            corr=args.corr,
+            seed=args.seed,
+            n_batches=args.n_batches,
+            max_iter=args.max_iter,
+            num_solves=args.num_solves,
+            timeout_ms=args.timeout_ms,
+            outfile=args.out,
+            compare_refit=not args.no_refit,
+            schedule=box_schedule(args),
+            chunk_rows=args.chunk_rows,
         )
 
     elif args.mode == "potok":
@@ -73,6 +303,14 @@ def main():
             num_solves=args.num_solves,
             timeout_ms=args.timeout_ms,
             outfile=args.out,
+            signed=args.potok_signed,
+            rounds=args.potok_rounds,
+            radius=args.potok_radius,
+            prune_rels=args.prune_rel,
+            prune_topk=args.prune_topk,
+            export_qubo=args.export_qubo,
+            scaling=args.scaling,
+            reps=reps(args),
         )
     else:
         raise NotImplementedError(args.mode)
@@ -0,0 +1,266 @@
+# models/box_block.py
+"""
+Block‑coordinate variant of the box algorithm.
+
+Each outer iteration only a block of coordinates is moved while the rest
+of the centre stays fixed, so a submitted QUBO never has more than
+2 * block_size binaries regardless of d.  Every coordinate keeps its own
+box side L_i, which is contracted only when a block containing it fails
+to improve the energy.  The per‑coordinate schedule mirrors `TrustRegion`:
+`streak` rejects in a row switch to `fast_beta`, `streak` accepts in a
+row expand by `expand`.
+"""
+
+import numpy as np
+from amplify import Model, set_seed
+from dotenv import load_dotenv
+
+from models.box_qubo import box_qubo_matrices, box_step, to_amplify_matrix
+from models.common_amplify import safe_solve, safe_parallel_solve, make_fixstars_client
+from models.warm_start import TargetTracker
+from models.polish import polish_solution
+from models.trust_region import StopRule
+from models.qubo_fix import reduce_persistent, expand_assignment
+from models.trace import ConvergenceTrace
+from models.spans import span, record_span
+
+load_dotenv()
+
+
+# ------------------------------------------------------------------ #
+#   Block selection
+# ------------------------------------------------------------------ #
+
+def select_blocks(coeff, L, block_size, n_blocks, strategy, cursor, epsilon):
+    """
+    Pick up to `n_blocks` disjoint index blocks among the coordinates whose
+    box is still open (L_i >= epsilon).
+
+    strategy = "gradient" : largest |A c - b| first
+    strategy = "cyclic"   : round‑robin over open coordinates from `cursor`
+
+    Returns (blocks, cursor) with the cursor advanced for cyclic selection.
+    """
+    open_idx = np.flatnonzero(L >= epsilon)
+    if open_idx.size == 0:
+        return [], cursor
+    take = min(block_size * n_blocks, open_idx.size)
+
+    if strategy == "gradient":
+        order = np.argsort(-np.abs(coeff[open_idx]), kind="stable")
+        chosen = open_idx[order[:take]]
+    elif strategy == "cyclic":
+        ahead = open_idx >= cursor
+        chosen = np.concatenate((open_idx[ahead], open_idx[~ahead]))[:take]
+        cursor = chosen[-1] + 1
+    else:
+        raise ValueError(f"unknown block selection '{strategy}'")
+
+    blocks = [np.sort(chosen[k:k + block_size]) for k in range(0, take, block_size)]
+    return blocks, cursor
+
+
+# ------------------------------------------------------------------ #
+#   Public solver
+# ------------------------------------------------------------------ #
+
+def solve_box_block_amplify(
+    A,
+    b,
+    block_size=64,
+    selection="gradient",
+    n_parallel=1,
+    beta=0.2,
+    epsilon=1e-6,
+    max_iter=50,
+    num_solves=1,
+    timeout_ms=1000,
+    seed=0,
+    c0=None,
+    L0=1.0,
+    target_error=None,
+    target_space=None,
+    polish=None,
+    polish_L=1e-2,
+    polish_steps=None,
+    expand=1.0,
+    fast_beta=None,
+    streak=2,
+    rel_tol=None,
+    patience=3,
+    time_budget_s=None,
+    anneal_budget_s=None,
+    fix_persistent=False,
+    trace=False,
+):
+    """
+    Block‑coordinate box algorithm.  Each outer iteration solves
+    `n_parallel` disjoint sub‑QUBOs of at most 2*block_size binaries
+    (concurrently when n_parallel > 1) with the other coordinates fixed.
+    With `fix_persistent` provably determined binaries are removed from
+    each sub‑QUBO first (models/qubo_fix.py); fully fixed blocks are not
+    submitted.  With `trace` the result's `trace` is the per‑iteration log
+    of models/trace.py (L = largest block side, objective = best block ΔE).
+
+    Returns:
+        dict(iterations, anneal_calls, encode_time, anneal_time, polish_time,
+             total_time, wall_time, network_time, error, stop_reason,
+             iters_to_target, time_to_target, solution, fixed_frac, trace)
+    """
+    d = len(b)
+    block_size = min(block_size, d)
+    fast_beta = beta if fast_beta is None else fast_beta
+
+    c = np.zeros(d) if c0 is None else np.array(c0, dtype=float)
+    L = np.full(d, float(L0))
+    accepts = np.zeros(d, dtype=int)     # per‑coordinate streak counters
+    rejects = np.zeros(d, dtype=int)
+    coeff = A @ c - b          # gradient, kept in sync with c
+    E_c = 0.5 * c @ (coeff - b)  # energy at c
+    cursor = 0
+    stop = StopRule(epsilon, rel_tol, patience, time_budget_s, anneal_budget_s,
+                    switch_L=polish_L if polish else None)
+    stop_reason = "max_iter"
+
+    encode_time = 0.0
+    anneal_time = 0.0
+    wall_time   = 0.0
+    anneal_calls = 0
+    n_fixed = n_bin = 0
+
+    client = make_fixstars_client(timeout_ms)
+    set_seed(seed)
+
+    target = TargetTracker(A, b, target_error, target_space)
+    target.update(c, 0, 0.0)
+    tracer = ConvergenceTrace(A, b, max_iter, trace)
+
+    for it in range(1, max_iter + 1):
+        L_it = L.max()
+        with span("iter", it=it, L=L_it):
+            blocks, cursor = select_blocks(coeff, L, block_size, n_parallel,
+                                           selection, cursor, epsilon)
+
+            # ---------------- encode sub‑QUBOs (CPU) ----------------
+            with span("encode", blocks=len(blocks)) as sp:
+                mats, reds = [], []
+                nnz = 0
+                for S in blocks:
+                    Q, h = box_qubo_matrices(A[np.ix_(S, S)], coeff[S], L[S])
+                    red = None
+                    if fix_persistent:
+                        red = reduce_persistent(Q, h)
+                        free, fixed, _, Q, h, _ = red
+                        n_fixed += len(fixed)
+                    n_bin += 2 * len(S)
+                    if tracer.enabled:
+                        nnz += int(np.count_nonzero(np.triu(Q, 1)))
+                    reds.append(red)
+                    mats.append(to_amplify_matrix(Q, h) if len(h) else None)
+                models = [Model(m) for m in mats if m is not None]
+            encode_time += sp.elapsed
+
+            # ---------------- solve -------------------------------
+            with span("submit", batch=len(models)) as sp:
+                if len(models) == 1:
+                    results = [safe_solve(models[0], client, num_solves=num_solves)]
+                elif models:
+                    results = safe_parallel_solve(models, client, num_solves=num_solves)
+                else:
+                    results = []
+                for result in results:
+                    if result:
+                        record_span("anneal", result.execution_time.total_seconds())
+            wall_time += sp.elapsed
+            anneal_calls += len(models)
+
+            with span("decode"):
+                steps, gains = [], []
+                results = iter(results)
+                for S, m, red in zip(blocks, mats, reds):
+                    if m is None:                        # every binary fixed
+                        bits, gain = np.empty(0), 0.0
+                    else:
+                        result = next(results)
+                        if not result:
+                            raise RuntimeError("Amplify returned no solutions")
+                        anneal_time += result.execution_time.total_seconds()
+                        sol = result.best
+                        bits = m.variable_array.evaluate(sol.values)
+                        gain = sol.objective
+                    if red is not None:
+                        free, fixed, vals, _, _, const = red
+                        bits = expand_assignment(2 * len(S), free, fixed, vals, bits)
+                        gain += const
+                    steps.append(L[S] * box_step(bits, len(S)))
+                    gains.append(gain)                   # ΔE of moving this block alone
+
+                # ---------------- accept / contract --------------------
+                good = [k for k, g in enumerate(gains) if g < 0]
+                for k, S in enumerate(blocks):
+                    if gains[k] >= 0:
+                        accepts[S] = 0
+                        rejects[S] += 1
+                        L[S] *= np.where(rejects[S] >= streak, fast_beta, beta)
+
+                if good:
+                    idx = np.concatenate([blocks[k] for k in good])
+                    delta = np.concatenate([steps[k] for k in good])
+                    dE = gains[good[0]]
+                    if len(good) > 1:
+                        # blocks were solved independently; cross couplings may undo
+                        # the joint move, in which case keep only the best block
+                        dE = coeff[idx] @ delta + 0.5 * delta @ (A[np.ix_(idx, idx)] @ delta)
+                        if dE >= 0:
+                            k = min(good, key=gains.__getitem__)
+                            idx, delta, dE = blocks[k], steps[k], gains[k]
+                    c[idx] += delta
+                    coeff += A[:, idx] @ delta
+                    E_c += dE
+
+                    rejects[idx] = 0
+                    accepts[idx] += 1
+                    grow = idx[accepts[idx] >= streak]
+                    if expand != 1.0 and grow.size:
+                        L[grow] *= expand
+                        accepts[grow] = 0
+
+            target.update(c, it, encode_time + anneal_time)
+            tracer.record(it, L_it, bool(good), min(gains, default=0.0), E_c, c,
+                          encode_time, anneal_time, wall_time, nnz)
+
+            reason = stop.check(L.max(), E_c, anneal_time)
+            if reason:
+                stop_reason = reason
+                break
+
+    # ---------------- classical finisher (CPU) ----------------
+    polish_time = 0.0
+    if polish:
+        with span("polish") as sp:
+            c = polish_solution(A, b, c, polish, polish_steps)
+        polish_time = sp.elapsed
+        target.update(c, it, encode_time + anneal_time + polish_time)
+
+    with span("error"):
+        exact = np.linalg.solve(A, b)
+        err   = np.linalg.norm(c - exact)
+    network_time = wall_time - anneal_time
+
+    return {
+        "iterations": it,
+        "anneal_calls": anneal_calls,
+        "encode_time": encode_time,
+        "anneal_time": anneal_time,
+        "polish_time": polish_time,
+        "total_time": encode_time + anneal_time + polish_time,
+        "wall_time": wall_time + encode_time + polish_time,
+        "network_time": network_time,
+        "error": err,
+        "stop_reason": stop_reason,
+        "iters_to_target": target.iters,
+        "time_to_target": target.time,
+        "solution": c,
+        "fixed_frac": n_fixed / n_bin if n_bin else 0.0,
+        "trace": tracer.array(),
+    }
@@ -1,14 +1,34 @@
-import time
 import numpy as np
 from amplify import VariableGenerator, FixstarsClient, solve, set_seed
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
 from models.common_amplify import safe_solve
+from models.warm_start import TargetTracker
+from models.polish import polish_solution
+from models.trust_region import TrustRegion, StopRule
+from models.decode import LinearDecoder, box_encoding
+from models.qubo_prune import box_qubo_nnz
+from models.trace import ConvergenceTrace
+from models.spans import span, record_span
 
 # Load .env file
 load_dotenv()
 
+# ------------------------------------------------------------------ #
+#   Encode
+# ------------------------------------------------------------------ #
+
+def _encode_box(A, b, c, L):
+    """Fresh variables, w = c + L(-2q1 + q2) and the full energy Poly (O(d²) Poly ops)."""
+    d = len(b)
+    gen = VariableGenerator()
+    q = gen.array("Binary", 2 * d)
+    q1, q2 = q[:d], q[d:]
+    w = c + L * (-2 * q1 + q2)
+    return q, 0.5 * (w @ (A @ w)) - b @ w
+
+
 # ------------------------------------------------------------------ #
 #   Public solver
 # ------------------------------------------------------------------ #
@@ -22,11 +42,29 @@ def solve_box_naive_amplify(
     num_solves=1,
     timeout_ms=1000,
     seed=0,
+    c0=None,
+    L0=1.0,
+    target_error=None,
+    target_space=None,
+    polish=None,
+    polish_L=1e-2,
+    polish_steps=None,
+    expand=1.0,
+    fast_beta=None,
+    streak=2,
+    rel_tol=None,
+    patience=3,
+    time_budget_s=None,
+    anneal_budget_s=None,
+    trace=False,
 ):
     d = len(b)
-    c = np.zeros(d)
-    L = 1.0 
-    best_E = np.inf
+    c = np.zeros(d) if c0 is None else np.array(c0, dtype=float)
+    tr = TrustRegion(L0, beta, expand, fast_beta, streak)
+    stop = StopRule(epsilon, rel_tol, patience, time_budget_s, anneal_budget_s,
+                    switch_L=polish_L if polish else None)
+    stop_reason = "max_iter"
+    best_E = np.inf if c0 is None else 0.5 * c @ (A @ c) - b @ c
 
     encode_time = 0.0          # CPU build only
     anneal_time = 0.0          # GPU execution only
@@ -42,52 +80,80 @@ def solve_box_naive_amplify(
     client.parameters.timeout = timedelta(milliseconds=timeout_ms)
     set_seed(seed)
 
+    target = TargetTracker(A, b, target_error, target_space)
+    target.update(c, 0, 0.0)
+    E_box = box_encoding(d)
+    tracer = ConvergenceTrace(A, b, max_iter, trace)
+    if tracer.enabled:
+        nnz = box_qubo_nnz(int(np.count_nonzero(np.triu(A, 1))), d)
+
     for it in range(1, max_iter + 1):
-        gen = VariableGenerator()
-        q1 = gen.array("Binary", d)
-        q2 = gen.array("Binary", d)
-        w = c + L * (-2 * q1 + q2)
-
-        # ---------------- compile (CPU) ----------------
-        t0 = time.perf_counter()
-        energy = 0.5 * (w @ (A @ w)) - b @ w
-        model = energy
-        encode_time += time.perf_counter() - t0
-
-        # --------------- solve (GPU) -------------------
-        wall_start = time.perf_counter()
-        result = safe_solve(model, client, num_solves=num_solves)
-        wall_end = time.perf_counter()
-        wall_time += wall_end - wall_start
-        if not result:
-            raise RuntimeError("Amplify returned no solutions")
-
-        anneal_time += result.execution_time.total_seconds()  # GPU time only
-        sol = result.best
-        energy_E = sol.objective
-        # ----------------------------------------------
-
-        q1_sol = q1.evaluate(sol.values)
-        q2_sol = q2.evaluate(sol.values)
-        w_new = c + L * (-2 * q1_sol + q2_sol)
-
-        if energy_E < best_E:
-            c, best_E = w_new, energy_E
-        else:
-            L *= beta
-
-        if L < epsilon:
-            break
-
-    exact = np.linalg.solve(A, b)
-    err = np.linalg.norm(c - exact)
+        with span("iter", it=it, L=tr.L):
+            # ---------------- compile (CPU) ----------------
+            # variables, w = c + L(-2q1 + q2) and the energy Poly
+            with span("encode") as sp:
+                q, model = _encode_box(A, b, c, tr.L)
+            encode_time += sp.elapsed
+
+            # --------------- solve (GPU) -------------------
+            with span("submit") as sp:
+                result = safe_solve(model, client, num_solves=num_solves)
+                if result:
+                    record_span("anneal", result.execution_time.total_seconds())
+            wall_time += sp.elapsed
+            if not result:
+                raise RuntimeError("Amplify returned no solutions")
+
+            anneal_time += result.execution_time.total_seconds()  # GPU time only
+            sol = result.best
+            energy_E = sol.objective
+            # ----------------------------------------------
+
+            with span("decode"):
+                w_new = c + tr.L * LinearDecoder(q, E_box)(sol.values)
+
+                L, accepted = tr.L, energy_E < best_E
+                if accepted:
+                    c, best_E = w_new, energy_E
+                    tr.accept()
+                else:
+                    tr.reject()
+
+            target.update(c, it, encode_time + anneal_time)
+            if tracer.enabled:
+                tracer.record(it, L, accepted, energy_E, 0.5 * c @ (A @ c) - b @ c, c,
+                              encode_time, anneal_time, wall_time, nnz)
+
+            reason = stop.check(tr.L, best_E, anneal_time)
+            if reason:
+                stop_reason = reason
+                break
+
+    # ---------------- classical finisher (CPU) ----------------
+    polish_time = 0.0
+    if polish:
+        with span("polish") as sp:
+            c = polish_solution(A, b, c, polish, polish_steps)
+        polish_time = sp.elapsed
+        target.update(c, it, encode_time + anneal_time + polish_time)
+
+    with span("error"):
+        exact = np.linalg.solve(A, b)
+        err = np.linalg.norm(c - exact)
 
     return {
         "iterations": it,
         "encode_time": encode_time,              # seconds
         "anneal_time": anneal_time,              # seconds, GPU only
-        "wall_time":   wall_time + encode_time,
-        "total_time": encode_time + anneal_time, # network excluded
+        "polish_time": polish_time,
+        "wall_time":   wall_time + encode_time + polish_time,
+        "network_time": wall_time - anneal_time,
+        "total_time": encode_time + anneal_time + polish_time, # network excluded
         "error": err,
+        "stop_reason": stop_reason,
+        "iters_to_target": target.iters,
+        "time_to_target": target.time,
+        "solution": c,
+        "trace": tracer.array(),
     }
 
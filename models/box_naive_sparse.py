@@ -1,6 +1,5 @@
 # box_naive_sparse.py
 
-import time
 import numpy as np
 from amplify import VariableGenerator, FixstarsClient, set_seed
 from amplify import Model  # optional, but we build Poly explicitly
@@ -9,10 +8,41 @@ import os
 
 from .sparse_box import cache_upper_triangle_coo
 from models.common_amplify import safe_solve
+from models.warm_start import TargetTracker
+from models.polish import polish_solution
+from models.trust_region import TrustRegion, StopRule
+from models.decode import LinearDecoder, box_encoding
+from models.spans import span, record_span
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _encode_box_sparse(I, J, V, b, c, L):
+    """
+    box-naive encode over the cached upper triangle (I, J, V) of A:
+    fresh variables, w = c + L(-2q1 + q2) and the energy Poly in O(nnz).
+    """
+    d = len(b)
+    gen = VariableGenerator()
+    q = gen.array("Binary", 2 * d)
+    w = c + L * (-2 * q[:d] + q[d:])
+
+    # Quadratic term: 0.5 * sum_{i<=j} A_ij * w_i * w_j  (2x off-diagonals)
+    quad_poly = 0
+    for i, j, v in zip(I, J, V):
+        term = v * w[i] * w[j]
+        quad_poly += term if i == j else 2 * term
+    quad_poly = 0.5 * quad_poly
+
+    # Linear term: - b^T w
+    lin_poly = 0
+    for i in range(d):
+        lin_poly += b[i] * w[i]
+
+    return q, quad_poly - lin_poly     # already a Poly
+
+
 def solve_box_naive_amplify_sparse(
     A_csr,  # scipy.sparse.csr_matrix
     b,      # dense (d,)
@@ -23,11 +53,28 @@ def solve_box_naive_amplify_sparse(
     timeout_ms=1000,
     seed=0,
     ae_key_env="AE_KEY",
+    c0=None,
+    L0=1.0,
+    target_error=None,
+    target_space=None,
+    polish=None,
+    polish_L=1e-2,
+    polish_steps=None,
+    expand=1.0,
+    fast_beta=None,
+    streak=2,
+    rel_tol=None,
+    patience=3,
+    time_budget_s=None,
+    anneal_budget_s=None,
 ):
     d = len(b)
-    c = np.zeros(d)
-    L = 1.0
-    best_E = np.inf
+    c = np.zeros(d) if c0 is None else np.array(c0, dtype=float)
+    tr = TrustRegion(L0, beta, expand, fast_beta, streak)
+    stop = StopRule(epsilon, rel_tol, patience, time_budget_s, anneal_budget_s,
+                    switch_L=polish_L if polish else None)
+    stop_reason = "max_iter"
+    best_E = np.inf if c0 is None else 0.5 * c @ (A_csr @ c) - b @ c
 
     encode_time = 0.0
     anneal_time = 0.0
@@ -42,69 +89,75 @@ def solve_box_naive_amplify_sparse(
     set_seed(seed)
 
     # Cache sparse structure once, to avoid format conversions each iteration
-    I, J, V = cache_upper_triangle_coo(A_csr)
+    with span("template"):
+        I, J, V = cache_upper_triangle_coo(A_csr)
+
+    target = TargetTracker(A_csr, b, target_error, target_space)
+    target.update(c, 0, 0.0)
+    E_box = box_encoding(d)
 
     for it in range(1, max_iter + 1):
-        gen = VariableGenerator()
-        q1 = gen.array("Binary", d)
-        q2 = gen.array("Binary", d)
-        w = np.array([c[i] + L * (-2 * q1[i] + q2[i]) for i in range(d)], dtype=object)
-
-        # ----------- compile (CPU, sparse-aware) -----------
-        t0 = time.perf_counter()
-
-        # Quadratic term: 0.5 * sum_{i<=j} A_ij * w_i * w_j  (2x off-diagonals)
-        quad_poly = 0
-        for i, j, v in zip(I, J, V):
-            term = v * w[i] * w[j]
-            quad_poly += term if i == j else 2 * term
-        quad_poly = 0.5 * quad_poly
-
-        # Linear term: - b^T w
-        lin_poly = 0
-        for i in range(d):
-            lin_poly += b[i] * w[i]
-
-        energy = quad_poly - lin_poly
-        # This energy is already a Poly; Model(...) optional
-        model = energy  # or Model(energy) if you prefer consistency
-
-        encode_time += time.perf_counter() - t0
-
-        # --------------- solve (GPU) -------------------
-        wall_start = time.perf_counter()
-        result = safe_solve(model, client, num_solves=num_solves)
-        wall_end = time.perf_counter()
-        wall_time += wall_end - wall_start
-
-        if not result:
-            raise RuntimeError("Amplify returned no solutions")
-        anneal_time += result.execution_time.total_seconds()
-
-        sol = result.best
-        q1_sol = q1.evaluate(sol.values)
-        q2_sol = q2.evaluate(sol.values)
-        w_new = c + L * (-2 * q1_sol + q2_sol)
-
-        E_true = 0.5 * (w_new @ (A_csr @ w_new)) - b @ w_new
-        if E_true < best_E:
-            c = w_new
-            best_E = E_true
-        else:
-            L *= beta
-
-        if L < epsilon:
-            break
-
-    exact = np.linalg.solve(A_csr.toarray(), b)  # accuracy only
-    err = np.linalg.norm(c - exact)
+        with span("iter", it=it, L=tr.L):
+            # ----------- compile (CPU, sparse-aware) -----------
+            # variables, w = c + L(-2q1 + q2) and the energy Poly, as box-naive
+            with span("encode") as sp:
+                q, model = _encode_box_sparse(I, J, V, b, c, tr.L)
+            encode_time += sp.elapsed
+
+            # --------------- solve (GPU) -------------------
+            with span("submit") as sp:
+                result = safe_solve(model, client, num_solves=num_solves)
+                if result:
+                    record_span("anneal", result.execution_time.total_seconds())
+            wall_time += sp.elapsed
+
+            if not result:
+                raise RuntimeError("Amplify returned no solutions")
+            anneal_time += result.execution_time.total_seconds()
+
+            sol = result.best
+            with span("decode"):
+                w_new = c + tr.L * LinearDecoder(q, E_box)(sol.values)
+
+                E_true = 0.5 * (w_new @ (A_csr @ w_new)) - b @ w_new
+                if E_true < best_E:
+                    c = w_new
+                    best_E = E_true
+                    tr.accept()
+                else:
+                    tr.reject()
+
+            target.update(c, it, encode_time + anneal_time)
+
+            reason = stop.check(tr.L, best_E, anneal_time)
+            if reason:
+                stop_reason = reason
+                break
+
+    # ---------------- classical finisher (CPU) ----------------
+    polish_time = 0.0
+    if polish:
+        with span("polish") as sp:
+            c = polish_solution(A_csr, b, c, polish, polish_steps)
+        polish_time = sp.elapsed
+        target.update(c, it, encode_time + anneal_time + polish_time)
+
+    with span("error"):
+        exact = np.linalg.solve(A_csr.toarray(), b)  # accuracy only
+        err = np.linalg.norm(c - exact)
 
     return {
         "iterations": it,
         "encode_time": encode_time,
         "anneal_time": anneal_time,
-        "wall_time": wall_time + encode_time,
-        "total_time": encode_time + anneal_time,
+        "polish_time": polish_time,
+        "wall_time": wall_time + encode_time + polish_time,
+        "network_time": wall_time - anneal_time,
+        "total_time": encode_time + anneal_time + polish_time,
         "error": err,
+        "stop_reason": stop_reason,
+        "iters_to_target": target.iters,
+        "time_to_target": target.time,
+        "solution": c,
     }
 
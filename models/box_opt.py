@@ -1,10 +1,19 @@
-import time
 import numpy as np
 from amplify import VariableGenerator, Model, FixstarsClient, solve, set_seed
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
-from models.common_amplify import safe_solve
+from models.common_amplify import safe_solve, safe_parallel_solve, make_fixstars_client
+from models.warm_start import TargetTracker, box_size_hint, _dense
+from models.polish import polish_solution
+from models.qubo_prune import prune_couplings, energy_bound, box_qubo_nnz
+from models.qubo_fix import reduce_persistent, expand_assignment
+from models.box_qubo import box_qubo_matrices, box_step, to_amplify_matrix
+from models.qubo_io import export_box_qubo
+from models.decode import LinearDecoder, box_encoding
+from models.trust_region import TrustRegion, StopRule
+from models.trace import ConvergenceTrace
+from models.spans import span, record_span
 
 load_dotenv()
 
@@ -14,14 +23,14 @@ def _build_amplify_primitives(A):
     One-time construction of Amplify variables and the quadratic template.
 
     Returns:
-        q1, q2   : amplify variable arrays (length d)
+        q        : flat amplify variable array [q1; q2] (length 2d)
         dvec     : numpy object array of Poly (length d), each element is (-2*q1[i] + q2[i])
         quad_blk : Poly for 0.5 * d^T A d (independent of c and L, so reused)
     """
     d = A.shape[0]
     gen = VariableGenerator()
-    q1 = gen.array("Binary", d)
-    q2 = gen.array("Binary", d)
+    q = gen.array("Binary", 2 * d)
+    q1, q2 = q[:d], q[d:]
 
     dvec = np.array([-2 * q1[i] + q2[i] for i in range(d)], dtype=object)
 
@@ -35,7 +44,21 @@ def _build_amplify_primitives(A):
             term = Ai[j] * di * dvec[j]
             quad_poly += term if i == j else 2 * term  
     quad_blk = 0.5 * quad_poly
-    return q1, q2, dvec, quad_blk
+    return q, dvec, quad_blk
+
+
+def _box_model(coeff, nz, dvec, quad_blk, L):
+    """
+    Per‑iteration box-opt encode: Model(L · coeffᵀd + L² · quad_blk) over
+    the entries of coeff selected by the mask nz (constant term dropped).
+    """
+    lin_blk = np.dot(coeff[nz], dvec[nz])      # same as (coeff[nz] * dvec[nz]).sum()
+    return Model(L * lin_blk + (L * L) * quad_blk)
+
+
+def _ridge_block(dvec):
+    """Poly for 0.5 * d^T d: what λI adds to the quadratic template, per unit λ."""
+    return 0.5 * sum(di * di for di in dvec)
 
 
 def solve_box_opt_amplify(
@@ -47,26 +70,76 @@ def solve_box_opt_amplify(
     num_solves=1,
     timeout_ms=1000,
     seed=0,
+    c0=None,
+    L0=1.0,
+    target_error=None,
+    target_space=None,
+    polish=None,
+    polish_L=1e-2,
+    polish_steps=None,
+    prune_rel=None,
+    prune_topk=None,
+    fix_persistent=False,
+    export_dir=None,
+    template=None,
+    trace=False,
+    expand=1.0,
+    fast_beta=None,
+    streak=2,
+    rel_tol=None,
+    patience=3,
+    time_budget_s=None,
+    anneal_budget_s=None,
 ):
     """
     Optimized box algorithm using only Amplify.
-    Encoding cost per iteration is O(d), quadratic part is prebuilt.
+    Encoding cost per iteration is O(d), quadratic part is prebuilt; A c
+    is cached and only updated on accepted steps.
+    The box side follows `TrustRegion` and the run ends on `StopRule`
+    (see models/trust_region.py) or after max_iter.  Starts from c0 / L0
+    when given; with `polish` the box hands over to a classical finisher
+    once L < polish_L (models/polish.py).  prune_rel / prune_topk drop
+    weak couplings from the quadratic template (models/qubo_prune.py);
+    steps are then accepted on the energy of the full A.  `prune_bound`
+    is the worst‑case energy error of the pruned template at L = 1
+    (it scales with L²).  With `fix_persistent` each iteration builds the
+    numeric QUBO, fixes the binaries persistency proves (models/qubo_fix.py)
+    and submits only the rest; an iteration with every binary fixed needs
+    no anneal call.  `export_dir` writes every iteration's QUBO to
+    export_dir/iter_NNN (models/qubo_io.py, not counted in encode_time).
+    `template` = (q, dvec, quad_blk) reuses a prebuilt quadratic template
+    for this A (see `solve_box_opt_amplify_path`).  With `trace` the
+    result's `trace` is the per‑iteration log of models/trace.py (else None).
 
     Returns:
-        dict(iterations, encode_time, anneal_time, total_time, wall_time,
-             network_time, error)
+        dict(iterations, anneal_calls, encode_time, anneal_time, polish_time,
+             total_time, wall_time, network_time, error, stop_reason,
+             iters_to_target, time_to_target, solution, qubo_nnz, prune_bound,
+             fixed_frac, trace)
     """
     d = len(b)
-    q1, q2, dvec, quad_blk = _build_amplify_primitives(A)
+    A_q, prune = A, None
+    if prune_rel or prune_topk:
+        A_q, prune = prune_couplings(A, prune_rel, prune_topk)
+    with span("template", cached=template is not None):
+        if fix_persistent:
+            Q_unit, _ = box_qubo_matrices(A_q, np.zeros(d), 1.0)
+        else:
+            q, dvec, quad_blk = template or _build_amplify_primitives(A_q)
+            decode = LinearDecoder(q, box_encoding(d))
 
     # State
-    c = np.zeros(d)
-    L = 1.0
-    best_E = np.inf
+    c = np.zeros(d) if c0 is None else np.array(c0, dtype=float)
+    tr = TrustRegion(L0, beta, expand, fast_beta, streak)
+    stop = StopRule(epsilon, rel_tol, patience, time_budget_s, anneal_budget_s,
+                    switch_L=polish_L if polish else None)
+    stop_reason = "max_iter"
 
     encode_time = 0.0   # building lin_block + assembling final poly each iter
     anneal_time = 0.0   # reported GPU/solver exec time
     wall_time   = 0.0
+    anneal_calls = 0
+    n_fixed = 0         # persistency‑fixed binaries over all iterations
 
     # Fixstars client
     client = FixstarsClient()
@@ -78,60 +151,348 @@ def solve_box_opt_amplify(
     client.parameters.timeout = timedelta(milliseconds=timeout_ms)
     set_seed(seed)
 
-    E_c = 0.5 * c @ (A @ c) - b @ c
+    # ---- loop invariants and reusable buffers ----
+    A_inf = np.abs(A).sum(axis=1).max()       # ‖A‖_∞, for the mask tolerance
+    b_inf = np.abs(b).max()
+    Ac = A @ c                                # kept in sync with c
+    coeff = np.empty(d)
+    absbuf = np.empty(d)
+    nz = np.empty(d, dtype=bool)
+    h_buf = np.empty(2 * d)
+    As = np.empty(d)                          # A s of the current step
+
+    E_c = 0.5 * c @ Ac - b @ c
+    target = TargetTracker(A, b, target_error, target_space)
+    target.update(c, 0, 0.0)
+    tracer = ConvergenceTrace(A, b, max_iter, trace)
+    if tracer.enabled:
+        nnz_template = box_qubo_nnz(int(np.count_nonzero(np.triu(_dense(A_q), 1))), d)
+
     for it in range(1, max_iter + 1):
-        # Linear coefficients depend on c: coeff = A c - b
-        t0 = time.perf_counter()
-        coeff = A @ c - b
-        # mask-out exact zeros so we don’t generate useless Poly terms
-        tol = 1e-12 * (np.linalg.norm(A, ord=np.inf) * np.linalg.norm(c, ord=np.inf) + np.linalg.norm(b, ord=np.inf))
-        nz = np.abs(coeff) > tol
+        with span("iter", it=it, L=tr.L):
+            # Linear coefficients depend on c: coeff = A c - b
+            with span("encode") as sp:
+                np.subtract(Ac, b, out=coeff)
+                L = tr.L
+                if fix_persistent:
+                    # fix on ΔE / L² (same minimisers) so Q_unit is never rescaled
+                    np.multiply(coeff, -2.0 / L, out=h_buf[:d])
+                    np.multiply(coeff, 1.0 / L, out=h_buf[d:])
+                    free, fixed, vals, Q_r, h_r, const = reduce_persistent(Q_unit, h_buf)
+                    Q_r *= L * L
+                    h_r *= L * L
+                    const *= L * L
+                    n_fixed += len(fixed)
+                    m = to_amplify_matrix(Q_r, h_r) if len(free) else None
+                    model = Model(m) if len(free) else None
+                else:
+                    # mask-out exact zeros so we don’t generate useless Poly terms
+                    tol = 1e-12 * (A_inf * np.abs(c, out=absbuf).max() + b_inf)
+                    np.greater(np.abs(coeff, out=absbuf), tol, out=nz)
+                    model = _box_model(coeff, nz, dvec, quad_blk, L)
+
+            encode_time += sp.elapsed
+            if export_dir:
+                export_box_qubo(os.path.join(export_dir, f"iter_{it:03d}"),
+                                A_q, coeff, L, c, iteration=it)
 
-        lin_blk = np.dot(coeff[nz], dvec[nz])      # same as (coeff[nz] * dvec[nz]).sum()
+            s_star = None
+            if model is None:                    # persistency fixed every binary
+                s_star = box_step(expand_assignment(2 * d, free, fixed, vals, []), d)
+                E_val = const
+            else:
+                # Solve
+                with span("submit") as sp:
+                    result = safe_solve(model, client, num_solves=num_solves)
+                    if result:
+                        record_span("anneal", result.execution_time.total_seconds())
+                wall_time += sp.elapsed
+                anneal_calls += 1
 
-        # final polynomial  (constant term is irrelevant to argmin)
-        poly  = L * lin_blk + (L * L) * quad_blk
-        model = Model(poly)
+                if not result:
+                    raise RuntimeError("Amplify returned no solutions")
 
-        encode_time += time.perf_counter() - t0
+                anneal_time += result.execution_time.total_seconds()
 
-        # Solve
-        w_start = time.perf_counter()
-        result = safe_solve(model, client, num_solves=num_solves)
-        w_end = time.perf_counter()
-        wall_time += (w_end - w_start)
+                sol = result.best
+                E_val = sol.objective
 
-        if not result:
-            raise RuntimeError("Amplify returned no solutions")
+            # Decode w
+            with span("decode"):
+                if fix_persistent and model is not None:
+                    bits = m.variable_array.evaluate(sol.values)
+                    s_star = box_step(expand_assignment(2 * d, free, fixed, vals, bits), d)
+                    E_val += const
 
-        anneal_time += result.execution_time.total_seconds()
+                have_As = False
+                if prune is not None:                # pruned template: judge on full A
+                    if s_star is None:
+                        s_star = decode(sol.values)
+                    np.matmul(A, s_star, out=As)
+                    have_As = True
+                    E_val = L * (coeff @ s_star) + 0.5 * L * L * (s_star @ As)
 
-        sol = result.best
-        E_val = sol.objective
+                if E_val < 0:                        # translate
+                    if s_star is None:
+                        s_star = decode(sol.values)
+                    if not have_As:
+                        np.matmul(A, s_star, out=As)
+                    s_star *= L                      # fresh decode, safe to scale in place
+                    As *= L
+                    c += s_star
+                    Ac += As                         # keep A c in sync with c
+                    E_c += E_val                     # update cached center energy
+                    tr.accept()
+                else:                               # contract
+                    tr.reject()
 
-        # Decode w
-        E_true = E_c + E_val
+            target.update(c, it, encode_time + anneal_time)
+            if tracer.enabled:
+                if model is None:
+                    nnz = 0
+                elif fix_persistent:
+                    nnz = int(np.count_nonzero(np.triu(Q_r, 1)))
+                else:
+                    nnz = nnz_template
+                tracer.record(it, L, E_val < 0, E_val, E_c, c,
+                              encode_time, anneal_time, wall_time, nnz)
 
-        if E_val < 0:                        # translate
-            q1_sol = q1.evaluate(result.best.values)
-            q2_sol = q2.evaluate(result.best.values)
-            s_star = (-2 * q1_sol + q2_sol)
-            c = c + L * s_star
-            E_c = E_true                   # update cached center energy
-        else:                               # contract
-            L *= beta
+            reason = stop.check(tr.L, E_c, anneal_time)
+            if reason:
+                stop_reason = reason
+                break
 
-    exact = np.linalg.solve(A, b)
-    err   = np.linalg.norm(c - exact)
+    # ---------------- classical finisher (CPU) ----------------
+    polish_time = 0.0
+    if polish:
+        with span("polish") as sp:
+            c = polish_solution(A, b, c, polish, polish_steps)
+        polish_time = sp.elapsed
+        target.update(c, it, encode_time + anneal_time + polish_time)
+
+    with span("error"):
+        exact = np.linalg.solve(A, b)
+        err   = np.linalg.norm(c - exact)
     network_time = wall_time - anneal_time
+    if prune is None:
+        offdiag_nnz, dropped_l1 = int(np.count_nonzero(np.triu(A, 1))), 0.0
+    else:
+        offdiag_nnz, dropped_l1 = prune["offdiag_nnz"], prune["dropped_l1"]
 
     return {
         "iterations": it,
+        "anneal_calls": anneal_calls,
         "encode_time": encode_time,
         "anneal_time": anneal_time,
-        "total_time": encode_time + anneal_time,   # network-free
-        "wall_time": wall_time + encode_time,      # encode + network
+        "polish_time": polish_time,
+        "total_time": encode_time + anneal_time + polish_time,   # network-free
+        "wall_time": wall_time + encode_time + polish_time,      # encode + network
         "network_time": network_time,
         "error": err,
+        "stop_reason": stop_reason,
+        "iters_to_target": target.iters,
+        "time_to_target": target.time,
+        "solution": c,
+        "qubo_nnz": box_qubo_nnz(offdiag_nnz, d),
+        "prune_bound": energy_bound(dropped_l1, 2.0),
+        "fixed_frac": n_fixed / (2 * d * it),
+        "trace": tracer.array(),
     }
 
+
+def solve_box_opt_amplify_path(A, b, lambdas, L0=1.0, **kw):
+    """
+    Ridge path: solve (A + λI) c = b for each λ in `lambdas` (in the order
+    given, typically decreasing).  λI only adds λ · 0.5 Σ d_i² to the
+    quadratic template, so the template is built once (`template_time` on
+    the first entry) and patched per λ.  Each λ starts from the previous
+    solution with the box side from `box_size_hint`.  Other keyword
+    arguments go to `solve_box_opt_amplify`, except the options that
+    replace the shared template (fix_persistent, prune_rel, prune_topk),
+    which raise ValueError.
+
+    Returns a list of its result dicts, one per λ, with `lam`, `L0`,
+    `template_time` and `error` measured against the ridge solution.
+    """
+    unsupported = [k for k in ("fix_persistent", "prune_rel", "prune_topk") if kw.get(k)]
+    if unsupported:
+        raise ValueError(f"{', '.join(unsupported)} not supported on the ridge path "
+                         "(it reuses one unpruned template)")
+    d = len(b)
+    with span("template") as sp:
+        q, dvec, quad_blk = _build_amplify_primitives(A)
+        ridge_blk = _ridge_block(dvec)
+    build_time = sp.elapsed
+
+    path, c = [], None
+    for lam in lambdas:
+        with span("template", lam=lam) as sp:
+            A_lam = A + lam * np.eye(d)
+            template = (q, dvec, quad_blk + lam * ridge_blk if lam else quad_blk)
+            L_start = L0 if c is None else box_size_hint(A_lam, b, c, L_max=L0)
+        patch_time = sp.elapsed
+
+        res = solve_box_opt_amplify(A_lam, b, c0=c, L0=L_start, template=template, **kw)
+        res["lam"] = lam
+        res["L0"] = L_start
+        res["template_time"] = build_time + patch_time
+        res["total_time"] += res["template_time"]
+        res["wall_time"] += res["template_time"]
+        path.append(res)
+        c = res["solution"]
+        build_time = 0.0
+    return path
+
+
+def solve_box_opt_amplify_multi(
+    A,
+    B,
+    beta=0.2,
+    epsilon=1e-6,
+    max_iter=50,
+    num_solves=1,
+    timeout_ms=1000,
+    seed=0,
+    C0=None,
+    L0=1.0,
+    batch=True,
+    polish=None,
+    polish_L=1e-2,
+    polish_steps=None,
+    expand=1.0,
+    fast_beta=None,
+    streak=2,
+    rel_tol=None,
+    patience=3,
+    time_budget_s=None,
+    anneal_budget_s=None,
+):
+    """
+    Box-opt for several right-hand sides B[:, k] (CV folds, bootstrap
+    replicates, multi-output y) against one A.  The quadratic template is
+    built once (`template_time`); each iteration only adds one linear block
+    per still-running target.  With `batch` the targets' QUBOs of an
+    iteration go out in one parallel_solve submission, otherwise they are
+    solved one after another (interleaved).  Every target keeps its own
+    TrustRegion / StopRule; anneal_budget_s applies to the anneal time of
+    that target's own QUBOs (`anneal_time` is the total over targets).
+
+    Returns:
+        dict(iterations[k], anneal_calls, template_time, encode_time,
+             anneal_time, polish_time, total_time, wall_time, network_time,
+             errors[k], stop_reasons[k], solutions (d, m))
+    """
+    B = np.asarray(B, dtype=float)
+    if B.ndim == 1:
+        B = B[:, None]
+    d, m = B.shape
+
+    with span("template") as sp:
+        q, dvec, quad_blk = _build_amplify_primitives(A)
+        decode = LinearDecoder(q, box_encoding(d))
+    template_time = sp.elapsed
+
+    C = np.zeros((d, m)) if C0 is None else np.array(C0, dtype=float).reshape(d, m)
+    AC = A @ C                                 # kept in sync with C
+    E = 0.5 * np.einsum("ij,ij->j", C, AC) - np.einsum("ij,ij->j", B, C)
+    trs = [TrustRegion(L0, beta, expand, fast_beta, streak) for _ in range(m)]
+    stops = [StopRule(epsilon, rel_tol, patience, time_budget_s, anneal_budget_s,
+                      switch_L=polish_L if polish else None) for _ in range(m)]
+    stop_reasons = ["max_iter"] * m
+    iterations = [0] * m
+    active = list(range(m))
+
+    A_inf = np.abs(A).sum(axis=1).max()
+    B_inf = np.abs(B).max(axis=0)
+
+    encode_time = 0.0
+    anneal_time = 0.0
+    target_anneal = [0.0] * m                  # per-target budget for StopRule
+    wall_time   = 0.0
+    anneal_calls = 0
+
+    client = make_fixstars_client(timeout_ms)
+    set_seed(seed)
+
+    for it in range(1, max_iter + 1):
+        if not active:
+            break
+
+        with span("iter", it=it, active=len(active)):
+            # ---------------- encode: one linear block per target ----------
+            with span("encode") as sp:
+                models, coeffs, Ls = [], [], []
+                for k in active:
+                    coeff = AC[:, k] - B[:, k]
+                    tol = 1e-12 * (A_inf * np.abs(C[:, k]).max() + B_inf[k])
+                    nz = np.abs(coeff) > tol
+                    L = trs[k].L
+                    models.append(_box_model(coeff, nz, dvec, quad_blk, L))
+                    coeffs.append(coeff)
+                    Ls.append(L)
+            encode_time += sp.elapsed
+
+            # ---------------- solve ------------------------------------
+            with span("submit", batch=len(models)) as sp:
+                if batch and len(models) > 1:
+                    results = safe_parallel_solve(models, client, num_solves=num_solves)
+                else:
+                    results = [safe_solve(mod, client, num_solves=num_solves) for mod in models]
+                for result in results:
+                    if result:
+                        record_span("anneal", result.execution_time.total_seconds())
+            wall_time += sp.elapsed
+            anneal_calls += len(models)
+
+            # ---------------- per-target accept / contract ------------
+            with span("decode"):
+                for k, L, result in zip(list(active), Ls, results):
+                    if not result:
+                        raise RuntimeError("Amplify returned no solutions")
+                    t = result.execution_time.total_seconds()
+                    anneal_time += t
+                    target_anneal[k] += t
+                    sol = result.best
+                    iterations[k] = it
+
+                    if sol.objective < 0:
+                        step = L * decode(sol.values)
+                        C[:, k] += step
+                        AC[:, k] += A @ step
+                        E[k] += sol.objective
+                        trs[k].accept()
+                    else:
+                        trs[k].reject()
+
+                    reason = stops[k].check(trs[k].L, E[k], target_anneal[k])
+                    if reason:
+                        stop_reasons[k] = reason
+                        active.remove(k)
+
+    # ---------------- classical finisher (CPU) ----------------
+    polish_time = 0.0
+    if polish:
+        with span("polish") as sp:
+            for k in range(m):
+                C[:, k] = polish_solution(A, B[:, k], C[:, k], polish, polish_steps)
+        polish_time = sp.elapsed
+
+    with span("error"):
+        exact = np.linalg.solve(A, B)
+        errors = np.linalg.norm(C - exact, axis=0)
+    network_time = wall_time - anneal_time
+
+    return {
+        "iterations": iterations,
+        "anneal_calls": anneal_calls,
+        "template_time": template_time,
+        "encode_time": encode_time,
+        "anneal_time": anneal_time,
+        "polish_time": polish_time,
+        "total_time": template_time + encode_time + anneal_time + polish_time,
+        "wall_time": wall_time + template_time + encode_time + polish_time,
+        "network_time": network_time,
+        "errors": errors,
+        "stop_reasons": stop_reasons,
+        "solutions": C,
+    }
@@ -1,13 +1,20 @@
 # box_opt_sparse.py
 
-import time
 import numpy as np
-from amplify import VariableGenerator, Model, FixstarsClient, set_seed
+from amplify import VariableGenerator, FixstarsClient, set_seed
 from datetime import timedelta
 import os
 
 from .sparse_box import cache_upper_triangle_coo
 from models.common_amplify import safe_solve  # your helper
+from models.warm_start import TargetTracker
+from models.polish import polish_solution
+from models.qubo_prune import prune_couplings, energy_bound, box_qubo_nnz
+from models.trust_region import TrustRegion, StopRule
+from models.qubo_io import export_box_qubo
+from models.decode import LinearDecoder, box_encoding
+from models.spans import span, record_span
+from models.box_opt import _box_model
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,11 +22,12 @@ load_dotenv()
 def _build_amplify_primitives_sparse(A_csr):
     """
     One-time construction of Amplify variables and sparse quadratic template.
+    Returns the flat variable array q = [q1; q2], dvec and quad_blk.
     """
     d = A_csr.shape[0]
     gen = VariableGenerator()
-    q1 = gen.array("Binary", d)
-    q2 = gen.array("Binary", d)
+    q = gen.array("Binary", 2 * d)
+    q1, q2 = q[:d], q[d:]
     dvec = np.array([-2 * q1[i] + q2[i] for i in range(d)], dtype=object)
 
     I, J, V = cache_upper_triangle_coo(A_csr)
@@ -31,7 +39,7 @@ def _build_amplify_primitives_sparse(A_csr):
         quad_poly += term if i == j else 2 * term
 
     quad_blk = 0.5 * quad_poly
-    return q1, q2, dvec, quad_blk
+    return q, dvec, quad_blk
 
 
 def solve_box_opt_amplify_sparse(
@@ -44,13 +52,40 @@ def solve_box_opt_amplify_sparse(
     timeout_ms=1000,
     seed=0,
     ae_key_env="AE_KEY",
+    c0=None,
+    L0=1.0,
+    target_error=None,
+    target_space=None,
+    polish=None,
+    polish_L=1e-2,
+    polish_steps=None,
+    prune_rel=None,
+    prune_topk=None,
+    export_dir=None,
+    expand=1.0,
+    fast_beta=None,
+    streak=2,
+    rel_tol=None,
+    patience=3,
+    time_budget_s=None,
+    anneal_budget_s=None,
 ):
     d = len(b)
-    q1, q2, dvec, quad_blk = _build_amplify_primitives_sparse(A_csr)
-
-    c = np.zeros(d)
-    L = 1.0
-    best_E = np.inf
+    # optional coupling pruning: only the template sees the pruned matrix,
+    # acceptance below already uses the true energy on A_csr
+    A_q, prune = A_csr, None
+    if prune_rel or prune_topk:
+        A_q, prune = prune_couplings(A_csr, prune_rel, prune_topk)
+    with span("template"):
+        q, dvec, quad_blk = _build_amplify_primitives_sparse(A_q)
+        decode = LinearDecoder(q, box_encoding(d))
+
+    c = np.zeros(d) if c0 is None else np.array(c0, dtype=float)
+    tr = TrustRegion(L0, beta, expand, fast_beta, streak)
+    stop = StopRule(epsilon, rel_tol, patience, time_budget_s, anneal_budget_s,
+                    switch_L=polish_L if polish else None)
+    stop_reason = "max_iter"
+    best_E = np.inf if c0 is None else 0.5 * c @ (A_csr @ c) - b @ c
 
     encode_time = 0.0
     anneal_time = 0.0
@@ -64,70 +99,103 @@ def solve_box_opt_amplify_sparse(
     client.parameters.timeout = timedelta(milliseconds=timeout_ms)
     set_seed(seed)
 
-    # Precompute norms for a decent tolerance baseline
-    A_inf = np.linalg.norm(A_csr.toarray(), ord=np.inf) if d <= 1024 else None
+    # ---- loop invariants and reusable buffers ----
+    A_inf = abs(A_csr).sum(axis=1).max()      # ‖A‖_∞ in O(nnz), no dense copy
+    b_inf = np.abs(b).max()
+    Ac = A_csr @ c                            # kept in sync with c
+    E_c = 0.5 * c @ Ac - b @ c
+    coeff = np.empty(d)
+    absbuf = np.empty(d)
+    nz = np.empty(d, dtype=bool)
+
+    target = TargetTracker(A_csr, b, target_error, target_space)
+    target.update(c, 0, 0.0)
 
     for it in range(1, max_iter + 1):
-        # Sparse matvec (dominant per-iter term in opt): O(nnz)
-        coeff = A_csr @ c - b
-
-        t0 = time.perf_counter()
-        # mask small coefficients to avoid needless Poly ops
-        if A_inf is None:
-            tol = 1e-12 * (np.linalg.norm(c, ord=np.inf) + np.linalg.norm(b, ord=np.inf))
-        else:
-            tol = 1e-12 * (A_inf * np.linalg.norm(c, ord=np.inf) + np.linalg.norm(b, ord=np.inf))
-
-        nz_idx = np.flatnonzero(np.abs(coeff) > tol)
-
-        # Build linear block: sum_i coeff[i] * dvec[i]
-        lin_blk = 0
-        for i in nz_idx:
-            lin_blk += coeff[i] * dvec[i]
-
-        poly = L * lin_blk + (L * L) * quad_blk
-        model = Model(poly)
-        encode_time += time.perf_counter() - t0
-
-        # Solve
-        w_start = time.perf_counter()
-        result = safe_solve(model, client, num_solves=num_solves)
-        w_end = time.perf_counter()
-        wall_time += (w_end - w_start)
-
-        if not result:
-            raise RuntimeError("Amplify returned no solutions")
-        anneal_time += result.execution_time.total_seconds()
-        sol = result.best
-
-        # Decode
-        q1_sol = q1.evaluate(sol.values)
-        q2_sol = q2.evaluate(sol.values)
-        w_new = c + L * (-2 * q1_sol + q2_sol)
-
-        # True energy (for accept/contract)
-        E_true = 0.5 * w_new @ (A_csr @ w_new) - b @ w_new
-
-        if E_true < best_E:
-            c = w_new
-            best_E = E_true
-        else:
-            L *= beta
-
-        if L < epsilon:
-            break
-
-    exact = np.linalg.solve(A_csr.toarray(), b)  # for error reporting only
-    err = np.linalg.norm(c - exact)
+        with span("iter", it=it, L=tr.L):
+            with span("encode") as sp:
+                np.subtract(Ac, b, out=coeff)       # from the cached A c: O(d)
+
+                # mask small coefficients to avoid needless Poly ops
+                tol = 1e-12 * (A_inf * np.abs(c, out=absbuf).max() + b_inf)
+                np.greater(np.abs(coeff, out=absbuf), tol, out=nz)
+
+                L = tr.L
+                model = _box_model(coeff, nz, dvec, quad_blk, L)
+            encode_time += sp.elapsed
+            if export_dir:                  # replayable copy, outside the timers
+                export_box_qubo(os.path.join(export_dir, f"iter_{it:03d}"),
+                                A_q, coeff, L, c, iteration=it)
+
+            # Solve
+            with span("submit") as sp:
+                result = safe_solve(model, client, num_solves=num_solves)
+                if result:
+                    record_span("anneal", result.execution_time.total_seconds())
+            wall_time += sp.elapsed
+
+            if not result:
+                raise RuntimeError("Amplify returned no solutions")
+            anneal_time += result.execution_time.total_seconds()
+            sol = result.best
+
+            with span("decode"):
+                # Decode; the one sparse matvec per iteration is A s
+                s_star = decode(sol.values)
+                As = A_csr @ s_star
+
+                # True energy (for accept/contract), incremental from the centre
+                E_true = E_c + L * (coeff @ s_star) + 0.5 * L * L * (s_star @ As)
+
+                if E_true < best_E:
+                    s_star *= L
+                    As *= L
+                    c += s_star
+                    Ac += As
+                    E_c = best_E = E_true
+                    tr.accept()
+                else:
+                    tr.reject()
+
+            target.update(c, it, encode_time + anneal_time)
+
+            reason = stop.check(tr.L, best_E, anneal_time)
+            if reason:
+                stop_reason = reason
+                break
+
+    # ---------------- classical finisher (CPU) ----------------
+    polish_time = 0.0
+    if polish:
+        with span("polish") as sp:
+            c = polish_solution(A_csr, b, c, polish, polish_steps)
+        polish_time = sp.elapsed
+        target.update(c, it, encode_time + anneal_time + polish_time)
+
+    with span("error"):
+        exact = np.linalg.solve(A_csr.toarray(), b)  # for error reporting only
+        err = np.linalg.norm(c - exact)
     network_time = wall_time - anneal_time
+    if prune is None:
+        I, J, _ = cache_upper_triangle_coo(A_csr)
+        offdiag_nnz, dropped_l1 = int(np.count_nonzero(I != J)), 0.0
+    else:
+        offdiag_nnz, dropped_l1 = prune["offdiag_nnz"], prune["dropped_l1"]
 
     return {
         "iterations": it,
         "encode_time": encode_time,
         "anneal_time": anneal_time,
-        "total_time": encode_time + anneal_time,
-        "wall_time": wall_time + encode_time,
+        "polish_time": polish_time,
+        "total_time": encode_time + anneal_time + polish_time,
+        "wall_time": wall_time + encode_time + polish_time,
         "network_time": network_time,
         "error": err,
+        "stop_reason": stop_reason,
+        "iters_to_target": target.iters,
+        "time_to_target": target.time,
+        "solution": c,
+        "qubo_nnz": box_qubo_nnz(offdiag_nnz, d),
+        "prune_bound": energy_bound(dropped_l1, 2.0),   # at L = 1
     }
 
@@ -0,0 +1,67 @@
+# models/box_qubo.py
+"""
+Numeric (NumPy) form of the box QUBO.
+
+The box step is  s = -2*q1 + q2  with q1, q2 binary, so s_i ∈ {-2,-1,0,1}.
+Stacking  x = [q1; q2]  (length 2d) the step is  s = M x  with
+M = [-2 I | I], and the energy change of moving from c to c + L*s is
+
+    ΔE(s) = L * coeff^T s + 0.5 * L^2 * s^T A s,     coeff = A c - b
+          = x^T Q x + h^T x
+
+with  Q = 0.5 * L^2 * M^T A M  and  h = L * M^T coeff.
+These arrays can be handed to Amplify as a `Matrix` without building
+any symbolic Poly, which keeps the encode cost at a few BLAS calls.
+"""
+
+import numpy as np
+from scipy.sparse import bmat, csr_matrix, diags
+from amplify import VariableGenerator
+
+
+def box_qubo_matrices(A, coeff, L):
+    """
+    Return (Q, h) for the box step with the (sub-)matrix `A` and linear
+    coefficients `coeff`.  `L` may be a scalar or a per-coordinate array.
+    """
+    L = np.broadcast_to(np.asarray(L, dtype=float), coeff.shape)
+    As = 0.5 * (L[:, None] * A * L[None, :])
+    Q = np.block([[4.0 * As, -2.0 * As],
+                  [-2.0 * As, As]])
+    Lg = L * coeff
+    h = np.concatenate((-2.0 * Lg, Lg))
+    return Q, h
+
+
+def box_qubo_sparse(A, coeff, L):
+    """
+    Same (Q, h) as `box_qubo_matrices` with Q as a CSR matrix, built from
+    dense or sparse A without forming the dense 2d x 2d array.
+    """
+    L = np.broadcast_to(np.asarray(L, dtype=float), coeff.shape)
+    Ls = diags(L)
+    As = 0.5 * (Ls @ csr_matrix(A) @ Ls)
+    Q = bmat([[4.0 * As, -2.0 * As],
+              [-2.0 * As, As]], format="csr")
+    Lg = L * coeff
+    h = np.concatenate((-2.0 * Lg, Lg))
+    return Q, h
+
+
+def box_step(bits, d):
+    """Decode a flat bit vector [q1; q2] into the step s = -2*q1 + q2."""
+    return -2.0 * bits[:d] + bits[d:2 * d]
+
+
+def qubo_energy(Q, h, x):
+    """Evaluate  x^T Q x + h^T x  (used for checks and accept tests)."""
+    return x @ (Q @ x) + h @ x
+
+
+def to_amplify_matrix(Q, h):
+    """Wrap numeric (Q, h) in a fresh Amplify `Matrix` over binaries."""
+    gen = VariableGenerator()
+    m = gen.matrix("Binary", len(h))
+    m.quadratic = Q
+    m.linear = h
+    return m
@@ -3,7 +3,6 @@ Classical regression baselines + simple timing helpers.
 Only external dependency: scikit‑learn.
 """
 
-import time
 import numpy as np
 from sklearn.linear_model import (
     LinearRegression,
@@ -13,6 +12,8 @@ from sklearn.linear_model import (
 )
 from sklearn.metrics import r2_score, mean_squared_error
 
+from models.spans import span
+
 
 # ------------------------------------------------------------------ #
 #   Timing decorator
@@ -20,9 +21,9 @@ from sklearn.metrics import r2_score, mean_squared_error
 
 def _timed(func):
     def wrapper(*args, **kw):
-        t0 = time.perf_counter()
-        out = func(*args, **kw)
-        return out, time.perf_counter() - t0
+        with span("fit", model=func.__name__[len("train_"):]) as sp:
+            out = func(*args, **kw)
+        return out, sp.elapsed
     return wrapper
 
 
@@ -70,9 +71,9 @@ def train_sgd(X, y, lr=0.01, n_iter=1_000):
 # ------------------------------------------------------------------ #
 
 def evaluate(model, X_test, y_test):
-    t0 = time.perf_counter()
-    y_pred = model.predict(X_test)
-    pred_time = time.perf_counter() - t0
+    with span("predict") as sp:
+        y_pred = model.predict(X_test)
+    pred_time = sp.elapsed
 
     return {
         "r2": r2_score(y_test, y_pred),
@@ -1,6 +1,7 @@
 # models/common_amplify.py
-import random, time
-from amplify import solve                # the normal solver
+import os, random, time
+from datetime import timedelta
+from amplify import solve, parallel_solve, FixstarsClient
 
 # --- helper ---------------------------------------------------------------
 
@@ -66,3 +67,52 @@ def safe_solve(model, client, *,
             time.sleep(slp)
             delay = min(delay * 2, max_delay_sec)
 
+
+
+def safe_parallel_solve(models, client, *,
+                        num_solves     = 1,
+                        max_attempts   = 6,
+                        base_delay_sec = 1.0,
+                        max_delay_sec  = 60.0,
+                        jitter_frac    = 0.2):
+    """
+    `amplify.parallel_solve` with the same back‑off policy as `safe_solve`.
+
+    The whole batch is retried on a transient error, so a returned list
+    always holds one Result per model.
+
+    Raises
+    ------
+    RuntimeError          : when any job came back without solutions
+    """
+    delay = base_delay_sec
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            results = parallel_solve(list(models), client, num_solves=num_solves)
+            break
+
+        except Exception as err:
+            if attempt == max_attempts or not _is_retryable(err):
+                raise
+
+            slp = delay * (1 + jitter_frac * (2*random.random() - 1))
+            print(f"[safe_parallel_solve] attempt {attempt}/{max_attempts} failed "
+                  f"({err}).  Sleeping {slp:.1f}s …", flush=True)
+            time.sleep(slp)
+            delay = min(delay * 2, max_delay_sec)
+
+    if any(not r for r in results):
+        raise RuntimeError("Amplify returned no solutions")
+    return results
+
+
+def make_fixstars_client(timeout_ms, ae_key_env="AE_KEY"):
+    """FixstarsClient with token from the environment and a solver time‑out."""
+    client = FixstarsClient()
+    key = os.getenv(ae_key_env)
+    if not key:
+        raise RuntimeError(f"{ae_key_env} not found in environment")
+    client.token = key
+    client.parameters.timeout = timedelta(milliseconds=timeout_ms)
+    return client
@@ -0,0 +1,45 @@
+# models/decode.py
+"""
+Array decoding of Amplify solutions.
+
+Every encoding in this repo is linear in the binaries:
+
+    box     s = [-2 I | I] x          x = [q1; q2]
+    Potok   w = (I_d ⊗ P) x           x ordered (j, k)
+
+so a solution is decoded with one `evaluate` on the flat variable array
+(one call into Amplify, returns a NumPy bit vector) and one sparse matmul
+with the encoding matrix, instead of evaluating d Poly objects.
+"""
+
+import numpy as np
+from scipy.sparse import hstack, identity, kron, csr_matrix
+
+
+def box_encoding(d):
+    """E with  s = E x  for x = [q1; q2]  (d x 2d, CSR)."""
+    I = identity(d, format="csr")
+    return hstack([-2.0 * I, I], format="csr")
+
+
+def potok_encoding(d, P):
+    """E with  w = E x  for bits ordered (j, k)  (d x dK, CSR)."""
+    P = np.asarray(P, dtype=float)
+    return kron(identity(d, format="csr"), csr_matrix(P[None, :]), format="csr")
+
+
+class LinearDecoder:
+    """
+    Maps a solution's `values` to  E @ bits  where bits are the flat
+    `variables` (PolyArray, any shape, flattened in C order).
+    """
+
+    def __init__(self, variables, E):
+        self.variables = variables
+        self.E = E
+
+    def bits(self, values):
+        return np.ravel(self.variables.evaluate(values))
+
+    def __call__(self, values):
+        return self.E @ self.bits(values)
@@ -0,0 +1,31 @@
+# models/polish.py
+"""
+Classical finisher for the box solvers.
+
+Once the box is small every further anneal buys a tiny correction that a
+local method gets in microseconds.  `polish_solution` refines the box
+centre on the same (A, b):
+
+    "cg"      `steps` conjugate‑gradient iterations started at c
+              (default d, i.e. exact in exact arithmetic)
+    "newton"  one Newton step  c - A^{-1}(A c - b), exact for the quadratic
+"""
+
+import numpy as np
+from scipy.sparse import issparse
+from scipy.sparse.linalg import spsolve
+
+from models.warm_start import cg_steps
+
+POLISH_METHODS = ("cg", "newton")
+
+
+def polish_solution(A, b, c, method="cg", steps=None):
+    if method not in POLISH_METHODS:
+        raise ValueError(f"unknown polish method '{method}', expected one of {POLISH_METHODS}")
+    if method == "cg":
+        return cg_steps(A, b, len(b) if steps is None else steps, x0=c)
+    if method == "newton":
+        g = A @ c - b
+        step = spsolve(A.tocsc(), g) if issparse(A) else np.linalg.solve(A, g)
+        return c - step
@@ -1,12 +1,17 @@
 # models/potok.py  ── drop‑in module, no typing / __future__
 
-import time
 import numpy as np
-from amplify import VariableGenerator, Model, FixstarsClient, solve, set_seed
+from amplify import VariableGenerator, Model, FixstarsClient, set_seed
 from datetime import timedelta
 import os
 from dotenv import load_dotenv  
 from models.common_amplify import safe_solve
+from models.box_qubo import to_amplify_matrix
+from models.qubo_prune import prune_couplings, energy_bound, potok_qubo_nnz
+from models.qubo_io import export_potok_qubo
+from models.decode import LinearDecoder, potok_encoding
+from models.warm_start import box_size_hint
+from models.spans import span, record_span
 
 load_dotenv()
 
@@ -33,6 +38,108 @@ def _build_primitives(d, P_arr):
     return bins, np.array(w_syms, dtype=object)
 
 
+def _symbolic_model(A, b, P_arr):
+    """Symbolic Potok encode: (bins, Model of ½ wᵀA w − bᵀw) with w = P·bins, O(d²K²)."""
+    d = len(b)
+    bins, w_syms = _build_primitives(d, P_arr)
+    obj = 0
+    for i in range(d):
+        for j in range(d):
+            obj += 0.5 * A[i, j] * w_syms[i] * w_syms[j]
+    for i in range(d):
+        obj += -b[i] * w_syms[i]
+    return bins, Model(obj)                      # already quadratic
+
+
+def signed_p_vector(K, scale=1.0):
+    """
+    Two's‑complement precision vector  scale · (-1, ½, ¼, …, 2^(1-K)).
+    Its 2^K sums cover [-scale, scale) evenly, so negative weights are
+    representable and zero is always on the grid.
+    """
+    return tuple(-scale if k == 0 else scale * 2.0 ** -k for k in range(K))
+
+
+def potok_qubo_matrices(A, g, P):
+    """
+    Numeric Potok QUBO for a step  w = c + B x,  B = I_d ⊗ P  (bits ordered
+    (j, k)):  ΔE = x^T Q x + h^T x  with  Q = ½ A ⊗ P P^T,  h = g ⊗ P,
+    where g = A c - b.
+    """
+    P = np.asarray(P, dtype=float)
+    Q = 0.5 * np.kron(A, np.outer(P, P))
+    h = np.kron(g, P)
+    return Q, h
+
+
+def potok_ridge_patch(Q, lam, P):
+    """
+    Q of A + λI from Q of A:  adds ½λ · I ⊗ P Pᵀ, i.e. only the d diagonal
+    K×K blocks change.  Returns a new array.
+    """
+    P = np.asarray(P, dtype=float)
+    K = len(P)
+    d = Q.shape[0] // K
+    Q = Q.copy()
+    blocks = Q.reshape(d, K, d, K)
+    j = np.arange(d)
+    blocks[j, :, j, :] += 0.5 * lam * np.outer(P, P)
+    return Q
+
+
+def _p_reach(P):
+    """Largest |w_j| the precision vector can encode."""
+    P = np.asarray(P, dtype=float)
+    return max(P[P > 0].sum(), -P[P < 0].sum())
+
+
+def build_potok_template(X, y, P_max, prune_rel=None, prune_topk=None):
+    """
+    Per‑(d, seed) data shared by a whole K sweep:  A = XᵀX, b = Xᵀy, the
+    reference solution, and the max‑K coefficient tensor
+
+        quad[i,k,j,l] = ½ A_ij P_k P_l,     lin[i,k] = -b_i P_k.
+
+    Every precision vector that is a prefix of P_max (true for both the
+    default and the signed rule) maps to a slice of these arrays.
+    With prune_rel / prune_topk the tensor is built from a pruned copy A_q
+    (models/qubo_prune.py); A itself stays exact for gradients and checks.
+    """
+    P_max = np.asarray(P_max, dtype=float)
+    with span("gram"):
+        A = X.T @ X
+        b = X.T @ y
+    if prune_rel or prune_topk:
+        A_q, prune = prune_couplings(A, prune_rel, prune_topk)
+    else:
+        A_q = A
+        prune = {"offdiag_nnz": int(np.count_nonzero(np.triu(A, 1))), "dropped_l1": 0.0}
+    quad = 0.5 * A_q[:, None, :, None] * np.multiply.outer(P_max, P_max)[None, :, None, :]
+    return {
+        "A": A,
+        "A_q": A_q,
+        "b": b,
+        "P": P_max,
+        "quad": quad,
+        "lin": -np.outer(b, P_max),
+        "w_exact": np.linalg.lstsq(X, y, rcond=None)[0],
+        "offdiag_nnz": prune["offdiag_nnz"],
+        "dropped_l1": prune["dropped_l1"],
+    }
+
+
+def potok_qubo_from_template(template, P):
+    """(Q, h) for precision vector P, sliced from the template when possible."""
+    P = np.asarray(P, dtype=float)
+    K = len(P)
+    d = len(template["b"])
+    if K <= len(template["P"]) and np.array_equal(P, template["P"][:K]):
+        Q = template["quad"][:, :K, :, :K].reshape(d * K, d * K)
+        h = template["lin"][:, :K].reshape(d * K)
+        return Q, h
+    return potok_qubo_matrices(template["A_q"], -template["b"], P)
+
+
 # ----------------------------------------------------------------------
 #  public solver
 # ----------------------------------------------------------------------
@@ -42,29 +149,44 @@ def solve_linreg_potok_amplify(
     num_solves=1,
     timeout_ms=1000,
     seed=0,
+    template=None,
+    export_dir=None,
 ):
     """
     Date‑&‑Potok (2021) QUBO formulation solved on Fixstars Amplify.
     Fits y ≈ X w,  w encoded via precision vector P.
 
-    Returns a dict with timings & ‖w_est – w_exact‖.
+    Without `template` the objective is built symbolically.  With a
+    template from `build_potok_template` the QUBO is sliced from the cached
+    coefficient tensor, so a K sweep pays for one Gram/tensor build.
+    `export_dir` also writes the numeric QUBO there (models/qubo_io.py).
+
+    Returns a dict with timings, ‖w_est – w_exact‖ and w_est.
     """
     N, d_plus1 = X.shape                         # bias already in X
     P_arr = np.array(P, dtype=float)
-    bins, w_syms = _build_primitives(d_plus1, P_arr)
 
-    # ------------ Build QUBO once (symbolic) ---------------------------
-    XtX = X.T @ X
-    Xty = X.T @ y
+    if template is None:
+        with span("gram"):
+            XtX = X.T @ X
+            Xty = X.T @ y
 
-    obj = 0
-    for i in range(d_plus1):
-        for j in range(d_plus1):
-            obj += 0.5 * XtX[i, j] * w_syms[i] * w_syms[j]
-    for i in range(d_plus1):
-        obj += -Xty[i] * w_syms[i]
+        # ------------ Build QUBO once (symbolic) -----------------------
+        # variables and w = P·bins count as encode, as in the box solvers
+        with span("encode", K=len(P_arr)) as sp:
+            bins, model = _symbolic_model(XtX, Xty, P_arr)
+    else:
+        # ------------ Slice QUBO from the cached tensor ----------------
+        with span("encode", K=len(P_arr)) as sp:
+            Q, h = potok_qubo_from_template(template, P_arr)
+            mat = to_amplify_matrix(Q, h)
+            model = Model(mat)
+    encode_time = sp.elapsed
 
-    model = Model(obj)                           # already quadratic
+    if export_dir:
+        if template is None:
+            Q, h = potok_qubo_matrices(XtX, -Xty, P_arr)
+        export_potok_qubo(export_dir, Q, h, P_arr)
 
     # ------------ solve -------------------------------------------------
     client = FixstarsClient()
@@ -75,24 +197,32 @@ def solve_linreg_potok_amplify(
     client.parameters.timeout = timedelta(milliseconds=timeout_ms)
     set_seed(seed)
 
-    t0_enc = time.perf_counter()
-    # (nothing to encode per‑iteration; compiled once)
-    encode_time = time.perf_counter() - t0_enc
-
-    t_start = time.perf_counter()
-    result = safe_solve(model, client, num_solves=num_solves)
-    t_end   = time.perf_counter()
+    with span("submit") as sp:
+        result = safe_solve(model, client, num_solves=num_solves)
+        if result:
+            record_span("anneal", result.execution_time.total_seconds())
     if not result:
         raise RuntimeError("Amplify returned no solutions")
 
     anneal_time = result.execution_time.total_seconds()
-    wall_time   = (t_end - t_start)
+    wall_time   = sp.elapsed
     network_time = wall_time - anneal_time
 
     sol = result.best
-    w_est = np.array([wj.evaluate(sol.values) for wj in w_syms], dtype=float)
-    w_exact = np.linalg.lstsq(X, y, rcond=None)[0]
-    err = np.linalg.norm(w_est - w_exact)
+    with span("decode"):
+        bits = bins if template is None else mat.variable_array
+        w_est = LinearDecoder(bits, potok_encoding(d_plus1, P_arr))(sol.values)
+    with span("error"):
+        if template is None:
+            w_exact = np.linalg.lstsq(X, y, rcond=None)[0]
+        else:
+            w_exact = template["w_exact"]
+        err = np.linalg.norm(w_est - w_exact)
+
+    if template is None:
+        offdiag_nnz, dropped_l1 = int(np.count_nonzero(np.triu(XtX, 1))), 0.0
+    else:
+        offdiag_nnz, dropped_l1 = template["offdiag_nnz"], template["dropped_l1"]
 
     return {
         "iterations"   : 1,
@@ -102,9 +232,208 @@ def solve_linreg_potok_amplify(
         "wall_time"    : wall_time + encode_time,
         "network_time" : network_time,
         "error"        : err,
+        "qubo_nnz"     : potok_qubo_nnz(offdiag_nnz, d_plus1, len(P_arr)),
+        "prune_bound"  : energy_bound(dropped_l1, _p_reach(P_arr)),
+        "solution"     : w_est,
     }
 
 
+def solve_linreg_potok_iterative_amplify(
+    X, y,
+    K=3,
+    rounds=4,
+    radius=2.0,
+    shrink=None,
+    num_solves=1,
+    timeout_ms=1000,
+    seed=0,
+    template=None,
+    export_dir=None,
+    ridge=0.0,
+    c0=None,
+    Q_unit=None,
+):
+    """
+    Iterative Potok refinement.  Each round solves a K‑bit signed Potok
+    QUBO for a step around the current estimate c,
+
+        w = c + B x,   P = R · signed_p_vector(K),
+
+    then re‑centres on the decoded w and shrinks R by `shrink`
+    (default min(½, 2^(2-K)), about two grid steps of the last round).
+    R is kept when an accepted step hits the edge of the grid in some
+    coordinate (the optimum may lie further out), so weights beyond
+    `radius` are reached in several full-size steps.
+    The quadratic block only depends on A and the unit vector, so its
+    Amplify matrix is built once; each round solves ΔE / R², which only
+    changes the linear part (g ⊗ P / R).  A `build_potok_template`
+    result supplies the Gram data so a K sweep computes it only once.
+    `export_dir` writes each round's QUBO to export_dir/round_NN.
+    `ridge` solves with A + ridge·I (error against the ridge solution),
+    `c0` is the starting estimate.  `Q_unit` is a prebuilt unit QUBO of
+    this A (without ridge) and K, see `solve_linreg_potok_path`.
+
+    Returns a dict with timings, rounds run, ‖w_est – w_exact‖ and w_est.
+    """
+    N, d_plus1 = X.shape
+    unit = np.array(signed_p_vector(K), dtype=float)
+    if shrink is None:
+        shrink = min(0.5, 2.0 ** (2 - K))
+
+    client = FixstarsClient()
+    key = os.getenv("AE_KEY")
+    if not key:
+        raise RuntimeError("AE_KEY not set")
+    client.token = key
+    client.parameters.timeout = timedelta(milliseconds=timeout_ms)
+    set_seed(seed)
+
+    encode_time = 0.0
+    anneal_time = 0.0
+    wall_time   = 0.0
+
+    # Gram data and the unit QUBO count as encode (once per call)
+    with span("template", K=K) as sp:
+        if template is None:
+            with span("gram"):
+                A = X.T @ X
+                b = X.T @ y
+            A_q = A
+        else:
+            A, A_q, b = template["A"], template["A_q"], template["b"]
+        if Q_unit is None:
+            Q_unit, _ = potok_qubo_matrices(A_q, np.zeros(d_plus1), unit)
+        exact_q = A_q is A
+        if ridge:
+            Q_unit = potok_ridge_patch(Q_unit, ridge, unit)
+            A = A + ridge * np.eye(d_plus1)
+        # quadratic part of the QUBO built once; rounds only set the linear part
+        m = to_amplify_matrix(Q_unit, np.zeros(len(Q_unit)))
+        decode = LinearDecoder(m.variable_array, potok_encoding(d_plus1, unit))
+    encode_time += sp.elapsed
+
+    c = np.zeros(d_plus1) if c0 is None else np.array(c0, dtype=float)
+    R = radius
+    edges = unit[unit < 0].sum(), unit[unit > 0].sum()    # grid ends at R = 1
+    for it in range(1, rounds + 1):
+        with span("iter", it=it, L=R):
+            with span("encode") as sp:
+                g = A @ c - b
+                # ΔE / R² = xᵀ Q_unit x + (g ⊗ P / R)ᵀ x
+                m.linear = np.kron(g, unit) / R
+                model = Model(m)
+            encode_time += sp.elapsed
+            if export_dir:
+                export_potok_qubo(os.path.join(export_dir, f"round_{it:02d}"),
+                                  (R * R) * Q_unit, R * np.kron(g, unit), R * unit, c,
+                                  iteration=it)
+
+            with span("submit") as sp:
+                result = safe_solve(model, client, num_solves=num_solves)
+                if result:
+                    record_span("anneal", result.execution_time.total_seconds())
+            wall_time += sp.elapsed
+            if not result:
+                raise RuntimeError("Amplify returned no solutions")
+            anneal_time += result.execution_time.total_seconds()
+
+            sol = result.best
+            with span("decode"):
+                step = R * decode(sol.values)
+                # a pruned template only approximates ΔE: judge the step on A
+                if exact_q:
+                    gain = (R * R) * sol.objective
+                else:
+                    gain = g @ step + 0.5 * step @ (A @ step)
+                at_edge = False
+                if gain < 0:                            # re‑centre
+                    c = c + step
+                    at_edge = np.isclose(step, R * edges[0]).any() \
+                        or np.isclose(step, R * edges[1]).any()
+            if not at_edge:                             # step inside the range
+                R *= shrink
+
+    with span("error"):
+        if ridge:
+            w_exact = np.linalg.solve(A, b)
+        elif template is None:
+            w_exact = np.linalg.lstsq(X, y, rcond=None)[0]
+        else:
+            w_exact = template["w_exact"]
+        err = np.linalg.norm(c - w_exact)
+    network_time = wall_time - anneal_time
+
+    if template is None:
+        offdiag_nnz, dropped_l1 = int(np.count_nonzero(np.triu(A, 1))), 0.0
+    else:
+        offdiag_nnz, dropped_l1 = template["offdiag_nnz"], template["dropped_l1"]
+
+    return {
+        "iterations"   : it,
+        "encode_time"  : encode_time,
+        "anneal_time"  : anneal_time,
+        "total_time"   : encode_time + anneal_time,
+        "wall_time"    : wall_time + encode_time,
+        "network_time" : network_time,
+        "error"        : err,
+        "qubo_nnz"     : potok_qubo_nnz(offdiag_nnz, d_plus1, K),
+        "prune_bound"  : energy_bound(dropped_l1, radius * _p_reach(unit)),
+        "solution"     : c,
+    }
+
+
+def solve_linreg_potok_path(
+    X, y,
+    lambdas,
+    K=3,
+    rounds=4,
+    radius=2.0,
+    num_solves=1,
+    timeout_ms=1000,
+    seed=0,
+    template=None,
+):
+    """
+    Ridge path with the iterative Potok solver: one fit per λ in `lambdas`
+    (in the order given).  The unit QUBO is built once from the template
+    (`template` itself is not modified) and only its diagonal blocks are
+    patched per λ (`potok_ridge_patch`); each λ re‑centres on the previous
+    solution with a radius from `box_size_hint`.
+
+    Returns a list of result dicts with `lam`, `radius` and
+    `template_time` (build cost, on the first entry).
+    """
+    d_plus1 = X.shape[1]
+    with span("template") as sp:
+        if template is None:
+            template = build_potok_template(X, y, signed_p_vector(K, radius))
+        Q_unit, _ = potok_qubo_matrices(template["A_q"], np.zeros(d_plus1),
+                                        signed_p_vector(K))
+    build_time = sp.elapsed
+
+    path, c = [], None
+    for lam in lambdas:
+        R = radius
+        if c is not None:
+            A_lam = template["A"] + lam * np.eye(d_plus1)
+            R = box_size_hint(A_lam, template["b"], c, L_max=radius)
+
+        res = solve_linreg_potok_iterative_amplify(
+            X, y, K=K, rounds=rounds, radius=R,
+            num_solves=num_solves, timeout_ms=timeout_ms, seed=seed,
+            template=template, ridge=lam, c0=c, Q_unit=Q_unit,
+        )
+        res["lam"] = lam
+        res["radius"] = R
+        res["template_time"] = build_time
+        res["total_time"] += build_time
+        res["wall_time"] += build_time
+        path.append(res)
+        c = res["solution"]
+        build_time = 0.0
+    return path
+
+
 # ----------------------------------------------------------------------
 # smoke‑test ------------------------------------------------------------
 if __name__ == "__main__":
@@ -117,4 +446,3 @@ if __name__ == "__main__":
 
     res = solve_linreg_potok_amplify(X, y)
     print(res)
-
@@ -0,0 +1,69 @@
+# models/qubo_fix.py
+"""
+Persistency preprocessing for numeric QUBOs  E(x) = xᵀQx + hᵀx  (Q symmetric).
+
+Flipping x_i from 0 to 1 changes the energy by
+
+    Δ_i(x) = h_i + Q_ii + 2 Σ_{j≠i} Q_ij x_j ,
+
+which over all x lies in  [h_i + Q_ii + 2 Σ⁻ Q_ij,  h_i + Q_ii + 2 Σ⁺ Q_ij].
+If the lower end is > 0, x_i = 0 in every minimiser; if the upper end is
+< 0, x_i = 1 in every minimiser.  Fixed values are folded into the linear
+terms of the rest and the test repeats until nothing changes.  These are
+the first‑order persistencies of roof duality; they catch the variables
+forced by a large gradient |coeff| relative to the box side L, which is
+the common case late in a box run.
+"""
+
+import numpy as np
+
+
+def reduce_persistent(Q, h, tol=1e-12):
+    """
+    Returns (free, fixed, values, Q_r, h_r, const):
+        free, fixed : index arrays into the original variables
+        values      : 0/1 values of the fixed variables
+        Q_r, h_r    : reduced QUBO over `free`
+        const       : energy of the fixed part, so that
+                      E(x) = x_fᵀ Q_r x_f + h_rᵀ x_f + const
+    """
+    Q = np.asarray(Q, dtype=float)
+    n = len(h)
+    off = Q - np.diag(np.diag(Q))
+    neg = 2.0 * np.minimum(off, 0.0)
+    pos = 2.0 * np.maximum(off, 0.0)
+
+    free = np.ones(n, dtype=bool)
+    value = np.zeros(n)
+    lin = np.asarray(h, dtype=float) + np.diag(Q)   # Δ_i with every other x_j = 0
+    lo = lin + neg.sum(axis=1)
+    hi = lin + pos.sum(axis=1)
+
+    while True:
+        zero = free & (lo > tol)
+        one = free & (hi < -tol)
+        new = zero | one
+        if not new.any():
+            break
+        value[one] = 1.0
+        free &= ~new
+        # the new fixed variables no longer range over {0,1}: replace their
+        # interval contribution by the exact one
+        lo += (2.0 * off[:, one]).sum(axis=1) - neg[:, new].sum(axis=1)
+        hi += (2.0 * off[:, one]).sum(axis=1) - pos[:, new].sum(axis=1)
+
+    f = np.flatnonzero(free)
+    x = np.flatnonzero(~free)
+    v = value[x]
+    Q_r = Q[np.ix_(f, f)]
+    h_r = np.asarray(h, dtype=float)[f] + 2.0 * (Q[np.ix_(f, x)] @ v)
+    const = v @ (Q[np.ix_(x, x)] @ v) + np.asarray(h, dtype=float)[x] @ v
+    return f, x, v, Q_r, h_r, const
+
+
+def expand_assignment(n, free, fixed, values, x_free):
+    """Full length‑n bit vector from the reduced solution and the fixed part."""
+    x = np.empty(n)
+    x[free] = x_free
+    x[fixed] = values
+    return x
@@ -0,0 +1,129 @@
+# models/qubo_io.py
+"""
+On‑disk format for numeric QUBOs, so a problem can be cached, diffed,
+replayed or handed to another solver process without rebuilding Poly
+objects.
+
+A QUBO is a directory of plain .npy files plus a JSON header:
+
+    rows.npy, cols.npy   int32 indices, upper triangle (rows <= cols)
+    vals.npy             float64 coefficients
+    linear.npy           float64, length n
+    <extra>.npy          optional arrays for decoding (e.g. the centre c)
+    meta.json            {"format", "version", "n", "nnz", "const", ...}
+
+with energy  E(x) = Σ vals·x_rows·x_cols + linearᵀx + const.  A symmetric
+Q of the  xᵀQx + hᵀx  convention used in models/box_qubo.py is stored as
+its diagonal plus 2·Q_ij for i < j.  Separate .npy files (rather than
+.npz) keep `load_qubo(..., mmap=True)` zero‑copy, so worker processes
+share the pages instead of unpickling a model.
+"""
+
+import json
+from pathlib import Path
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix, triu
+
+from models.box_qubo import box_qubo_sparse, to_amplify_matrix
+
+FORMAT = "qubo-coo"
+VERSION = 1
+
+
+def save_qubo(path, Q, h, const=0.0, arrays=None, **meta):
+    """
+    Write (Q, h, const) to directory `path`.  Q may be dense or sparse and
+    must be symmetric.  `arrays` holds extra NumPy arrays, `meta` extra
+    JSON‑serialisable header fields.  Returns the directory as a Path.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    U = triu(coo_matrix(Q), format="coo")
+    U.sum_duplicates()
+    off = U.row != U.col
+    vals = np.where(off, 2.0 * U.data, U.data)
+    keep = vals != 0.0
+
+    np.save(path / "rows.npy", U.row[keep].astype(np.int32))
+    np.save(path / "cols.npy", U.col[keep].astype(np.int32))
+    np.save(path / "vals.npy", vals[keep].astype(np.float64))
+    np.save(path / "linear.npy", np.asarray(h, dtype=np.float64))
+    for name, arr in (arrays or {}).items():
+        np.save(path / f"{name}.npy", np.asarray(arr))
+
+    header = {
+        "format": FORMAT,
+        "version": VERSION,
+        "n": int(len(h)),
+        "nnz": int(keep.sum()),
+        "const": float(const),
+        "arrays": sorted(arrays or {}),
+        **meta,
+    }
+    (path / "meta.json").write_text(json.dumps(header, indent=1))
+    return path
+
+
+def load_qubo(path, mmap=True):
+    """
+    Read a QUBO directory.  With `mmap` the arrays are read‑only memory
+    maps.  Returns dict(rows, cols, vals, linear, const, meta, <extra arrays>).
+    """
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text())
+    if meta.get("format") != FORMAT or meta.get("version", 0) > VERSION:
+        raise ValueError(f"{path} is not a {FORMAT} v{VERSION} QUBO")
+    mode = "r" if mmap else None
+    qubo = {
+        name: np.load(path / f"{name}.npy", mmap_mode=mode)
+        for name in ("rows", "cols", "vals", "linear", *meta["arrays"])
+    }
+    qubo["const"] = meta["const"]
+    qubo["meta"] = meta
+    return qubo
+
+
+def qubo_matrices(qubo):
+    """Back to the symmetric (Q CSR, h) convention  E = xᵀQx + hᵀx + const."""
+    n = qubo["meta"]["n"]
+    rows, cols, vals = qubo["rows"], qubo["cols"], qubo["vals"]
+    half = np.where(rows == cols, vals, 0.5 * vals)
+    U = csr_matrix((half, (rows, cols)), shape=(n, n))
+    Q = U + triu(U, k=1, format="csr").T
+    return Q, np.asarray(qubo["linear"])
+
+
+def coo_energy(qubo, x):
+    """E(x) straight from the stored triplets."""
+    x = np.asarray(x, dtype=float)
+    return (qubo["vals"] @ (x[qubo["rows"]] * x[qubo["cols"]])
+            + qubo["linear"] @ x + qubo["const"])
+
+
+def to_amplify(qubo):
+    """Amplify `Matrix` for a loaded QUBO (the constant is not included)."""
+    Q, h = qubo_matrices(qubo)
+    return to_amplify_matrix(Q.toarray(), h)
+
+
+# ---------------------------------------------------------------------
+#  export helpers for the solvers
+# ---------------------------------------------------------------------
+def export_box_qubo(path, A, coeff, L, c, **meta):
+    """
+    Box step QUBO around centre c, bits x = [q1; q2]:
+    w = c + L·(-2 q1 + q2).  Works for dense and CSR A.
+    """
+    Q, h = box_qubo_sparse(A, coeff, L)
+    return save_qubo(path, Q, h, arrays={"center": c},
+                     kind="box", d=len(c), L=float(np.max(L)), **meta)
+
+
+def export_potok_qubo(path, Q, h, P, c=None, **meta):
+    """Potok QUBO, bits ordered (j, k):  w = c + x.reshape(d, K) @ P."""
+    P = np.asarray(P, dtype=float)
+    d = len(h) // len(P)
+    c = np.zeros(d) if c is None else c
+    return save_qubo(path, Q, h, arrays={"center": c},
+                     kind="potok", d=d, P=P.tolist(), **meta)
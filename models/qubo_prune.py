@@ -0,0 +1,68 @@
+# models/qubo_prune.py
+"""
+Coupling sparsification before a QUBO is submitted.
+
+Both the box and the Potok QUBOs couple two features i ≠ j only through
+A_ij (box: L²·A_ij·s_i·s_j, Potok: A_ij·P_k·P_l), so pruning the weak
+off‑diagonal entries of A drops exactly the weak QUBO couplings.  The
+diagonal is always kept.
+
+If every encoded variable satisfies |w_i| ≤ r, the energy of any
+assignment moves by at most  ½ · r² · Σ_{i≠j} |dropped A_ij|
+(`energy_bound`).  For the box step r = 2L, for Potok r = max |Σ P_k x_k|.
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+
+def prune_couplings(A, rel_threshold=None, top_k=None):
+    """
+    Drop weak off‑diagonal couplings of the symmetric matrix A.
+
+    rel_threshold : drop |A_ij| < rel_threshold · max_{i≠j} |A_ij|
+    top_k         : keep only the k strongest |A_ij| of each row
+                    (an entry survives if either of its rows keeps it)
+
+    Returns (A_pruned, stats) with A_pruned of the same kind as A (dense
+    or CSR) and stats = dict(offdiag_nnz, dropped_l1).
+    """
+    sparse_in = issparse(A)
+    M = A.toarray() if sparse_in else np.array(A, dtype=float)
+    d = M.shape[0]
+    off = ~np.eye(d, dtype=bool)
+    absM = np.abs(M) * off
+
+    keep = absM > 0
+    if rel_threshold:
+        keep &= absM >= rel_threshold * absM.max()
+    if top_k is not None and top_k < d - 1:
+        # k‑th largest off‑diagonal magnitude per row as the row cut‑off
+        kth = -np.partition(-absM, top_k - 1, axis=1)[:, top_k - 1]
+        row_keep = absM >= kth[:, None]
+        keep &= row_keep | row_keep.T
+
+    drop = off & ~keep
+    dropped_l1 = float(absM[drop].sum())
+    M[drop] = 0.0
+
+    stats = {
+        "offdiag_nnz": int(np.count_nonzero(np.triu(keep, 1))),
+        "dropped_l1": dropped_l1,
+    }
+    return (csr_matrix(M) if sparse_in else M), stats
+
+
+def energy_bound(dropped_l1, r):
+    """Max energy error of pruning for variables bounded by |w_i| ≤ r."""
+    return 0.5 * r * r * dropped_l1
+
+
+def box_qubo_nnz(offdiag_nnz, d):
+    """Couplings of the box QUBO: 4 per feature pair, 1 (q1_i q2_i) per feature."""
+    return 4 * offdiag_nnz + d
+
+
+def potok_qubo_nnz(offdiag_nnz, d, K):
+    """Couplings of the Potok QUBO: K² per feature pair, K(K-1)/2 per feature."""
+    return K * K * offdiag_nnz + d * K * (K - 1) // 2
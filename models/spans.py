@@ -0,0 +1,374 @@
+# models/spans.py
+"""
+Hierarchical timing spans for the solve pipeline.
+
+Every phase is timed with one context manager, which also feeds the
+result dicts, so CSV timings and span exports agree:
+
+    with span("encode", it=it) as sp:
+        model = ...
+    encode_time += sp.elapsed
+
+A span always measures itself (one perf_counter pair); it is only stored
+when a `SpanRecorder` is recording:
+
+    with SpanRecorder(profile=("encode",)) as rec:
+        run_box_opt_grid(...)
+    rec.write("spans.jsonl")        # or "spans.json": Chrome trace / Perfetto
+    rec.write_profiles("prof/")     # encode.prof, read with pstats / snakeviz
+
+Phases used by the solvers and runners (nesting as indented):
+
+    datagen       synthetic data set
+    gram          A = XᵀX, b = Xᵀy
+    run           one solver call (mode, d, …)
+      template    iteration‑independent QUBO parts (Amplify template, Q_unit, Potok tensor)
+      iter        one iteration / round (it, L)
+        encode    c‑dependent QUBO → Amplify model, from variable generation on
+        submit    solve round trip (wall)
+          anneal  solver‑reported execution time (recorded, not measured)
+        decode    bits → step, accept / contract
+      polish      classical finisher
+      error       x* and ‖c − x*‖
+
+plus init (warm start), scale (--scaling), update (streaming), fit /
+predict (classical).
+
+With `track_memory()` every span also records `py_peak`, the tracemalloc
+peak above the traced memory at its start (NumPy buffers included), and a
+`MemoryScope` turns those into per‑phase result columns with the process
+peak RSS (see `MEM_COLUMNS`).  tracemalloc slows allocation‑heavy code
+(Poly building) several‑fold, so memory runs are not timing runs.
+
+Spans are meant for the (single‑threaded) main loop; only one recorder is
+active at a time.
+"""
+
+import cProfile
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from functools import wraps
+from pathlib import Path
+
+_active = None                  # the recording SpanRecorder, if any
+_memory = False                 # track_memory() is on
+_mem_stack = []                 # open spans, for nested peak propagation
+_scopes = []                    # active MemoryScopes
+
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "elapsed", "id", "parent", "_rec", "_prof",
+                 "py_peak", "_base", "_peak")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.elapsed = 0.0
+        self.id = self.parent = None
+        self._rec = self._prof = None
+        self.py_peak = self._base = None
+
+    def set(self, **attrs):
+        """Attach attributes known only inside the span (e.g. qubo size)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._rec = _active
+        if self._rec is not None:
+            self._rec._open(self)
+        if _memory:
+            self._mem_open()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        if self._base is not None:
+            self._mem_close()
+        if self._rec is not None:
+            self._rec._close(self)
+        return False
+
+    # tracemalloc has one peak counter: a child saves it into its parent
+    # before resetting it and hands its own peak up when it closes
+    def _mem_open(self):
+        cur, peak = tracemalloc.get_traced_memory()
+        if _mem_stack:
+            parent = _mem_stack[-1]
+            parent._peak = max(parent._peak, peak)
+        tracemalloc.reset_peak()
+        self._base = self._peak = cur
+        _mem_stack.append(self)
+
+    def _mem_close(self):
+        peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+        _mem_stack.pop()
+        if _mem_stack:
+            parent = _mem_stack[-1]
+            parent._peak = max(parent._peak, peak)
+        self.py_peak = peak - self._base
+        self.attrs["py_peak"] = self.py_peak
+        for scope in _scopes:
+            scope._add(self.name, self.py_peak)
+
+
+def span(name, **attrs):
+    """Context manager timing one phase; `.elapsed` holds its seconds."""
+    return Span(name, attrs)
+
+
+def record_span(name, duration, **attrs):
+    """
+    Store a span whose duration was measured elsewhere (the solver's
+    anneal time) as a child of the current span, ending now.
+    """
+    if _active is not None:
+        _active._record(name, duration, attrs)
+
+
+def timed(name=None):
+    """Decorator form of `span` (name defaults to the function's)."""
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with Span(label, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+class SpanRecorder:
+    """
+    Collects finished spans while active (`with recorder:`).
+
+    `profile` names spans to run under a profiler.  By default each name
+    gets one cProfile.Profile that accumulates over all its occurrences;
+    `profiler(name)` may instead return any context manager (e.g. a
+    sampling profiler) entered around each occurrence.  Profiled spans do
+    not nest: inside a profiled span the others run unprofiled.
+    """
+
+    def __init__(self, profile=(), profiler=None):
+        self.spans = []
+        self.profile = set(profile)
+        self.profiler = profiler or self._cprofile
+        self.profiles = {}
+        self._stack = []
+        self._next_id = 0
+        self._profiling = False
+        self._prev = None
+        self.t0 = time.perf_counter()
+
+    def __enter__(self):
+        global _active
+        self._prev, _active = _active, self
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._prev
+        return False
+
+    # ---- span bookkeeping ----
+    def _open(self, s):
+        s.id = self._next_id
+        self._next_id += 1
+        s.parent = self._stack[-1].id if self._stack else None
+        self._stack.append(s)
+        if s.name in self.profile and not self._profiling:
+            prof = self.profiler(s.name)
+            try:
+                prof.__enter__()
+            except ValueError:               # another profiler is already running
+                return
+            s._prof = prof
+            self._profiling = True
+
+    def _close(self, s):
+        if s._prof is not None:
+            s._prof.__exit__(None, None, None)
+            s._prof = None
+            self._profiling = False
+        self._stack.pop()
+        self.spans.append({
+            "id": s.id, "parent": s.parent, "depth": len(self._stack),
+            "name": s.name, "start": s.start - self.t0, "dur": s.elapsed,
+            **s.attrs,
+        })
+
+    def _record(self, name, duration, attrs):
+        now = time.perf_counter()
+        parent = self._stack[-1] if self._stack else None
+        start = now - duration
+        if parent is not None:
+            start = max(start, parent.start)
+        self.spans.append({
+            "id": self._next_id, "parent": parent and parent.id,
+            "depth": len(self._stack), "name": name,
+            "start": start - self.t0, "dur": duration, **attrs,
+        })
+        self._next_id += 1
+
+    def _cprofile(self, name):
+        return self.profiles.setdefault(name, cProfile.Profile())
+
+    # ---- results ----
+    def totals(self):
+        """{name: (count, total seconds)} over the recorded spans."""
+        out = {}
+        for s in self.spans:
+            n, t = out.get(s["name"], (0, 0.0))
+            out[s["name"]] = (n + 1, t + s["dur"])
+        return out
+
+    def write(self, path):
+        """
+        Spans as JSONL (one object per span, times in seconds) or, for a
+        .json path, as a Chrome trace (chrome://tracing, ui.perfetto.dev).
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        spans = sorted(self.spans, key=lambda s: s["start"])
+        with path.open("w") as f:
+            if path.suffix == ".json":
+                pid = os.getpid()
+                meta = ("id", "parent", "depth", "name", "start", "dur")
+                events = [{
+                    "name": s["name"], "ph": "X", "pid": pid, "tid": 0,
+                    "ts": s["start"] * 1e6, "dur": s["dur"] * 1e6,
+                    "args": {k: v for k, v in s.items() if k not in meta},
+                } for s in spans]
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"},
+                          f, default=_json_default)
+            else:
+                for s in spans:
+                    f.write(json.dumps(s, default=_json_default) + "\n")
+        return path
+
+    def write_profiles(self, directory):
+        """Dump the default cProfile stats as <directory>/<span name>.prof."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, prof in self.profiles.items():
+            prof.dump_stats(directory / f"{name}.prof")
+        return sorted(directory.glob("*.prof"))
+
+
+def _json_default(v):
+    """NumPy scalars and other odd attribute values."""
+    return v.item() if hasattr(v, "item") else str(v)
+
+
+# ------------------------------------------------------------------ #
+#   Memory
+# ------------------------------------------------------------------ #
+
+# result column → spans whose largest py_peak it reports (MiB)
+MEM_COLUMNS = {
+    "mem_data_mb":     ("datagen", "gram"),
+    "mem_template_mb": ("template",),
+    "mem_iter_mb":     ("iter",),          # largest single iteration
+    "mem_run_mb":      ("run",),           # whole solver call, template included
+}
+_MiB = 1024.0 * 1024.0
+
+
+def track_memory(on=True):
+    """Start (stop) tracemalloc and per‑span peak tracking."""
+    global _memory
+    _memory = bool(on)
+    if _memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _reset_rss_peak():
+    """Reset the kernel's peak RSS (Linux); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def rss_peak():
+    """Peak resident set size in bytes (since the last reset on Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryScope:
+    """
+    Per‑phase tracemalloc peaks of the spans closed inside it and the peak
+    RSS over its lifetime.  Only the Linux RSS peak can be reset; elsewhere
+    `rss_peak_mb` is the process‑lifetime peak.
+    """
+
+    def __init__(self):
+        self.peaks = {}
+        self.rss = None
+
+    def __enter__(self):
+        _reset_rss_peak()
+        _scopes.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _scopes.remove(self)
+        self.rss = rss_peak()
+        return False
+
+    def _add(self, name, peak):
+        self.peaks[name] = max(self.peaks.get(name, 0), peak)
+
+    def columns(self, *outer):
+        """
+        MEM_COLUMNS + rss_peak_mb in MiB (None for phases that did not run).
+        Phases missing here are taken from the first `outer` scope that has
+        them, e.g. the data phases of the per‑d scope of a per‑row scope.
+        """
+        out = {}
+        for col, names in MEM_COLUMNS.items():
+            out[col] = None
+            for scope in (self, *outer):
+                vals = [scope.peaks[n] for n in names if n in scope.peaks]
+                if vals:
+                    out[col] = max(vals) / _MiB
+                    break
+        rss = self.rss if self.rss is not None else rss_peak()
+        out["rss_peak_mb"] = rss / _MiB
+        return out
+
+
+class _NoMemory:
+    peaks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def columns(self, *outer):
+        return {}
+
+
+def memory_scope():
+    """A MemoryScope while `track_memory()` is on, else a no‑op whose
+    `columns()` is empty (so result rows keep their usual columns)."""
+    return MemoryScope() if _memory else _NoMemory()
@@ -0,0 +1,100 @@
+# models/streaming.py
+"""
+Streaming box regression: absorb (X, y) chunks without refitting.
+
+A chunk of k rows is a rank‑k update
+
+    A += XᵀX,   b += Xᵀy,
+    quad_blk += 0.5 Σ_r (x_r · d)²      (d = -2 q1 + q2)
+
+so the quadratic template costs k Poly products of a length‑d linear form
+instead of the O(d²) term loop of a rebuild (which is still used when
+k ≥ d/2).  The box search then resumes from the current solution with the
+box side reset to `box_size_hint` (capped at L0).  Until d rows have
+been seen A is singular, so those chunks are only absorbed into A, b and
+the first solve waits for the chunk that brings n_seen to d.
+"""
+
+import numpy as np
+
+from models.box_opt import solve_box_opt_amplify, _build_amplify_primitives
+from models.warm_start import box_size_hint
+from models.spans import span
+
+
+class StreamingBoxRegressor:
+    def __init__(self, d, L0=1.0, reset_L=None, **solver_kw):
+        """
+        d         : number of features (columns of every chunk)
+        L0        : box side of the first fit and cap of the reset
+        reset_L   : fixed box side after each update (None → box_size_hint)
+        solver_kw : forwarded to solve_box_opt_amplify (max_iter, beta, …)
+        """
+        self.d = d
+        self.L0 = L0
+        self.reset_L = reset_L
+        self.solver_kw = solver_kw
+        self.A = np.zeros((d, d))
+        self.b = np.zeros(d)
+        self.c = None
+        self.n_seen = 0
+        self.template = None        # (q, dvec, quad_blk)
+        self.pending_time = 0.0     # update time of chunks absorbed before the first solve
+
+    def _patch_template(self, X):
+        k = X.shape[0]
+        if self.template is None or 2 * k >= self.d:
+            self.template = _build_amplify_primitives(self.A)
+            return "rebuild"
+        q, dvec, quad_blk = self.template
+        for x_r in X:
+            u = np.dot(x_r, dvec)
+            quad_blk = quad_blk + 0.5 * (u * u)
+        self.template = (q, dvec, quad_blk)
+        return "rank-k"
+
+    def partial_fit(self, X, y):
+        """
+        Absorb one chunk and re‑solve.  Returns the solver's result dict
+        plus `update_time` (A, b and template patch; included in
+        total/wall time), `template_update` ("rank-k" | "rebuild"),
+        `n_seen` and the `L0` the search resumed with.  Returns None while
+        fewer than d rows have been seen (no solve; their update time is
+        added to the first result).
+        """
+        with span("update", rows=X.shape[0]) as sp:
+            self.A += X.T @ X
+            self.b += X.T @ y
+            self.n_seen += X.shape[0]
+            if self.n_seen < self.d:
+                how = None
+            else:
+                how = self._patch_template(X)
+
+            if self.c is None:
+                L_start = self.L0
+            elif self.reset_L is not None:
+                L_start = self.reset_L
+            else:
+                L_start = box_size_hint(self.A, self.b, self.c, L_max=self.L0)
+        if how is None:
+            self.pending_time += sp.elapsed
+            return None
+        update_time = sp.elapsed + self.pending_time
+        self.pending_time = 0.0
+
+        res = solve_box_opt_amplify(self.A, self.b, c0=self.c, L0=L_start,
+                                    template=self.template, **self.solver_kw)
+        self.c = res["solution"]
+
+        res["update_time"] = update_time
+        res["total_time"] += update_time
+        res["wall_time"] += update_time
+        res["template_update"] = how
+        res["n_seen"] = self.n_seen
+        res["L0"] = L_start
+        return res
+
+    @property
+    def coef_(self):
+        return self.c
@@ -0,0 +1,93 @@
+# models/trace.py
+"""
+Opt‑in per‑iteration convergence trace for the box solvers.
+
+One row per iteration in a preallocated NumPy structured array:
+
+    it            iteration (1‑based)
+    L             box side used by this iteration (max over blocks)
+    accepted      the step was taken (False: the box contracted)
+    objective     QUBO objective of the step (ΔE; box-naive: energy of w)
+    energy        ½cᵀAc − bᵀc of the centre after the iteration
+    dist          ‖c − x*‖ after the iteration
+    encode_time   seconds of this iteration: encode,
+    anneal_time   anneal (solver‑reported)
+    network_time  and solve wall time − anneal time
+    qubo_nnz      quadratic couplings of the QUBO(s) submitted
+
+Distances are in the variables the solver sees (scaled ones under
+--scaling).  Disabled traces cost nothing: x* is not computed and
+`record` returns immediately.
+"""
+
+import numpy as np
+
+from models.warm_start import _dense
+
+TRACE_DTYPE = np.dtype([
+    ("it", "i4"),
+    ("L", "f8"),
+    ("accepted", "?"),
+    ("objective", "f8"),
+    ("energy", "f8"),
+    ("dist", "f8"),
+    ("encode_time", "f8"),
+    ("anneal_time", "f8"),
+    ("network_time", "f8"),
+    ("qubo_nnz", "i8"),
+])
+
+
+class ConvergenceTrace:
+    def __init__(self, A, b, max_iter, enabled=True):
+        self.enabled = bool(enabled)
+        self.exact = np.linalg.solve(_dense(A), b) if self.enabled else None
+        self.rows = np.zeros(max_iter if self.enabled else 0, dtype=TRACE_DTYPE)
+        self.n = 0
+        self._last = (0.0, 0.0, 0.0)     # cumulative encode, anneal, wall
+
+    def record(self, it, L, accepted, objective, energy, c,
+               encode_time, anneal_time, wall_time, qubo_nnz):
+        """Append one iteration; the times are the solver's running totals."""
+        if not self.enabled:
+            return
+        enc0, ann0, wall0 = self._last
+        self.rows[self.n] = (
+            it, L, accepted, objective, energy,
+            np.linalg.norm(c - self.exact),
+            encode_time - enc0,
+            anneal_time - ann0,
+            (wall_time - wall0) - (anneal_time - ann0),
+            qubo_nnz,
+        )
+        self._last = (encode_time, anneal_time, wall_time)
+        self.n += 1
+
+    def array(self):
+        """The recorded rows (a view), or None when disabled."""
+        return self.rows[:self.n] if self.enabled else None
+
+
+def save_traces(path, traces, **meta):
+    """
+    Write [(row, d, trace_array), …] as one compressed .npz: `trace` holds
+    every iteration with `row` (index of the result row it belongs to) and
+    `d` prepended; `meta` entries are stored as extra arrays.
+    """
+    dtype = np.dtype([("row", "i4"), ("d", "i4")] + TRACE_DTYPE.descr)
+    parts = []
+    for row, d, tr in traces:
+        out = np.empty(len(tr), dtype=dtype)
+        out["row"] = row
+        out["d"] = d
+        for name in TRACE_DTYPE.names:
+            out[name] = tr[name]
+        parts.append(out)
+    trace = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+    np.savez_compressed(path, trace=trace, **{k: np.asarray(v) for k, v in meta.items()})
+
+
+def load_traces(path):
+    """The structured `trace` array written by `save_traces`."""
+    with np.load(path) as f:
+        return f["trace"]
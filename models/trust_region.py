@@ -0,0 +1,81 @@
+# models/trust_region.py
+"""
+Box‑size schedule and stopping rules shared by the box solvers.
+
+TrustRegion  – owns the box side L.  Contracts by `beta` on a rejected
+               step, by the harsher `fast_beta` once `streak` rejects
+               happened in a row, and expands by `expand` after `streak`
+               consecutive accepts.  expand=1 and fast_beta=None give the
+               original fixed‑beta schedule.
+StopRule     – decides when a run is done and why:
+               "epsilon", "stagnation", "time_budget", "anneal_budget",
+               or "polish" once L < switch_L hands over to a classical
+               finisher.  Solvers report "max_iter" when none fired.
+"""
+
+import time
+
+
+class TrustRegion:
+    def __init__(self, L0=1.0, beta=0.2, expand=1.0, fast_beta=None, streak=2):
+        self.L = float(L0)
+        self.beta = beta
+        self.expand = expand
+        self.fast_beta = beta if fast_beta is None else fast_beta
+        self.streak = streak
+        self.accepts = 0
+        self.rejects = 0
+
+    def accept(self):
+        self.rejects = 0
+        self.accepts += 1
+        if self.expand != 1.0 and self.accepts >= self.streak:
+            self.L *= self.expand
+            self.accepts = 0
+
+    def reject(self):
+        self.accepts = 0
+        self.rejects += 1
+        self.L *= self.fast_beta if self.rejects >= self.streak else self.beta
+
+
+class StopRule:
+    def __init__(self, epsilon=1e-6, rel_tol=None, patience=3,
+                 time_budget_s=None, anneal_budget_s=None, switch_L=None):
+        self.epsilon = epsilon
+        self.switch_L = switch_L
+        self.rel_tol = rel_tol
+        self.patience = patience
+        self.time_budget_s = time_budget_s
+        self.anneal_budget_s = anneal_budget_s
+        self.t_start = time.perf_counter()
+        self.history = []          # best energy: first call, then after each accepted step
+
+    def check(self, L, energy, anneal_time):
+        """
+        Call once per iteration with the current box side (max over
+        coordinates for per‑coordinate boxes), the best energy so far and
+        the accumulated anneal time.  Returns a stop reason or None.
+
+        Stagnation compares the energy over the last `patience` accepted
+        steps; rejected steps leave the energy unchanged and are not
+        counted, so a run of rejects while L contracts never stops it.
+        """
+        if not self.history or energy != self.history[-1]:
+            self.history.append(energy)
+
+        if self.switch_L is not None and L < self.switch_L:
+            return "polish"
+        if L < self.epsilon:
+            return "epsilon"
+        if (self.time_budget_s is not None
+                and time.perf_counter() - self.t_start >= self.time_budget_s):
+            return "time_budget"
+        if self.anneal_budget_s is not None and anneal_time >= self.anneal_budget_s:
+            return "anneal_budget"
+        if self.rel_tol is not None and len(self.history) > self.patience:
+            old = self.history[-1 - self.patience]
+            gain = (old - energy) / max(abs(energy), 1e-300)
+            if gain < self.rel_tol:
+                return "stagnation"
+        return None
@@ -5,6 +5,7 @@ REPS=40
 DIMS=(4 8 16 32 64 128 256)
 NOISE_SET=(0.01 0.05)
 CORR_SET=(0.0 0.8)
+SCALING_SET=(jacobi cholesky)
 MAX_ITER=30
 NUM_SOLVES=1
 TIMEOUT=60
@@ -38,6 +39,16 @@ for noise in "${NOISE_SET[@]}"; do
         --num_solves "$NUM_SOLVES" --timeout_ms "$TIMEOUT" \
         --out "$OUTDIR/box_opt_${noise}_${corr}_rep${r}.csv"
 
+      # --------------- box-opt, scaled ---------------
+      for scaling in "${SCALING_SET[@]}"; do
+        python main.py --mode box-opt \
+          --dims "${DIMS[@]}" --noise "$noise" --corr "$corr" \
+          --seed "$SEED" --max_iter "$MAX_ITER" \
+          --num_solves "$NUM_SOLVES" --timeout_ms "$TIMEOUT" \
+          --scaling "$scaling" \
+          --out "$OUTDIR/box_opt_${scaling}_${noise}_${corr}_rep${r}.csv"
+      done
+
       # --------------- potok ---------------
       python main.py --mode potok \
         --dims "${DIMS[@]}" --noise "$noise" --corr "$corr" \
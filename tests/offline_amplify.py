@@ -0,0 +1,52 @@
+# tests/offline_amplify.py
+"""
+Offline stand-in for the Amplify solve calls, for solver tests that must
+run without AE_KEY.  `brute_solve` searches every assignment of the
+model's binaries (keep them to ~12) and reports 1 s of execution time;
+solution values are the bit vector indexed by variable id, which the
+patched `LinearDecoder` maps with E directly.
+
+    for p in offline("models.box_opt"):
+        self.addCleanup(p.stop)
+"""
+import importlib
+import itertools
+import os
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+
+def brute_solve(model, client=None, num_solves=1):
+    terms = model.objective.as_dict()
+    n = 1 + max(i for key in terms for i in key)
+    best = None
+    for bits in itertools.product((0.0, 1.0), repeat=n):
+        e = sum(v * np.prod([bits[i] for i in key]) for key, v in terms.items() if key)
+        if best is None or e < best[0] - 1e-12:
+            best = (e, np.array(bits))
+    sol = SimpleNamespace(objective=best[0], values=best[1])
+    return SimpleNamespace(best=sol, execution_time=timedelta(seconds=1))
+
+
+def _parallel(models, client=None, num_solves=1):
+    return [brute_solve(m) for m in models]
+
+
+def offline(module):
+    """Start and return the patches that make `module` solve offline."""
+    mod = importlib.import_module(module)
+    patches = [
+        mock.patch.dict(os.environ, {"AE_KEY": "offline"}),
+        mock.patch(f"{module}.safe_solve", brute_solve),
+    ]
+    if hasattr(mod, "LinearDecoder"):
+        patches.append(mock.patch(f"{module}.LinearDecoder",
+                                  lambda variables, E: (lambda values: E @ values)))
+    if hasattr(mod, "safe_parallel_solve"):
+        patches.append(mock.patch(f"{module}.safe_parallel_solve", _parallel))
+    for p in patches:
+        p.start()
+    return patches
@@ -0,0 +1,37 @@
+# tests/result_csv.py
+"""
+Result-CSV fixtures shared by the analysis tests (csv_to_database, summary,
+ab_report): a box runner header, a CSV writer and a TestCase with a
+temporary directory.
+"""
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+HDR = "mode,d,n,iterations,encode_time,anneal_time,total_time,wall_time,network_time,error\n"
+
+
+def write_csv(path, rows, header=HDR):
+    """Write `header` and one comma-joined line per row tuple."""
+    with open(path, "w") as f:
+        f.write(header)
+        for r in rows:
+            f.write(",".join(map(str, r)) + "\n")
+
+
+def query(db, sql, params=()):
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+class TempDirCase(unittest.TestCase):
+    """TestCase with a fresh temporary directory `self.root` per test."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
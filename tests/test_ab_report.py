@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+from analysis.csv_to_database import import_dirs
+from analysis.ab_report import compare, fetch, holm
+from result_csv import TempDirCase, write_csv
+
+
+class TestAbReport(TempDirCase):
+    def _db(self, name, encode_scale, seed):
+        """20 reps of box-opt at d = 4, 8; encode time scaled by encode_scale[d]."""
+        rng = np.random.default_rng(seed)
+        run_dir = self.root / name
+        run_dir.mkdir()
+        for rep in range(20):
+            rows = []
+            for d in (4, 8):
+                enc = encode_scale[d] * (1 + 0.05 * rng.random())
+                ann = 0.2 * (1 + 0.05 * rng.random())
+                rows.append(("box-opt", d, 10 * d, 3, enc, ann, enc + ann, 1, 0.5, 1e-3))
+            write_csv(run_dir / f"box_opt_0.05_0.0_rep{rep}.csv", rows)
+        db = self.root / f"{name}.db"
+        import_dirs([run_dir], db_path=db, jobs=1, summarize=False)
+        return db
+
+    def test_detects_regression_and_speedup(self):
+        base = fetch(self._db("base", {4: 1.0, 8: 1.0}, 0), ("encode_time", "anneal_time"))
+        cand = fetch(self._db("cand", {4: 0.5, 8: 1.5}, 1), ("encode_time", "anneal_time"))
+        rows = compare(base, cand, ("encode_time", "anneal_time"), threshold=0.10)
+        verdict = {(r["d"], r["metric"]): r for r in rows}
+
+        self.assertEqual(verdict[4, "encode_time"]["verdict"], "faster")
+        self.assertAlmostEqual(verdict[4, "encode_time"]["speedup"], 2.0, delta=0.1)
+        self.assertEqual(verdict[8, "encode_time"]["verdict"], "regression")
+        self.assertEqual(verdict[4, "anneal_time"]["verdict"], "~")
+
+        loose = compare(base, cand, ("encode_time",), threshold=1.0)
+        self.assertEqual([r["verdict"] for r in loose], ["faster", "slower"])
+
+    def test_holm(self):
+        np.testing.assert_allclose(holm([0.01, 0.04, 0.03]), [0.03, 0.06, 0.06])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import itertools
+import unittest
+import numpy as np
+
+from data.data_generator import generate_synthetic_regression
+from models.box_block import select_blocks, solve_box_block_amplify
+from models.box_qubo import box_qubo_matrices, box_step, qubo_energy
+from offline_amplify import offline
+
+
+class TestBoxQubo(unittest.TestCase):
+    def test_matrix_energy_matches_step_energy(self):
+        data = generate_synthetic_regression(n=30, d=3, seed=5)
+        A = data.X_train.T @ data.X_train
+        coeff = A @ np.full(3, 0.3) - data.X_train.T @ data.y_train
+        L = np.array([0.5, 0.25, 1.0])
+        Q, h = box_qubo_matrices(A, coeff, L)
+
+        for bits in itertools.product((0.0, 1.0), repeat=6):
+            x = np.array(bits)
+            s = L * box_step(x, 3)
+            direct = coeff @ s + 0.5 * s @ (A @ s)
+            self.assertAlmostEqual(qubo_energy(Q, h, x), direct, places=8)
+
+
+class TestSelectBlocks(unittest.TestCase):
+    def test_gradient_picks_largest(self):
+        coeff = np.array([0.1, -5.0, 2.0, 0.0, 3.0])
+        L = np.ones(5)
+        blocks, _ = select_blocks(coeff, L, 2, 1, "gradient", 0, 1e-6)
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(blocks[0].tolist(), [1, 4])
+
+    def test_closed_coordinates_skipped(self):
+        coeff = np.array([0.1, -5.0, 2.0, 0.0, 3.0])
+        L = np.array([1.0, 1e-9, 1.0, 1.0, 1.0])
+        blocks, _ = select_blocks(coeff, L, 2, 2, "gradient", 0, 1e-6)
+        self.assertEqual([b.tolist() for b in blocks], [[2, 4], [0, 3]])
+
+    def test_cyclic_wraps(self):
+        coeff = np.zeros(5)
+        L = np.ones(5)
+        blocks, cur = select_blocks(coeff, L, 2, 1, "cyclic", 4, 1e-6)
+        self.assertEqual(blocks[0].tolist(), [0, 4])
+        blocks, cur = select_blocks(coeff, L, 2, 1, "cyclic", cur, 1e-6)
+        self.assertEqual(blocks[0].tolist(), [1, 2])
+
+
+class TestNoBlocks(unittest.TestCase):
+    def test_closed_box_returns_result(self):
+        for p in offline("models.box_block"):
+            self.addCleanup(p.stop)
+        data = generate_synthetic_regression(n=30, d=3, seed=5)
+        A = data.X_train.T @ data.X_train
+        b = data.X_train.T @ data.y_train
+        # every coordinate starts below epsilon: no block is ever selected
+        res = solve_box_block_amplify(A, b, L0=1e-9, epsilon=1e-6)
+        self.assertEqual((res["iterations"], res["anneal_calls"]), (1, 0))
+        self.assertEqual(res["stop_reason"], "epsilon")
+        self.assertEqual(res["fixed_frac"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,17 @@
 # tests/test_box_opt.py
+import csv
 import os
+import tempfile
 import unittest
+from pathlib import Path
+
 import numpy as np
 from models.box_naive import solve_box_naive_amplify
-from models.box_opt import solve_box_opt_amplify
+from models.box_opt import (solve_box_opt_amplify, solve_box_opt_amplify_multi,
+                            solve_box_opt_amplify_path, _build_amplify_primitives,
+                            _ridge_block)
+from benchmark.box_multi import run_box_multi_grid
+from offline_amplify import offline
 
 from data.data_generator import generate_synthetic_regression
 
@@ -33,7 +41,66 @@ class TestBoxOptimizedAmplify(unittest.TestCase):
         # iterations should be identical or lower (same algorithm)
         self.assertLessEqual(opt["iterations"], naive["iterations"])
 
+class TestRidgeTemplate(unittest.TestCase):
+    def test_patched_template_equals_rebuild(self):
+        data = generate_synthetic_regression(n=40, d=3, seed=4)
+        A = data.X_train.T @ data.X_train
+        lam = 2.5
+        _, dvec, quad = _build_amplify_primitives(A)
+        _, _, quad_ref = _build_amplify_primitives(A + lam * np.eye(A.shape[0]))
+        got, ref = (quad + lam * _ridge_block(dvec)).as_dict(), quad_ref.as_dict()
+        self.assertEqual(set(got), set(ref))
+        for k in ref:
+            self.assertAlmostEqual(got[k], ref[k], places=9)
+
+    def test_path_rejects_template_options(self):
+        data = generate_synthetic_regression(n=40, d=3, seed=4)
+        A = data.X_train.T @ data.X_train
+        b = data.X_train.T @ data.y_train
+        for kw in ({"fix_persistent": True}, {"prune_rel": 0.1}, {"prune_topk": 2}):
+            with self.assertRaises(ValueError, msg=str(kw)):
+                solve_box_opt_amplify_path(A, b, [1.0, 0.0], **kw)
+
+
+class TestBoxOptMulti(unittest.TestCase):
+    def setUp(self):
+        for p in offline("models.box_opt"):
+            self.addCleanup(p.stop)
+        data = generate_synthetic_regression(n=30, d=3, noise_sigma=0.1, seed=5)
+        X = data.X_train
+        self.A = X.T @ X
+        self.B = X.T @ np.column_stack([data.y_train, -data.y_train, 2 * X[:, 0]])
+
+    def test_matches_per_column_solves(self):
+        kw = dict(max_iter=12, anneal_budget_s=5.0)
+        for batch in (True, False):
+            multi = solve_box_opt_amplify_multi(self.A, self.B, batch=batch, **kw)
+            for k in range(self.B.shape[1]):
+                one = solve_box_opt_amplify(self.A, self.B[:, k], **kw)
+                np.testing.assert_allclose(multi["solutions"][:, k], one["solution"], atol=1e-9)
+                self.assertEqual(multi["iterations"][k], one["iterations"])
+                self.assertEqual(multi["stop_reasons"][k], one["stop_reason"])
+
+    def test_targets_stop_on_their_own_budget(self):
+        res = solve_box_opt_amplify_multi(self.A, self.B, max_iter=20, anneal_budget_s=4.0)
+        # each target gets 4 one-second anneals, not 4 s shared across targets
+        self.assertEqual(res["stop_reasons"], ["anneal_budget"] * 3)
+        self.assertEqual(res["iterations"], [4, 4, 4])
+        self.assertEqual(res["anneal_calls"], 12)
+        self.assertAlmostEqual(res["anneal_time"], 12.0)
+
+    def test_runner_logs_one_row_per_target(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = run_box_multi_grid(dims=[3], noise=0.1, corr=0.0, seed=0, n_targets=2,
+                                     max_iter=10, num_solves=1, timeout_ms=10,
+                                     outfile=str(Path(tmp) / "multi.csv"),
+                                     schedule={"anneal_budget_s": 3.0})
+            with open(out, newline="") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([r["target"] for r in rows], ["0", "1"])
+        self.assertEqual([r["iterations"] for r in rows], ["3", "3"])
+        self.assertEqual({r["stop_reason"] for r in rows}, {"anneal_budget"})
+
 
 if __name__ == "__main__":
     unittest.main()
-
@@ -0,0 +1,97 @@
+import json
+import os
+import sqlite3
+import unittest
+from unittest import mock
+
+from analysis.csv_to_database import POOL_MIN_BYTES, _workers, import_dirs
+from result_csv import TempDirCase, query, write_csv
+
+
+class TestCsvImport(TempDirCase):
+    def setUp(self):
+        super().setUp()
+        self.dirs = [self.root / "a", self.root / "b"]
+        for d in self.dirs:
+            d.mkdir()
+        self.csv = self.dirs[0] / "box_opt_0.05_0.8_rep0.csv"
+        write_csv(self.csv, [("box-opt", 4, 40, 3, .1, .2, .3, .4, .2, 1e-3),
+                          ("box-opt", 8, 80, 5, .1, .2, .3, .4, .2, 2e-3)])
+        write_csv(self.dirs[1] / "box_naive_0.01_0.0_rep1.csv",
+               [("box_naive", 4, 40, 7, .1, .2, .3, .4, .2, 1e-2)])
+        (self.dirs[1] / "junk.csv").write_text("foo,bar\n1,2\n")
+        self.db = self.root / "bench.db"
+
+    def _query(self, sql):
+        return query(self.db, sql)
+
+    def _runs(self):
+        return self._query("SELECT mode, d, iterations, noise, corr FROM runs ORDER BY mode, d")
+
+    def test_import_is_idempotent(self):
+        s = import_dirs(self.dirs, db_path=self.db, jobs=2)
+        self.assertEqual((s["imported"], s["rows"]), (2, 3))
+        self.assertEqual(self._runs(), [("box-naive", 4, 7, 0.01, 0.0),
+                                        ("box-opt", 4, 3, 0.05, 0.8),
+                                        ("box-opt", 8, 5, 0.05, 0.8)])
+        s = import_dirs(self.dirs, db_path=self.db, jobs=1)
+        self.assertEqual((s["imported"], s["rows"]), (0, 0))
+        self.assertEqual(len(self._runs()), 3)
+
+    def test_touched_and_changed_files(self):
+        import_dirs(self.dirs, db_path=self.db, jobs=1)
+        st = self.csv.stat()
+        os.utime(self.csv, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        s = import_dirs(self.dirs, db_path=self.db, jobs=1)
+        self.assertEqual((s["replaced"], s["rows"]), (0, 0))
+
+        write_csv(self.csv, [("box-opt", 16, 160, 9, .1, .2, .3, .4, .2, 1e-3)])
+        s = import_dirs(self.dirs, db_path=self.db, jobs=1)
+        self.assertEqual((s["replaced"], s["rows"]), (1, 1))
+        self.assertEqual([r[1] for r in self._runs()], [4, 16])
+        self.assertEqual(self._query("SELECT COUNT(*) FROM metrics")[0][0], 2)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM accuracy")[0][0], 2)
+
+    def test_typed_columns(self):
+        (self.dirs[0] / "classical_0.05_0.8_rep0.csv").write_text(
+            "model,d,n,noise,corr,seed,train_time,predict_time,r2,mse\n"
+            "ols,4,40,0.05,0.8,0,0.01,0.002,0.99,0.03\n")
+        (self.dirs[0] / "potok_0.05_0.8_rep0.csv").write_text(
+            "mode,d,n,K,iterations,encode_time,anneal_time,total_time,"
+            "wall_time,network_time,error,stop_reason\n"
+            "potok,4,40,3,1,0.1,0.2,0.3,0.9,0.7,1e-2,max_iter\n")
+        import_dirs(self.dirs, db_path=self.db, jobs=1)
+
+        rows = self._query("SELECT mode, k, total_time, predict_time, network_time, "
+                           "anneal_time, error, r2, mse, params FROM results "
+                           "WHERE mode IN ('ols', 'potok') ORDER BY mode")
+        ols, potok = rows
+        self.assertEqual(ols[:5], ("ols", None, 0.01, 0.002, None))
+        self.assertEqual(ols[5:9], (None, None, 0.99, 0.03))
+        self.assertEqual(potok[:7], ("potok", 3, 0.3, None, 0.7, 0.2, 1e-2))
+        self.assertEqual(json.loads(potok[9])["stop_reason"], "max_iter")
+
+    def test_old_schema_is_kept_and_reimported(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY, mode TEXT, anneal_time REAL)")
+        conn.execute("INSERT INTO runs VALUES (1, 'box-opt', 0.5)")
+        conn.commit()
+        conn.close()
+        s = import_dirs(self.dirs, db_path=self.db, jobs=1)
+        self.assertEqual(s["rows"], 3)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM runs_v1")[0][0], 1)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM results")[0][0], 3)
+
+
+class TestWorkers(unittest.TestCase):
+    def test_pool_only_when_it_pays(self):
+        self.assertEqual(_workers(3, 0), 3)                  # explicit --jobs wins
+        with mock.patch("os.cpu_count", return_value=8):
+            self.assertEqual(_workers(None, POOL_MIN_BYTES - 1), 1)
+            self.assertEqual(_workers(None, POOL_MIN_BYTES), 8)
+        with mock.patch("os.cpu_count", return_value=1):
+            self.assertEqual(_workers(None, 100 * POOL_MIN_BYTES), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
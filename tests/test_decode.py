@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+
+from models.box_qubo import box_step
+from models.decode import LinearDecoder, box_encoding, potok_encoding
+
+
+class _FakeArray:
+    """Stands in for an Amplify PolyArray: evaluate returns fixed bits."""
+    def __init__(self, bits):
+        self._bits = bits
+
+    def evaluate(self, values):
+        return self._bits
+
+
+class TestDecode(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(3)
+
+    def test_box_encoding_matches_box_step(self):
+        d = 7
+        x = self.rng.integers(0, 2, 2 * d).astype(float)
+        np.testing.assert_array_equal(box_encoding(d) @ x, box_step(x, d))
+        self.assertEqual(box_encoding(d).shape, (d, 2 * d))
+
+    def test_potok_encoding_matches_reshape(self):
+        d, P = 5, np.array([-1.0, 0.5, 0.25])
+        x = self.rng.integers(0, 2, (d, len(P))).astype(float)
+        decode = LinearDecoder(_FakeArray(x), potok_encoding(d, P))
+        np.testing.assert_allclose(decode(None), x @ P)
+        np.testing.assert_array_equal(decode.bits(None), x.ravel())
+
+
+if __name__ == "__main__":
+    unittest.main()
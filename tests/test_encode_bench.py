@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from benchmark.encode_bench import (CASES, _Problem, compare, fit_exponents, load_baseline,
+                                    run_encode_bench, save_baseline)
+from models.box_qubo import box_qubo_matrices, qubo_energy
+
+
+class TestEncodeBench(unittest.TestCase):
+    def test_cases_build_the_box_qubo(self):
+        # every box encode is ΔE of box_qubo_matrices up to a constant
+        p = _Problem(5, 0.5, K=3, seed=2)
+        Q, h = box_qubo_matrices(p.A, p.A @ p.c - p.b, p.L)
+        x = np.random.default_rng(0).integers(0, 2, 10).astype(float)
+        for name in ("box-naive", "box-naive-sparse", "box-opt", "box-opt-sparse"):
+            out = CASES[name](p)()
+            poly = out[1] if isinstance(out, tuple) else out.objective
+            E = sum(v * np.prod(x[list(k)]) for k, v in poly.as_dict().items() if k)
+            self.assertAlmostEqual(E, qubo_energy(Q, h, x), places=8, msg=name)
+
+    def test_sweep_fit_and_compare(self):
+        rows = run_encode_bench(dims=[4, 8, 16], densities=[1.0],
+                                cases=["box-opt", "potok-iter"], repeat=3,
+                                min_time=0, verbose=False)
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(all(r["median"] > 0 and r["loops"] == 1 for r in rows))
+        fits = fit_exponents(rows, min_d=4)
+        self.assertEqual({f["case"] for f in fits}, {"box-opt", "potok-iter"})
+        self.assertTrue(all(f["exponent"] is not None for f in fits))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            base = load_baseline(save_baseline(Path(tmp) / "b.json", rows, fits, K=4))
+        self.assertEqual(base["meta"]["K"], 4)
+        slow = [{**r, "median": 2 * r["median"], "min": 1.5 * r["median"]} for r in rows]
+        noisy = [{**r, "median": 2 * r["median"], "min": 0.5 * r["median"]} for r in rows]
+        cells, cases = compare(base["results"], slow)
+        self.assertTrue(all(c["slower"] for c in cells))
+        self.assertTrue(all(c["regression"] for c in cases))
+        cells, cases = compare(base["results"], noisy)
+        self.assertFalse(any(c["slower"] for c in cells))    # min guard
+        self.assertTrue(all(c["regression"] for c in cases))
+
+        # one noisy cell does not fail its case
+        mixed = [{**r, "median": 1.6 * r["median"], "min": 1.6 * r["median"]} if i == 0 else r
+                 for i, r in enumerate(rows)]
+        cells, cases = compare(base["results"], mixed)
+        self.assertEqual(sum(c["slower"] for c in cells), 1)
+        self.assertFalse(any(c["regression"] for c in cases))
+
+    def test_budget_skips_larger_d(self):
+        rows = run_encode_bench(dims=[4, 8, 16], densities=[1.0], cases=["box-naive"],
+                                repeat=1, min_time=0, max_case_s=0.0, verbose=False)
+        self.assertEqual([r["d"] for r in rows], [4])
+
+
+if __name__ == "__main__":
+    unittest.main()
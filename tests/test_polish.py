@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from data.data_generator import generate_synthetic_regression
+from models.polish import polish_solution
+
+
+class TestPolish(unittest.TestCase):
+    def setUp(self):
+        data = generate_synthetic_regression(n=100, d=5, noise_sigma=0.01, seed=9)
+        self.A = data.X_train.T @ data.X_train
+        self.b = data.X_train.T @ data.y_train
+        self.exact = np.linalg.solve(self.A, self.b)
+        self.c = self.exact + 1e-2          # what a few box iterations leave
+
+    def test_newton_dense_and_sparse(self):
+        for A in (self.A, csr_matrix(self.A)):
+            c = polish_solution(A, self.b, self.c, "newton")
+            self.assertLess(np.linalg.norm(c - self.exact), 1e-9)
+
+    def test_cg_improves(self):
+        start = np.linalg.norm(self.c - self.exact)
+        c = polish_solution(self.A, self.b, self.c, "cg", steps=2)
+        self.assertLess(np.linalg.norm(c - self.exact), start)
+        c = polish_solution(self.A, self.b, self.c, "cg")
+        self.assertLess(np.linalg.norm(c - self.exact), 1e-8)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            polish_solution(self.A, self.b, self.c, "lbfgs")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import itertools
+import unittest
+import numpy as np
+
+from data.data_generator import generate_synthetic_regression
+from models.potok import (
+    signed_p_vector,
+    potok_qubo_matrices,
+    build_potok_template,
+    potok_qubo_from_template,
+    potok_ridge_patch,
+    solve_linreg_potok_iterative_amplify,
+    solve_linreg_potok_path,
+)
+from benchmark.potok import _default_p_vector
+from offline_amplify import offline
+
+
+class TestPrecisionVectors(unittest.TestCase):
+    def test_default_unchanged(self):
+        self.assertEqual(_default_p_vector(4), (0.25, 0.5, 0.75, 1.0))
+
+    def test_signed_grid(self):
+        P = np.array(signed_p_vector(3, scale=2.0))
+        levels = sorted({float(np.dot(bits, P))
+                         for bits in itertools.product((0, 1), repeat=3)})
+        self.assertEqual(levels, [-2.0, -1.5, -1.0, -0.5, 0.0, 0.5, 1.0, 1.5])
+        self.assertEqual(_default_p_vector(3, signed=True, scale=2.0), tuple(P))
+
+
+class TestPotokQubo(unittest.TestCase):
+    def test_matrix_energy_matches_weights(self):
+        data = generate_synthetic_regression(n=40, d=2, seed=2)
+        A = data.X_train.T @ data.X_train
+        b = data.X_train.T @ data.y_train
+        c = np.array([0.3, -0.2])
+        P = np.array(signed_p_vector(2, scale=0.5))
+        Q, h = potok_qubo_matrices(A, A @ c - b, P)
+
+        E = lambda w: 0.5 * w @ (A @ w) - b @ w
+        for bits in itertools.product((0.0, 1.0), repeat=4):
+            x = np.array(bits)
+            w = c + x.reshape(2, 2) @ P
+            self.assertAlmostEqual(x @ Q @ x + h @ x, E(w) - E(c), places=8)
+
+
+class TestPotokTemplate(unittest.TestCase):
+    def test_k_sweep_slices_match_direct_build(self):
+        data = generate_synthetic_regression(n=50, d=3, seed=8)
+        X, y = data.X_train, data.y_train
+        for signed in (False, True):
+            P_max = _default_p_vector(4, signed)
+            tpl = build_potok_template(X, y, P_max)
+            for K in (1, 2, 3, 4):
+                P = _default_p_vector(K, signed)
+                Q, h = potok_qubo_from_template(tpl, P)
+                Q_ref, h_ref = potok_qubo_matrices(X.T @ X, -(X.T @ y), P)
+                self.assertTrue(np.allclose(Q, Q_ref))
+                self.assertTrue(np.allclose(h, h_ref))
+
+    def test_non_prefix_vector_falls_back(self):
+        data = generate_synthetic_regression(n=50, d=3, seed=8)
+        tpl = build_potok_template(data.X_train, data.y_train, (0.25, 0.5))
+        Q, h = potok_qubo_from_template(tpl, (1.0, 2.0, 4.0))
+        self.assertEqual(Q.shape, (9, 9))
+        self.assertEqual(h.shape, (9,))
+
+
+class TestRidgePatch(unittest.TestCase):
+    def test_patch_equals_rebuild_with_ridge(self):
+        data = generate_synthetic_regression(n=50, d=3, seed=9)
+        A = data.X_train.T @ data.X_train
+        P = signed_p_vector(3, scale=2.0)
+        zeros = np.zeros(A.shape[0])
+        Q, _ = potok_qubo_matrices(A, zeros, P)
+        for lam in (0.5, 10.0):
+            Q_ref, _ = potok_qubo_matrices(A + lam * np.eye(A.shape[0]), zeros, P)
+            np.testing.assert_allclose(potok_ridge_patch(Q, lam, P), Q_ref)
+        np.testing.assert_array_equal(Q, potok_qubo_matrices(A, zeros, P)[0])  # input untouched
+
+
+class TestIterativeRadius(unittest.TestCase):
+    def setUp(self):
+        for p in offline("models.potok"):
+            self.addCleanup(p.stop)
+
+    def test_reaches_weights_beyond_radius(self):
+        # K=4, radius 2: a shrinking-only schedule stalls at 2·1.75/(1-¼) ≈ 2.33
+        rng = np.random.default_rng(0)
+        X = np.column_stack([np.ones(30), rng.uniform(-1, 1, 30)])
+        w = np.array([0.3, 2.6])
+        res = solve_linreg_potok_iterative_amplify(X, X @ w, K=4, rounds=6, radius=2.0)
+        self.assertLess(res["error"], 0.05)
+        np.testing.assert_allclose(res["solution"], w, atol=0.05)
+
+    def test_inside_radius_unchanged(self):
+        rng = np.random.default_rng(1)
+        X = np.column_stack([np.ones(30), rng.uniform(-1, 1, 30)])
+        w = np.array([0.5, -0.75])
+        res = solve_linreg_potok_iterative_amplify(X, X @ w, K=3, rounds=4, radius=2.0)
+        self.assertLess(res["error"], 1e-9)
+
+    def test_path_leaves_template_untouched(self):
+        rng = np.random.default_rng(2)
+        X = np.column_stack([np.ones(30), rng.uniform(-1, 1, 30)])
+        y = X @ np.array([0.4, -1.2]) + 0.05 * rng.standard_normal(30)
+        tpl = build_potok_template(X, y, signed_p_vector(3, 2.0))
+        keys = set(tpl)
+        path = solve_linreg_potok_path(X, y, [1.0, 0.1], K=3, template=tpl)
+        self.assertEqual(set(tpl), keys)
+        ref = solve_linreg_potok_iterative_amplify(X, y, K=3, radius=path[1]["radius"],
+                                                   template=tpl, ridge=0.1,
+                                                   c0=path[0]["solution"])
+        np.testing.assert_allclose(path[1]["solution"], ref["solution"])
+
+
+if __name__ == "__main__":
+    unittest.main()
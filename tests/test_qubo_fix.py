@@ -0,0 +1,51 @@
+import itertools
+import unittest
+import numpy as np
+
+from data.data_generator import generate_synthetic_regression
+from models.box_qubo import box_qubo_matrices, qubo_energy
+from models.qubo_fix import reduce_persistent, expand_assignment
+
+
+def _brute_force(Q, h):
+    xs = [np.array(bits) for bits in itertools.product((0.0, 1.0), repeat=len(h))]
+    E = [qubo_energy(Q, h, x) for x in xs]
+    best = min(E)
+    return best, [x for x, e in zip(xs, E) if e <= best + 1e-9]
+
+
+class TestPersistency(unittest.TestCase):
+    def setUp(self):
+        data = generate_synthetic_regression(n=40, d=3, seed=5)
+        self.A = data.X_train.T @ data.X_train
+        self.b = data.X_train.T @ data.y_train
+
+    def test_fixed_values_agree_with_every_minimiser(self):
+        for L in (1.0, 0.5, 0.01):      # none, some and all binaries fixed
+            coeff = self.A @ np.array([0.2, -0.4, 0.1]) - self.b
+            Q, h = box_qubo_matrices(self.A, coeff, L)
+            free, fixed, vals, Q_r, h_r, const = reduce_persistent(Q, h)
+            best, argmins = _brute_force(Q, h)
+            for x in argmins:
+                np.testing.assert_array_equal(x[fixed], vals)
+
+            # reduced problem + constant reproduces the full energy
+            n = len(h)
+            for bits in itertools.product((0.0, 1.0), repeat=len(free)):
+                xf = np.array(bits)
+                x = expand_assignment(n, free, fixed, vals, xf)
+                self.assertAlmostEqual(qubo_energy(Q_r, h_r, xf) + const,
+                                       qubo_energy(Q, h, x), places=8)
+
+    def test_small_box_fixes_everything(self):
+        # a strong gradient against a tiny box decides every binary
+        coeff = self.A @ np.ones(len(self.b)) - self.b
+        Q, h = box_qubo_matrices(self.A, coeff, 1e-6)
+        free, fixed, vals, Q_r, h_r, const = reduce_persistent(Q, h)
+        self.assertEqual(len(free), 0)
+        best, _ = _brute_force(Q, h)
+        self.assertAlmostEqual(const, best, places=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from data.data_generator import generate_synthetic_regression
+from models.box_qubo import box_qubo_matrices, box_qubo_sparse, box_step, qubo_energy
+from models.potok import potok_qubo_matrices, signed_p_vector
+from models.qubo_io import (
+    save_qubo, load_qubo, qubo_matrices, coo_energy,
+    export_box_qubo, export_potok_qubo,
+)
+
+
+class TestQuboIO(unittest.TestCase):
+    def setUp(self):
+        data = generate_synthetic_regression(n=50, d=4, seed=6)
+        self.A = data.X_train.T @ data.X_train
+        self.b = data.X_train.T @ data.y_train
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rng = np.random.default_rng(0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_mmap(self):
+        Q, h = box_qubo_matrices(self.A, -self.b, 0.5)
+        path = save_qubo(self.tmp.name + "/q", Q, h, const=1.5, arrays={"c": np.ones(3)}, tag="x")
+        q = load_qubo(path)
+        self.assertIsInstance(q["vals"], np.memmap)
+        self.assertEqual(q["meta"]["tag"], "x")
+        np.testing.assert_array_equal(q["c"], np.ones(3))
+        Q2, h2 = qubo_matrices(q)
+        np.testing.assert_allclose(Q2.toarray(), Q)
+        np.testing.assert_allclose(h2, h)
+        for _ in range(10):
+            x = self.rng.integers(0, 2, len(h)).astype(float)
+            self.assertAlmostEqual(coo_energy(q, x), qubo_energy(Q, h, x) + 1.5, places=8)
+
+    def test_sparse_box_matches_dense(self):
+        L = np.array([0.5, 0.1, 1.0, 0.2])
+        Qd, hd = box_qubo_matrices(self.A, -self.b, L)
+        Qs, hs = box_qubo_sparse(csr_matrix(self.A), -self.b, L)
+        np.testing.assert_allclose(Qs.toarray(), Qd)
+        np.testing.assert_allclose(hs, hd)
+
+    def test_exported_box_decodes_to_energy(self):
+        c = 0.1 * np.arange(len(self.b))
+        coeff = self.A @ c - self.b
+        q = load_qubo(export_box_qubo(self.tmp.name + "/box", self.A, coeff, 0.25, c))
+        E = lambda w: 0.5 * w @ (self.A @ w) - self.b @ w
+        x = self.rng.integers(0, 2, 2 * len(c)).astype(float)
+        w = q["center"] + q["meta"]["L"] * box_step(x, q["meta"]["d"])
+        self.assertAlmostEqual(coo_energy(q, x), E(w) - E(c), places=8)
+
+    def test_exported_potok_decodes_to_energy(self):
+        P = np.array(signed_p_vector(2, scale=0.5))
+        Q, h = potok_qubo_matrices(self.A, -self.b, P)
+        q = load_qubo(export_potok_qubo(self.tmp.name + "/potok", Q, h, P), mmap=False)
+        d, P = q["meta"]["d"], np.array(q["meta"]["P"])
+        x = self.rng.integers(0, 2, d * len(P)).astype(float)
+        w = q["center"] + x.reshape(d, len(P)) @ P
+        self.assertAlmostEqual(coo_energy(q, x), 0.5 * w @ (self.A @ w) - self.b @ w, places=8)
+
+
+if __name__ == "__main__":
+    unittest.main()
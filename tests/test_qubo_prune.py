@@ -0,0 +1,61 @@
+import itertools
+import unittest
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+from data.data_generator import generate_synthetic_regression
+from models.box_qubo import box_qubo_matrices, qubo_energy
+from models.qubo_prune import prune_couplings, energy_bound, box_qubo_nnz
+
+
+class TestPruneCouplings(unittest.TestCase):
+    def setUp(self):
+        data = generate_synthetic_regression(n=60, d=5, feature_corr=0.3, seed=4)
+        self.A = data.X_train.T @ data.X_train
+
+    def test_no_threshold_is_exact(self):
+        A_p, stats = prune_couplings(self.A)
+        np.testing.assert_array_equal(A_p, self.A)
+        self.assertEqual(stats["dropped_l1"], 0.0)
+        d = self.A.shape[0]
+        self.assertEqual(stats["offdiag_nnz"], d * (d - 1) // 2)
+
+    def test_threshold_keeps_diagonal_and_symmetry(self):
+        A_p, stats = prune_couplings(self.A, rel_threshold=0.5)
+        np.testing.assert_array_equal(np.diag(A_p), np.diag(self.A))
+        np.testing.assert_array_equal(A_p, A_p.T)
+        off = np.abs(self.A - np.diag(np.diag(self.A)))
+        kept = np.abs(A_p - np.diag(np.diag(A_p)))
+        self.assertTrue(np.all(kept[kept > 0] >= 0.5 * off.max()))
+        self.assertAlmostEqual(stats["dropped_l1"], off.sum() - kept.sum())
+
+    def test_top_k(self):
+        A_p, stats = prune_couplings(self.A, top_k=1)
+        off = A_p - np.diag(np.diag(A_p))
+        # every row keeps at least its strongest coupling
+        self.assertTrue(np.all(np.count_nonzero(off, axis=1) >= 1))
+        d = self.A.shape[0]
+        self.assertLess(stats["offdiag_nnz"], d * (d - 1) // 2)
+
+    def test_sparse_in_sparse_out(self):
+        A_p, stats = prune_couplings(csr_matrix(self.A), rel_threshold=0.5)
+        self.assertTrue(issparse(A_p))
+        A_d, _ = prune_couplings(self.A, rel_threshold=0.5)
+        np.testing.assert_array_equal(A_p.toarray(), A_d)
+
+    def test_energy_bound_holds_for_box(self):
+        d, L = self.A.shape[0], 0.3
+        coeff = np.linspace(-1.0, 1.0, d)
+        A_p, stats = prune_couplings(self.A, rel_threshold=0.5)
+        Q, h = box_qubo_matrices(self.A, coeff, L)
+        Qp, hp = box_qubo_matrices(A_p, coeff, L)
+        self.assertEqual(np.count_nonzero(np.triu(Qp, 1)), box_qubo_nnz(stats["offdiag_nnz"], d))
+        bound = energy_bound(stats["dropped_l1"], 2.0 * L)
+        for bits in itertools.product((0.0, 1.0), repeat=2 * d):
+            x = np.array(bits)
+            self.assertLessEqual(abs(qubo_energy(Q, h, x) - qubo_energy(Qp, hp, x)),
+                                 bound + 1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from benchmark.result_logger import ResultLogger
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+
+class TestResultLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _log(self, run, mode, parquet_root=None, **extra):
+        lg = ResultLogger(self.root / "csv" / run / f"{mode}_0.01_0.0_rep0.csv",
+                          parquet_root=parquet_root)
+        for d in (4, 8):
+            lg.add(mode=mode, d=np.int64(d), encode_time=np.float64(1.23456789e-5 * d),
+                   error=3.3e-4, stop_reason="eps", **extra)
+        lg.flush()
+        return lg
+
+    def test_csv_formatting(self):
+        lg = self._log("r1", "box-opt")
+        with lg.out_path.open() as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]["encode_time"], "4.93827e-05")
+        self.assertEqual(rows[1]["error"], "3.30e-04")
+        self.assertEqual(rows[1]["d"], "8")
+        self.assertIsNone(lg.parquet_path)
+
+    @unittest.skipUnless(HAVE_ARROW, "pyarrow not installed")
+    def test_parquet_partitions_and_pushdown(self):
+        from analysis.parquet_results import load, summarise
+
+        pq_root = self.root / "pq"
+        for run in ("r1", "r2"):
+            self._log(run, "box-opt", pq_root)
+            self._log(run, "potok", pq_root, K=4)
+        self.assertTrue((pq_root / "run=r2" / "potok_0.01_0.0_rep0.parquet").exists())
+
+        t = load(pq_root, filters=[("mode", "=", "box-opt"), ("d", ">=", 8)],
+                 columns=["run", "d", "encode_time", "K"])
+        self.assertEqual(sorted(t.column("run").to_pylist()), ["r1", "r2"])
+        self.assertEqual(t.column("K").to_pylist(), [None, None])
+        self.assertEqual(t.column("encode_time").to_pylist(), [1.23456789e-5 * 8] * 2)
+
+        s = summarise(load(pq_root), "encode_time").to_pylist()
+        self.assertEqual([(r["mode"], r["d"], r["encode_time_count"]) for r in s],
+                         [("box-opt", 4, 2), ("box-opt", 8, 2), ("potok", 4, 2), ("potok", 8, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
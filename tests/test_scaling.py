@@ -0,0 +1,90 @@
+import unittest
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from data.data_generator import generate_synthetic_regression
+from models.scaling import (
+    SCALINGS, scaling_transform, scale_problem, scale_design,
+    apply_transform, invert_transform, solve_scaled, scale_box_side,
+)
+from models.warm_start import TargetTracker
+
+
+class TestScaling(unittest.TestCase):
+    def setUp(self):
+        data = generate_synthetic_regression(n=120, d=8, feature_corr=0.8, seed=2)
+        self.X = data.X_train * np.linspace(0.5, 3.0, data.X_train.shape[1])
+        self.A = self.X.T @ self.X
+        self.b = self.X.T @ data.y_train
+        self.x = np.linalg.solve(self.A, self.b)
+
+    def test_round_trip_and_equal_diagonal(self):
+        for method in SCALINGS:
+            T = scaling_transform(self.A, method)
+            A_s, b_s = scale_problem(self.A, self.b, T)
+            np.testing.assert_allclose(np.diag(A_s), np.diag(A_s).mean(), rtol=1e-4)
+            x_s = np.linalg.solve(A_s, b_s)
+            np.testing.assert_allclose(apply_transform(T, x_s), self.x, rtol=1e-6)
+            np.testing.assert_allclose(invert_transform(T, self.x), x_s, rtol=1e-6)
+            Xs = scale_design(self.X, T)
+            np.testing.assert_allclose(Xs.T @ Xs, A_s, rtol=1e-8, atol=1e-8)
+
+    def test_cholesky_fixes_conditioning(self):
+        T = scaling_transform(self.A, "cholesky")
+        A_s, _ = scale_problem(self.A, self.b, T)
+        self.assertLess(np.linalg.cond(A_s), 1.01)
+        self.assertGreater(np.linalg.cond(self.A), 50)
+
+    def test_jacobi_keeps_sparse(self):
+        T = scaling_transform(csr_matrix(self.A), "jacobi")
+        A_s, _ = scale_problem(csr_matrix(self.A), self.b, T)
+        self.assertTrue(hasattr(A_s, "tocsr"))
+        np.testing.assert_allclose(A_s.toarray(), scale_problem(self.A, self.b, T)[0])
+
+    def test_solve_scaled_maps_solution_back(self):
+        def fake_solver(A, b, c0=None, **kw):
+            return {"solution": np.linalg.solve(A, b), "error": None,
+                    "total_time": 0.0, "wall_time": 0.0, "c0": c0}
+
+        c0 = np.ones(len(self.b))
+        res = solve_scaled(fake_solver, self.A, self.b, "jacobi", c0=c0)
+        np.testing.assert_allclose(res["solution"], self.x, rtol=1e-8)
+        self.assertLess(res["error"], 1e-8)
+        T = scaling_transform(self.A, "jacobi")
+        np.testing.assert_allclose(apply_transform(T, res["c0"]), c0)
+
+    def test_box_side_contains_original_box(self):
+        rng = np.random.default_rng(0)
+        for method in SCALINGS:
+            T = scaling_transform(self.A, method)
+            L_s = scale_box_side(T, 0.5)
+            # corners of the x-space box land inside the scaled box
+            corners = 0.5 * rng.choice([-1.0, 1.0], size=(64, len(self.b)))
+            steps = np.array([invert_transform(T, x) for x in corners])
+            self.assertLessEqual(np.abs(steps).max(), L_s + 1e-12, msg=method)
+
+    def test_target_and_L0_in_original_units(self):
+        seen = {}
+
+        def fake_solver(A, b, c0=None, L0=1.0, target_error=None, target_space=None):
+            seen["L0"] = L0
+            c = np.linalg.solve(A, b) + 1e-3              # scaled variables
+            tt = TargetTracker(A, b, target_error, target_space)
+            tt.update(c, 1, 0.0)
+            seen["dist"] = np.linalg.norm(apply_transform(target_space[0], c) - self.x)
+            return {"solution": c, "error": None, "total_time": 0.0, "wall_time": 0.0,
+                    "iters_to_target": tt.iters}
+
+        T = scaling_transform(self.A, "jacobi")
+        res = solve_scaled(fake_solver, self.A, self.b, "jacobi", L0=0.5,
+                           target_error=1.0)
+        self.assertAlmostEqual(seen["L0"], 0.5 / T.min())
+        self.assertEqual(res["iters_to_target"], 1)
+        res = solve_scaled(fake_solver, self.A, self.b, "jacobi", L0=0.5,
+                           target_error=0.5 * seen["dist"])
+        self.assertIsNone(res["iters_to_target"])
+        self.assertAlmostEqual(res["error"], seen["dist"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from models.spans import (SpanRecorder, memory_scope, record_span, span,
+                         timed, track_memory)
+
+
+@timed("work")
+def _work(n):
+    return sum(range(n))
+
+
+class TestSpans(unittest.TestCase):
+    def test_elapsed_without_recorder(self):
+        with span("encode") as sp:
+            _work(1000)
+        self.assertGreater(sp.elapsed, 0.0)
+        record_span("anneal", 1.0)          # no recorder: ignored
+
+    def test_nesting(self):
+        with SpanRecorder() as rec:
+            for it in (1, 2):
+                with span("iter", it=it):
+                    with span("encode"):
+                        pass
+                    with span("submit"):
+                        record_span("anneal", 0.0, reported=True)
+            self.assertEqual(_work(10), 45)
+        by_name = {}
+        for s in rec.spans:
+            by_name.setdefault(s["name"], []).append(s)
+        iters = {s["id"]: s for s in by_name["iter"]}
+        self.assertEqual([s["it"] for s in by_name["iter"]], [1, 2])
+        for s in by_name["encode"]:
+            self.assertIn(s["parent"], iters)
+            self.assertEqual(s["depth"], 1)
+        submits = {s["id"] for s in by_name["submit"]}
+        self.assertTrue(all(s["parent"] in submits and s["depth"] == 2
+                            for s in by_name["anneal"]))
+        self.assertEqual(rec.totals()["work"][0], 1)
+        self.assertEqual(rec.totals()["encode"][0], 2)
+
+    def test_recorder_scope(self):
+        with SpanRecorder() as rec:
+            with span("inside"):
+                pass
+        with span("outside"):
+            pass
+        self.assertEqual([s["name"] for s in rec.spans], ["inside"])
+
+    def test_exports_and_profile(self):
+        with SpanRecorder(profile=("work",)) as rec:
+            with span("run", mode="box-opt", d=8):
+                _work(10_000)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            lines = rec.write(tmp / "spans.jsonl").read_text().splitlines()
+            rows = [json.loads(l) for l in lines]
+            self.assertEqual([r["name"] for r in rows], ["run", "work"])
+            self.assertEqual(rows[0]["mode"], "box-opt")
+
+            trace = json.loads(rec.write(tmp / "spans.json").read_text())
+            ev = trace["traceEvents"]
+            self.assertEqual({e["ph"] for e in ev}, {"X"})
+            self.assertEqual(ev[0]["args"], {"mode": "box-opt", "d": 8})
+            self.assertLessEqual(ev[0]["ts"], ev[1]["ts"])
+
+            profs = rec.write_profiles(tmp / "prof")
+            self.assertEqual([p.name for p in profs], ["work.prof"])
+
+
+class TestMemory(unittest.TestCase):
+    def setUp(self):
+        track_memory(True)
+        self.addCleanup(track_memory, False)
+
+    def test_nested_peaks(self):
+        with memory_scope() as dmem:
+            with span("datagen"):
+                kept = np.ones(1 << 20)                     # 8 MiB, kept
+        with memory_scope() as mem, span("run") as run:
+            with span("template") as tmpl:
+                tmp = np.ones(2 << 20)                      # 16 MiB, freed
+                del tmp
+            with span("iter"):
+                pass
+        cols = mem.columns(dmem)
+        self.assertGreaterEqual(tmpl.py_peak, 16 << 20)
+        self.assertGreaterEqual(run.py_peak, tmpl.py_peak)  # child peak handed up
+        self.assertLess(cols["mem_iter_mb"], 1.0)
+        self.assertGreaterEqual(cols["mem_template_mb"], 16.0)
+        self.assertGreaterEqual(cols["mem_data_mb"], 8.0)   # from the outer scope
+        self.assertGreater(cols["rss_peak_mb"], 0.0)
+        self.assertEqual(kept.size, 1 << 20)
+
+    def test_missing_phases_and_off(self):
+        with memory_scope() as mem, span("run"):
+            pass
+        cols = mem.columns()
+        self.assertIsNone(cols["mem_template_mb"])
+        self.assertIsNotNone(cols["mem_run_mb"])
+        track_memory(False)
+        with memory_scope() as mem, span("run") as sp:
+            pass
+        self.assertEqual(mem.columns(), {})
+        self.assertIsNone(sp.py_peak)
+
+
+if __name__ == "__main__":
+    unittest.main()
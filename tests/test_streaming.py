@@ -0,0 +1,87 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from data.data_generator import generate_synthetic_regression
+from models.box_opt import _build_amplify_primitives
+from models.streaming import StreamingBoxRegressor
+from benchmark.streaming import run_streaming_grid
+from offline_amplify import offline
+
+
+class TestStreamingTemplate(unittest.TestCase):
+    def test_rank_k_patch_matches_rebuild(self):
+        data = generate_synthetic_regression(n=60, d=6, seed=7)
+        X, y = data.X_train, data.y_train
+        reg = StreamingBoxRegressor(X.shape[1])
+        for rows, expected in ((slice(0, 30), "rebuild"), (slice(30, 32), "rank-k")):
+            Xc = X[rows]
+            reg.A += Xc.T @ Xc
+            self.assertEqual(reg._patch_template(Xc), expected)
+
+        A = X[:32].T @ X[:32]
+        np.testing.assert_allclose(reg.A, A)
+        got = reg.template[2].as_dict()
+        ref = _build_amplify_primitives(A)[2].as_dict()
+        self.assertEqual(set(got), set(ref))
+        for k in ref:
+            self.assertAlmostEqual(got[k], ref[k], places=8)
+
+
+class TestSmallChunks(unittest.TestCase):
+    def setUp(self):
+        for p in offline("models.box_opt"):
+            self.addCleanup(p.stop)
+
+    def test_waits_for_d_rows(self):
+        data = generate_synthetic_regression(n=40, d=3, noise_sigma=0.1, seed=3)
+        X, y = data.X_train, data.y_train
+        reg = StreamingBoxRegressor(3, max_iter=30)
+        self.assertIsNone(reg.partial_fit(X[:1], y[:1]))
+        self.assertIsNone(reg.partial_fit(X[1:2], y[1:2]))
+        self.assertIsNone(reg.coef_)
+        res = reg.partial_fit(X[2:4], y[2:4])
+        self.assertEqual(res["n_seen"], 4)
+        self.assertEqual(res["template_update"], "rebuild")
+        self.assertTrue(np.isfinite(res["error"]))
+        self.assertEqual(reg.pending_time, 0.0)
+
+    def test_small_chunks_take_the_rank_k_patch(self):
+        data = generate_synthetic_regression(n=40, d=4, noise_sigma=0.1, seed=6)
+        X, y = data.X_train, data.y_train
+        reg = StreamingBoxRegressor(4, max_iter=10)
+        self.assertEqual(reg.partial_fit(X[:4], y[:4])["template_update"], "rebuild")
+        for r in range(4, 7):                    # 1 row < d/2
+            res = reg.partial_fit(X[r:r + 1], y[r:r + 1])
+            self.assertEqual(res["template_update"], "rank-k")
+            self.assertGreater(res["update_time"], 0.0)
+
+        A = X[:7].T @ X[:7]
+        np.testing.assert_allclose(reg.A, A)
+        got = reg.template[2].as_dict()
+        ref = _build_amplify_primitives(A)[2].as_dict()
+        self.assertEqual(set(got), set(ref))
+        for k in ref:
+            self.assertAlmostEqual(got[k], ref[k], places=8)
+
+    def test_runner_sweeps_chunk_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = run_streaming_grid(dims=[3], noise=0.1, corr=0.0, seed=0, n_batches=4,
+                                     max_iter=3, num_solves=1, timeout_ms=10,
+                                     outfile=str(Path(tmp) / "s.csv"), chunk_rows=[1, 12])
+            with open(out, newline="") as f:
+                rows = list(csv.DictReader(f))
+        stream = [r for r in rows if r["mode"] == "stream"]
+        small = [r["template_update"] for r in stream if r["chunk_rows"] == "1"]
+        # rows 1-2 are only absorbed, row 3 builds the template, then rank-k patches
+        self.assertEqual(small, ["rebuild"] + ["rank-k"] * 21)
+        self.assertEqual({r["template_update"] for r in stream if r["chunk_rows"] == "12"},
+                         {"rebuild"})
+        self.assertEqual({r["template_update"] for r in rows if r["mode"] == "refit"},
+                         {"rebuild"})
+
+if __name__ == "__main__":
+    unittest.main()
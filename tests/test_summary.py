@@ -0,0 +1,66 @@
+import sqlite3
+import unittest
+
+import numpy as np
+
+from analysis.csv_to_database import import_dirs
+from analysis.summary import median_ci, robust_stats, refresh_summary
+from result_csv import TempDirCase, query, write_csv
+
+
+class TestRobustStats(unittest.TestCase):
+    def test_median_ci_matches_resampling(self):
+        rng = np.random.default_rng(1)
+        v = np.sort(rng.lognormal(size=51))
+        boot = np.median(v[rng.integers(0, len(v), (20000, len(v)))], axis=1)
+        lo, hi = median_ci(v)
+        self.assertEqual((lo, hi), tuple(np.percentile(boot, [2.5, 97.5], method="nearest")))
+
+    def test_stats_row(self):
+        n, mean, med, p90, p99, q1, q3, iqr, lo, hi = robust_stats([3.0, 1.0, 2.0, 100.0, 4.0])
+        self.assertEqual((n, med, q1, q3, iqr), (5, 3.0, 2.0, 4.0, 2.0))
+        self.assertLessEqual(lo, med)
+        self.assertGreaterEqual(hi, med)
+        self.assertEqual(robust_stats([7.0])[-2:], (7.0, 7.0))
+
+
+class TestSummaryTable(TempDirCase):
+    def setUp(self):
+        super().setUp()
+        self.dir = self.root / "run"
+        self.dir.mkdir()
+        self.db = self.root / "bench.db"
+        for rep in range(3):
+            self._write(rep, [(4, 0.1 * (rep + 1)), (8, 1.0 + rep)])
+
+    def _write(self, rep, rows):
+        write_csv(self.dir / f"box_opt_0.05_0.0_rep{rep}.csv",
+                  [("box-opt", d, 10 * d, 3, 0.1, 0.2, t, t + 1, t / 2, 1e-3) for d, t in rows])
+
+    def _summary(self, d, metric="total_time"):
+        return query(self.db, "SELECT n, median, p90 FROM summary "
+                              "WHERE mode = 'box-opt' AND d = ? AND metric = ?", (d, metric))
+
+    def test_refreshes_only_touched_groups(self):
+        s = import_dirs([self.dir], db_path=self.db, jobs=1)
+        self.assertEqual(s["groups"], 2)
+        self.assertEqual(self._summary(8), [(3, 2.0, 2.8)])
+        self.assertEqual(self._summary(4, "network_time")[0][:2], (3, 0.1))
+
+        self._write(0, [(8, 10.0)])                  # rep0 loses its d=4 row
+        s = import_dirs([self.dir], db_path=self.db, jobs=1)
+        self.assertEqual(s["groups"], 2)
+        self.assertEqual(self._summary(4)[0][:2], (2, 0.25))
+        self.assertEqual(self._summary(8)[0][:2], (3, 3.0))
+
+        conn = sqlite3.connect(self.db)
+        try:
+            self.assertEqual(refresh_summary(conn), 0)
+            self.assertEqual(refresh_summary(conn, full=True), 2)
+        finally:
+            conn.close()
+        self.assertEqual(self._summary(8)[0][:2], (3, 3.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
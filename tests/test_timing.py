@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from benchmark.timing import autorange, measure, rep_columns, repeated, robust_stats
+from benchmark.warm_start import pin_previous, _cache_file
+from models.spans import SpanRecorder
+
+
+class TestTiming(unittest.TestCase):
+    def test_robust_stats(self):
+        s = robust_stats([1.0, 2.0, 3.0, 4.0, 100.0])
+        self.assertEqual(s["median"], 3.0)
+        self.assertEqual(s["mad"], 1.0)
+        self.assertEqual((s["min"], s["n"]), (1.0, 5))
+        self.assertIsNone(robust_stats([])["median"])
+
+    def test_autorange_and_measure(self):
+        calls = []
+        loops, per_call = autorange(lambda: calls.append(1), min_time=1e-3)
+        self.assertGreater(loops, 1)
+        self.assertIn(str(loops)[0], "125")
+        stats = measure(lambda: sum(range(100)), warmup=2, repeat=5, min_time=1e-4)
+        self.assertEqual(stats["n"], 5)
+        self.assertLessEqual(stats["min"], stats["median"])
+        self.assertIsNotNone(stats["first"])
+
+
+class TestRepeated(unittest.TestCase):
+    def _fake_run(self, times):
+        it = iter(times)
+        return lambda: {"total_time": next(it), "encode_time": 1.0, "error": next(it)}
+
+    def test_single_run_unchanged(self):
+        res = repeated(lambda: {"total_time": 2.0})
+        self.assertEqual(res, {"total_time": 2.0})
+        self.assertEqual(rep_columns(res, "total_time"), {})
+
+    def test_medians_and_median_run(self):
+        # warm‑up (9.0) is dropped; measured totals 3, 1, 2 → median run is the 2.0 one
+        calls = self._fake_run([9.0, "w", 3.0, "a", 1.0, "b", 2.0, "c"])
+        with SpanRecorder() as rec:
+            res = repeated(calls, warmup=1, repeats=3)
+        self.assertEqual(res["total_time"], 2.0)
+        self.assertEqual(res["error"], "c")
+        self.assertEqual((res["reps"], res["loops"]), (3, 1))
+        cols = rep_columns(res, "total_time", "anneal_time")
+        self.assertEqual(cols["total_time_min"], 1.0)
+        self.assertEqual(cols["total_time_mad"], 1.0)
+        self.assertIsNone(cols["anneal_time_mad"])
+        self.assertEqual([s.get("warmup") for s in rec.spans], [True, None, None, None])
+
+    def test_min_time_loops_fast_cells(self):
+        n = []
+        res = repeated(lambda: n.append(1) or {"train_time": 1e-6}, repeats=2, min_time=1e-3)
+        self.assertGreater(res["loops"], 1)
+        self.assertEqual(len(n), 1 + 2 * res["loops"])        # probe + samples
+
+    def test_pin_previous(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            key = (4, 0.01, 0.0, 1)
+            np.save(_cache_file(tmp, key), np.arange(4.0))
+            warm = pin_previous({"init": "previous-run", "cache": tmp}, key)
+            np.save(_cache_file(tmp, key), np.zeros(4))         # a later rep's write
+            np.testing.assert_array_equal(warm["previous"], np.arange(4.0))
+        self.assertIsNone(pin_previous(None, key))
+        self.assertEqual(pin_previous({"init": "ridge"}, key), {"init": "ridge"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from benchmark.result_logger import ResultLogger
+from models.trace import ConvergenceTrace, load_traces
+
+
+class TestConvergenceTrace(unittest.TestCase):
+    def setUp(self):
+        self.A = np.array([[2.0, 0.5], [0.5, 1.0]])
+        self.b = np.array([1.0, -1.0])
+        self.x = np.linalg.solve(self.A, self.b)
+
+    def test_record_deltas(self):
+        tr = ConvergenceTrace(self.A, self.b, max_iter=5)
+        tr.record(1, 1.0, True, -0.5, -0.1, np.zeros(2),
+                  encode_time=0.2, anneal_time=0.1, wall_time=0.5, qubo_nnz=7)
+        tr.record(2, 0.5, False, 0.0, -0.1, self.x,
+                  encode_time=0.5, anneal_time=0.3, wall_time=1.5, qubo_nnz=7)
+        a = tr.array()
+        self.assertEqual(len(a), 2)
+        np.testing.assert_allclose(a["encode_time"], [0.2, 0.3])
+        np.testing.assert_allclose(a["anneal_time"], [0.1, 0.2])
+        np.testing.assert_allclose(a["network_time"], [0.4, 0.8])
+        self.assertAlmostEqual(a["dist"][0], np.linalg.norm(self.x))
+        self.assertAlmostEqual(a["dist"][1], 0.0)
+        self.assertEqual(a["accepted"].tolist(), [True, False])
+
+    def test_disabled_is_noop(self):
+        tr = ConvergenceTrace(self.A, self.b, max_iter=5, enabled=False)
+        tr.record(1, 1.0, True, 0.0, 0.0, np.zeros(2), 0.1, 0.1, 0.1, 0)
+        self.assertIsNone(tr.array())
+        self.assertIsNone(tr.exact)
+
+    def test_logger_sidecar(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            lg = ResultLogger(Path(tmp) / "box-opt_0.01_0.0_rep0.csv")
+            for d in (2, 3):
+                tr = ConvergenceTrace(self.A, self.b, max_iter=4)
+                for it in range(1, d + 1):
+                    tr.record(it, 1.0 / it, it % 2 == 1, -1.0, -0.1, self.x,
+                              0.1 * it, 0.05 * it, 0.2 * it, 3)
+                lg.add(mode="box-opt", d=d, error=0.0)
+                lg.add_trace(d, tr.array())
+            lg.flush()
+            self.assertTrue(lg.trace_path.name.endswith(".trace.npz"))
+            t = load_traces(lg.trace_path)
+        self.assertEqual(len(t), 5)
+        self.assertEqual(t["row"].tolist(), [0, 0, 1, 1, 1])
+        self.assertEqual(t["d"].tolist(), [2, 2, 3, 3, 3])
+        self.assertEqual(t["it"].tolist(), [1, 2, 1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from models.trust_region import TrustRegion, StopRule
+
+
+class TestTrustRegion(unittest.TestCase):
+    def test_fixed_schedule_by_default(self):
+        tr = TrustRegion(1.0, beta=0.5)
+        tr.reject(); tr.reject(); tr.reject()
+        self.assertAlmostEqual(tr.L, 0.125)
+        tr.accept(); tr.accept(); tr.accept()
+        self.assertAlmostEqual(tr.L, 0.125)
+
+    def test_adaptive_schedule(self):
+        tr = TrustRegion(1.0, beta=0.5, expand=2.0, fast_beta=0.1, streak=2)
+        tr.accept(); tr.accept()
+        self.assertAlmostEqual(tr.L, 2.0)
+        tr.reject()                       # first reject: beta
+        self.assertAlmostEqual(tr.L, 1.0)
+        tr.reject()                       # streak reached: fast_beta
+        self.assertAlmostEqual(tr.L, 0.1)
+
+
+class TestStopRule(unittest.TestCase):
+    def test_epsilon(self):
+        stop = StopRule(epsilon=1e-3)
+        self.assertIsNone(stop.check(1e-2, -1.0, 0.0))
+        self.assertEqual(stop.check(1e-4, -1.0, 0.0), "epsilon")
+
+    def test_stagnation(self):
+        stop = StopRule(rel_tol=1e-6, patience=2)
+        self.assertIsNone(stop.check(1.0, -10.0, 0.0))
+        self.assertIsNone(stop.check(1.0, -11.0, 0.0))
+        self.assertIsNone(stop.check(1.0, -11.0 - 1e-9, 0.0))
+        self.assertEqual(stop.check(1.0, -11.0 - 2e-9, 0.0), "stagnation")
+
+    def test_rejects_do_not_stagnate(self):
+        stop = StopRule(rel_tol=1e-6, patience=2)
+        for L in (1.0, 0.2, 0.04, 0.008):        # c = 0 start: E stays 0 while contracting
+            self.assertIsNone(stop.check(L, 0.0, 0.0))
+        self.assertIsNone(stop.check(0.008, -3.0, 0.0))     # first accept
+        for L in (1.6e-3, 3.2e-4):
+            self.assertIsNone(stop.check(L, -3.0, 0.0))
+        self.assertIsNone(stop.check(3.2e-4, -3.5, 0.0))
+
+    def test_budgets(self):
+        self.assertEqual(StopRule(anneal_budget_s=0.5).check(1.0, 0.0, 0.6), "anneal_budget")
+        self.assertEqual(StopRule(time_budget_s=0.0).check(1.0, 0.0, 0.0), "time_budget")
+
+
+if __name__ == "__main__":
+    unittest.main()
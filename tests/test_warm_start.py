@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+
+from data.data_generator import generate_synthetic_regression
+from models.warm_start import cg_steps, initial_center, TargetTracker
+
+
+class TestWarmStart(unittest.TestCase):
+    def setUp(self):
+        data = generate_synthetic_regression(n=120, d=6, noise_sigma=0.01, seed=3)
+        self.A = data.X_train.T @ data.X_train
+        self.b = data.X_train.T @ data.y_train
+        self.exact = np.linalg.solve(self.A, self.b)
+
+    def test_cg_full_steps_is_exact(self):
+        x = cg_steps(self.A, self.b, 6)
+        self.assertLess(np.linalg.norm(x - self.exact), 1e-8)
+
+    def test_strategies_beat_zeros(self):
+        cold = np.linalg.norm(self.exact)
+        for strategy in ("cg:2", "ridge"):
+            c0, L0 = initial_center(self.A, self.b, strategy)
+            self.assertLess(np.linalg.norm(c0 - self.exact), cold)
+            self.assertLessEqual(L0, 1.0)
+            self.assertGreater(L0, 0.0)
+
+    def test_previous_run_fallback(self):
+        c0, L0 = initial_center(self.A, self.b, "previous-run", previous=np.ones(3))
+        self.assertTrue(np.all(c0 == 0))
+        self.assertEqual(L0, 1.0)
+        c0, _ = initial_center(self.A, self.b, "previous-run", previous=self.exact)
+        self.assertTrue(np.allclose(c0, self.exact))
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            initial_center(self.A, self.b, "lbfgs")
+
+    def test_target_tracker(self):
+        tt = TargetTracker(self.A, self.b, 1e-3)
+        tt.update(np.zeros(6), 1, 0.5)
+        self.assertIsNone(tt.iters)
+        tt.update(self.exact, 4, 2.0)
+        tt.update(self.exact, 5, 3.0)
+        self.assertEqual((tt.iters, tt.time), (4, 2.0))
+
+
+if __name__ == "__main__":
+    unittest.main()